@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_delete, post_save
+        from .backends import invalidar_usuario_cache
+
+        User = get_user_model()
+        post_save.connect(invalidar_usuario_cache, sender=User, dispatch_uid='accounts_user_cache_save')
+        post_delete.connect(invalidar_usuario_cache, sender=User, dispatch_uid='accounts_user_cache_delete')
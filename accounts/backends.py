@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+USER_CACHE_KEY = 'auth_user:{pk}'
+
+
+def user_cache_key(pk):
+    return USER_CACHE_KEY.format(pk=pk)
+
+
+def invalidar_usuario_cache(sender, instance, **kwargs):
+    """Receptor de post_save/post_delete: descarta el usuario cacheado"""
+    cache.delete(user_cache_key(instance.pk))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend que guarda en caché el objeto User que AuthenticationMiddleware
+    carga en cada petición autenticada. La entrada se invalida al guardar o
+    eliminar el usuario (cambio de contraseña, last_login, is_active, ...),
+    por lo que la validación del hash de sesión sigue funcionando.
+    """
+
+    def get_user(self, user_id):
+        timeout = getattr(settings, 'AUTH_USER_CACHE_TIMEOUT', 0)
+        if not timeout:
+            return super().get_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, timeout)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,11 @@
+from django.contrib import admin
+from .models import Asesor
+
+@admin.register(Asesor)
+class AsesorAdmin(admin.ModelAdmin):
+    list_display = ['nombre', 'usuario', 'email', 'telefono', 'activo']
+    list_filter = ['activo']
+    list_select_related = ['usuario']
+    search_fields = ['nombre', 'email']
+    autocomplete_fields = ['usuario']
+    readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Asesor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=200, verbose_name='Nombre del Asesor')),
+                ('nombre_normalizado', models.CharField(editable=False, max_length=200, unique=True)),
+                ('telefono', models.CharField(blank=True, max_length=20, verbose_name='Teléfono')),
+                ('email', models.EmailField(blank=True, max_length=254, verbose_name='Email')),
+                ('activo', models.BooleanField(default=True, verbose_name='Activo')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('usuario', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='asesor', to=settings.AUTH_USER_MODEL, verbose_name='Usuario del Sistema')),
+            ],
+            options={
+                'verbose_name': 'Asesor',
+                'verbose_name_plural': 'Asesores',
+                'ordering': ['nombre'],
+            },
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:12
+
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def normalizar_nombre(texto):
+    """
+    Copia fija de socios.models.normalizar_nombre al crear la migración:
+    minúsculas, sin tildes y con un solo espacio entre palabras
+    """
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_tildes.lower().split())
+
+
+MODELOS = [('socios', 'SocioComercial'), ('seguimiento', 'SeguimientoSocio')]
+
+
+def crear_asesores(apps, schema_editor):
+    """
+    Un Asesor por cada nombre distinto de asesor_asignado, sin distinguir
+    mayúsculas, tildes ni espacios ('Ana Pérez', 'ana perez ' y 'ANA PEREZ'
+    son el mismo). Se conserva la forma más usada del nombre
+    """
+    Asesor = apps.get_model('asesores', 'Asesor')
+
+    variantes = defaultdict(Counter)
+    textos = {}  # modelo -> textos distintos de asesor_asignado
+    for app_label, model_name in MODELOS:
+        modelo = apps.get_model(app_label, model_name)
+        # order_by() vacío: con el Meta.ordering del modelo el GROUP BY incluiría las fechas
+        filas = list(
+            modelo.objects.exclude(asesor_asignado='').values_list('asesor_asignado')
+            .annotate(cantidad=Count('id')).order_by()
+        )
+        textos[modelo] = [texto for texto, _ in filas]
+        for texto, cantidad in filas:
+            nombre = ' '.join(texto.split())
+            if normalizar_nombre(nombre):
+                variantes[normalizar_nombre(nombre)][nombre] += cantidad
+
+    # Los asesores que ya existan (p. ej. al volver a aplicar la migración) se reutilizan
+    asesores = {asesor.nombre_normalizado: asesor for asesor in Asesor.objects.all()}
+    for clave, nombres in variantes.items():
+        if clave not in asesores:
+            asesores[clave] = Asesor.objects.create(nombre=nombres.most_common(1)[0][0], nombre_normalizado=clave)
+
+    # Un UPDATE por cada texto distinto
+    for modelo, distintos in textos.items():
+        for texto in distintos:
+            clave = normalizar_nombre(texto)
+            if clave:
+                modelo.objects.filter(asesor_asignado=texto).update(asesor=asesores[clave])
+
+
+def restaurar_nombres(apps, schema_editor):
+    Asesor = apps.get_model('asesores', 'Asesor')
+    for app_label, model_name in MODELOS:
+        modelo = apps.get_model(app_label, model_name)
+        for asesor in Asesor.objects.all():
+            modelo.objects.filter(asesor=asesor).update(asesor_asignado=asesor.nombre)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asesores', '0001_initial'),
+        ('seguimiento', '0006_seguimientosocio_asesor'),
+        ('socios', '0004_sociocomercial_asesor'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_asesores, restaurar_nombres),
+    ]
@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.urls import reverse
+
+from socios.models import normalizar_nombre
+
+
+class Asesor(models.Model):
+    nombre = models.CharField(max_length=200, verbose_name="Nombre del Asesor")
+    # Copia normalizada de `nombre`: evita registrar dos veces al mismo asesor
+    # escrito con otras mayúsculas, tildes o espacios
+    nombre_normalizado = models.CharField(max_length=200, unique=True, editable=False)
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='asesor',
+        verbose_name="Usuario del Sistema"
+    )
+    telefono = models.CharField(max_length=20, verbose_name="Teléfono", blank=True)
+    email = models.EmailField(verbose_name="Email", blank=True)
+    activo = models.BooleanField(default=True, verbose_name="Activo")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        verbose_name = "Asesor"
+        verbose_name_plural = "Asesores"
+        ordering = ['nombre']
+    
+    def __str__(self):
+        return self.nombre
+    
+    def get_absolute_url(self):
+        return reverse('asesores:detalle', kwargs={'pk': self.pk})
+    
+    def clean(self):
+        duplicado = Asesor.objects.filter(nombre_normalizado=normalizar_nombre(self.nombre)).exclude(pk=self.pk)
+        if duplicado.exists():
+            raise ValidationError({'nombre': f'Ya existe el asesor "{duplicado.first().nombre}".'})
+    
+    def save(self, *args, **kwargs):
+        self.nombre = ' '.join(self.nombre.split())
+        self.nombre_normalizado = normalizar_nombre(self.nombre)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nombre' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nombre_normalizado'}
+        super().save(*args, **kwargs)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'asesores'
+
+urlpatterns = [
+    path('', views.AsesorListView.as_view(), name='lista'),
+    path('<int:pk>/', views.AsesorDetailView.as_view(), name='detalle'),
+]
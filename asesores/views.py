@@ -0,0 +1,147 @@
+from datetime import date
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+from django.views.generic import DetailView, ListView
+
+from clientes.models import Cliente
+from seguimiento.models import ESTADOS_SLA, SeguimientoSocio
+from services.conditional import ConditionalGetMixin
+from socios.models import SocioComercial
+from .models import Asesor
+
+
+def _fecha(valor):
+    try:
+        return date.fromisoformat(valor) if valor else None
+    except ValueError:
+        return None
+
+
+def metricas_vacias():
+    return {'socios': 0, 'socios_activos': 0, 'ventas': 0, 'cantidad_ventas': 0,
+            'seguimientos': 0, 'completados': 0, 'vencidos': 0, **{paso: 0 for paso in SeguimientoSocio.PASOS}}
+
+
+def resumen_por_asesor(asesor=None, desde=None, hasta=None):
+    """
+    Métricas por asesor con una consulta agrupada por tabla (socios, ventas de
+    sus socios y embudo de seguimientos), en lugar de contar asesor por asesor
+
+    Args:
+        asesor: Limitar a un asesor
+        desde, hasta: Rango de fecha_compra de las ventas
+
+    Returns:
+        {asesor_id (None = sin asesor): {'socios', 'socios_activos', 'ventas',
+        'cantidad_ventas', 'seguimientos', 'completados', 'vencidos', <paso>...}}
+    """
+    socios = SocioComercial.objects.all()
+    clientes = Cliente.objects.all()
+    seguimientos = SeguimientoSocio.objects.all()
+    if asesor is not None:
+        socios = socios.filter(asesor=asesor)
+        clientes = clientes.filter(socio_comercial__asesor=asesor)
+        seguimientos = seguimientos.filter(asesor=asesor)
+    if desde:
+        clientes = clientes.filter(fecha_compra__gte=desde)
+    if hasta:
+        clientes = clientes.filter(fecha_compra__lte=hasta)
+
+    resumen = {}
+
+    def agregar(filas):
+        for fila in filas:
+            resumen.setdefault(fila.pop('asesor'), metricas_vacias()).update(fila)
+
+    agregar(
+        socios.values('asesor')
+        .annotate(socios=Count('id'), socios_activos=Count('id', filter=Q(activo=True)))
+        .order_by()
+    )
+    agregar(
+        clientes.values(asesor=F('socio_comercial__asesor'))
+        .annotate(ventas=Sum('valor_compra'), cantidad_ventas=Count('id'))
+        .order_by()
+    )
+    agregar(
+        seguimientos.values('asesor')
+        .annotate(
+            seguimientos=Count('id'),
+            completados=Count('id', filter=Q(proceso_completo=True)),
+            vencidos=Count('id', filter=Q(estado__in=ESTADOS_SLA, fecha_vencimiento__lt=timezone.localdate())),
+            **{paso: Count('id', filter=Q(**{paso: True})) for paso in SeguimientoSocio.PASOS},
+        )
+        .order_by()
+    )
+    return resumen
+
+
+def embudo(metricas):
+    """[(paso, seguimientos que lo completaron, % del total)] en el orden del proceso"""
+    total = metricas['seguimientos']
+    return [
+        (SeguimientoSocio._meta.get_field(paso).verbose_name, metricas[paso],
+         round(metricas[paso] * 100 / total, 1) if total else 0)
+        for paso in SeguimientoSocio.PASOS
+    ]
+
+
+class AsesorListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
+    model = Asesor
+    template_name = 'asesores/lista.html'
+    context_object_name = 'asesores'
+    etag_models = [Asesor, SocioComercial, Cliente, SeguimientoSocio]
+    etag_diario = True
+
+    def get_queryset(self):
+        queryset = Asesor.objects.order_by('nombre')
+        if self.request.GET.get('activo') != 'todos':
+            queryset = queryset.filter(activo=True)
+        return queryset
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        desde = _fecha(self.request.GET.get('desde'))
+        hasta = _fecha(self.request.GET.get('hasta'))
+        resumen = resumen_por_asesor(desde=desde, hasta=hasta)
+        context['filas'] = [(asesor, resumen.get(asesor.pk) or metricas_vacias()) for asesor in context['asesores']]
+        context['sin_asesor'] = resumen.get(None)
+        context['desde'] = desde
+        context['hasta'] = hasta
+        context['activo'] = self.request.GET.get('activo', '')
+        return context
+
+
+class AsesorDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
+    model = Asesor
+    template_name = 'asesores/detalle.html'
+    context_object_name = 'asesor'
+    etag_models = [Asesor, SocioComercial, Cliente, SeguimientoSocio]
+    etag_diario = True
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        asesor = self.object
+        desde = _fecha(self.request.GET.get('desde'))
+        hasta = _fecha(self.request.GET.get('hasta'))
+        metricas = resumen_por_asesor(asesor=asesor, desde=desde, hasta=hasta)
+        context['metricas'] = metricas.get(asesor.pk) or metricas_vacias()
+        context['embudo'] = embudo(context['metricas'])
+
+        ventas = Q()
+        if desde:
+            ventas &= Q(clientes__fecha_compra__gte=desde)
+        if hasta:
+            ventas &= Q(clientes__fecha_compra__lte=hasta)
+        context['socios'] = (
+            SocioComercial.objects.filter(asesor=asesor)
+            .annotate(total_ventas=Sum('clientes__valor_compra', filter=ventas or None),
+                      cantidad_ventas=Count('clientes', filter=ventas or None))
+            .order_by(F('total_ventas').desc(nulls_last=True), 'nombre')[:20]
+        )
+        context['vencidos'] = SeguimientoSocio.objects.vencidos().filter(asesor=asesor).order_by('fecha_vencimiento')[:10]
+        context['desde'] = desde
+        context['hasta'] = hasta
+        return context
@@ -1,16 +1,50 @@
 from django.contrib import admin
-from .models import Cliente, CupoCredito
+from services.admin_performance import AdminRendimientoMixin, FiltroAutocompletar, FiltroTexto
+from .models import Cliente, ConsultaCrediticia, CupoCredito, VentaDiaria
 
 @admin.register(Cliente)
-class ClienteAdmin(admin.ModelAdmin):
+class ClienteAdmin(AdminRendimientoMixin, admin.ModelAdmin):
     list_display = ['nombre', 'cedula', 'socio_comercial', 'fecha_compra', 'valor_compra']
-    list_filter = ['fecha_compra', 'socio_comercial', 'ciudad']
+    list_filter = [
+        FiltroAutocompletar.para('socio_comercial', 'Socio Comercial'),
+        FiltroTexto.para('ciudad', 'Ciudad'),
+    ]
+    list_select_related = ['socio_comercial']
+    date_hierarchy = 'fecha_compra'
     search_fields = ['nombre', 'cedula', 'socio_comercial__nombre']
+    autocomplete_fields = ['socio_comercial']
     readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
 
 @admin.register(CupoCredito)
 class CupoCreditoAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'ciudad', 'valor_aprobado', 'fecha_aprobacion']
-    list_filter = ['ciudad', 'fecha_aprobacion']
-    search_fields = ['nombre', 'ciudad']
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
+    list_display = ['nombre', 'numero_documento', 'ciudad', 'valor_aprobado', 'estado', 'score_crediticio', 'fecha_aprobacion']
+    list_filter = ['estado', 'ciudad', 'fecha_aprobacion']
+    search_fields = ['nombre', 'ciudad', 'numero_documento']
+    readonly_fields = ['score_crediticio', 'categoria_crediticia', 'fecha_consulta_credito',
+                       'fecha_creacion', 'fecha_actualizacion']
+
+@admin.register(ConsultaCrediticia)
+class ConsultaCrediticiaAdmin(admin.ModelAdmin):
+    list_display = ['numero_documento', 'tipo_documento', 'score', 'categoria', 'con_historial',
+                    'obligaciones_vencidas', 'fecha_consulta']
+    list_filter = ['categoria', 'con_historial', 'fecha_consulta']
+    search_fields = ['numero_documento']
+    date_hierarchy = 'fecha_consulta'
+    list_select_related = ['detalle']
+    readonly_fields = ['detalles_obligaciones']
+    exclude = ['detalle']
+
+@admin.register(VentaDiaria)
+class VentaDiariaAdmin(AdminRendimientoMixin, admin.ModelAdmin):
+    list_display = ['fecha', 'socio_comercial', 'ciudad', 'cantidad', 'total']
+    list_filter = [
+        FiltroAutocompletar.para('socio_comercial', 'Socio Comercial'),
+        FiltroTexto.para('ciudad', 'Ciudad'),
+    ]
+    list_select_related = ['socio_comercial']
+    date_hierarchy = 'fecha'
+    # Se mantiene desde Cliente: solo lectura
+    readonly_fields = ['fecha', 'socio_comercial', 'ciudad', 'cantidad', 'total']
+
+    def has_add_permission(self, request):
+        return False
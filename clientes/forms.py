@@ -1,6 +1,7 @@
 from django import forms
 from .models import Cliente, CupoCredito
 from socios.models import SocioComercial
+from socios.forms import SocioAutocompletarWidget
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, Field
 from crispy_forms.bootstrap import FormActions
@@ -12,6 +13,7 @@ class ClienteForm(forms.ModelForm):
                  'telefono', 'email', 'ciudad', 'observaciones']
         widgets = {
             'fecha_compra': forms.DateInput(attrs={'type': 'date'}),
+            'socio_comercial': SocioAutocompletarWidget,
             'observaciones': forms.Textarea(attrs={'rows': 3}),
         }
     
@@ -48,14 +50,15 @@ class ClienteForm(forms.ModelForm):
             )
         )
         
-        # Filtrar solo socios activos
+        # Filtrar solo socios activos (el widget no lista las opciones: el
+        # queryset solo valida el socio enviado)
         self.fields['socio_comercial'].queryset = SocioComercial.objects.filter(activo=True)
 
 class CupoCreditoForm(forms.ModelForm):
     class Meta:
         model = CupoCredito
-        fields = ['nombre', 'ciudad', 'valor_aprobado', 'telefono', 'email', 
-                 'fecha_aprobacion', 'observaciones']
+        fields = ['nombre', 'tipo_documento', 'numero_documento', 'ciudad', 'valor_aprobado',
+                 'telefono', 'email', 'fecha_aprobacion', 'estado', 'observaciones']
         widgets = {
             'fecha_aprobacion': forms.DateInput(attrs={'type': 'date'}),
             'observaciones': forms.Textarea(attrs={'rows': 3}),
@@ -70,6 +73,12 @@ class CupoCreditoForm(forms.ModelForm):
                 Column('ciudad', css_class='form-group col-md-6 mb-0'),
                 css_class='form-row'
             ),
+            Row(
+                Column('tipo_documento', css_class='form-group col-md-4 mb-0'),
+                Column('numero_documento', css_class='form-group col-md-4 mb-0'),
+                Column('estado', css_class='form-group col-md-4 mb-0'),
+                css_class='form-row'
+            ),
             Row(
                 Column('valor_aprobado', css_class='form-group col-md-6 mb-0'),
                 Column('fecha_aprobacion', css_class='form-group col-md-6 mb-0'),
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cupocredito',
+            name='categoria_crediticia',
+            field=models.CharField(blank=True, max_length=20, verbose_name='Categoría Crediticia'),
+        ),
+        migrations.AddField(
+            model_name='cupocredito',
+            name='estado',
+            field=models.CharField(choices=[('pendiente', 'Pendiente'), ('aprobado', 'Aprobado'), ('rechazado', 'Rechazado')], db_index=True, default='aprobado', max_length=20, verbose_name='Estado'),
+        ),
+        migrations.AddField(
+            model_name='cupocredito',
+            name='fecha_consulta_credito',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Fecha de Consulta Crediticia'),
+        ),
+        migrations.AddField(
+            model_name='cupocredito',
+            name='numero_documento',
+            field=models.CharField(blank=True, max_length=20, verbose_name='Número de Documento'),
+        ),
+        migrations.AddField(
+            model_name='cupocredito',
+            name='score_crediticio',
+            field=models.PositiveIntegerField(blank=True, null=True, verbose_name='Score Crediticio'),
+        ),
+        migrations.AddField(
+            model_name='cupocredito',
+            name='tipo_documento',
+            field=models.CharField(choices=[('CC', 'Cédula de Ciudadanía'), ('CE', 'Cédula de Extranjería'), ('NIT', 'NIT'), ('PP', 'Pasaporte')], default='CC', max_length=3, verbose_name='Tipo de Documento'),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0002_cupo_documento_estado_score'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DetalleObligaciones',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('huella', models.CharField(max_length=64, unique=True, verbose_name='Huella SHA-256')),
+                ('datos', models.BinaryField(verbose_name='Detalle comprimido')),
+                ('cantidad', models.PositiveSmallIntegerField(default=0, verbose_name='Obligaciones')),
+            ],
+            options={
+                'verbose_name': 'Detalle de Obligaciones',
+                'verbose_name_plural': 'Detalles de Obligaciones',
+            },
+        ),
+        migrations.CreateModel(
+            name='ConsultaCrediticia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo_documento', models.CharField(choices=[('CC', 'Cédula de Ciudadanía'), ('CE', 'Cédula de Extranjería'), ('NIT', 'NIT'), ('PP', 'Pasaporte')], default='CC', max_length=3, verbose_name='Tipo de Documento')),
+                ('numero_documento', models.CharField(max_length=20, verbose_name='Número de Documento')),
+                ('fecha_consulta', models.DateTimeField(verbose_name='Fecha de Consulta')),
+                ('score', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Score')),
+                ('categoria', models.CharField(blank=True, max_length=1, verbose_name='Categoría')),
+                ('con_historial', models.BooleanField(default=False, verbose_name='Incluye Historial')),
+                ('total_obligaciones', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Total Obligaciones')),
+                ('obligaciones_al_dia', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Obligaciones al Día')),
+                ('obligaciones_vencidas', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='Obligaciones Vencidas')),
+                ('valor_total_deuda', models.DecimalField(blank=True, decimal_places=0, max_digits=14, null=True, verbose_name='Valor Total Deuda')),
+                ('score_comportamiento', models.CharField(blank=True, max_length=20, verbose_name='Comportamiento')),
+                ('detalle', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='consultas', to='clientes.detalleobligaciones', verbose_name='Detalle de Obligaciones')),
+            ],
+            options={
+                'verbose_name': 'Consulta Crediticia',
+                'verbose_name_plural': 'Consultas Crediticias',
+                'ordering': ['-fecha_consulta'],
+                'indexes': [models.Index(fields=['numero_documento', 'tipo_documento', '-fecha_consulta'], name='consulta_documento_fecha')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0003_consultas_crediticias'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='cliente',
+            name='fecha_compra',
+            field=models.DateField(db_index=True, verbose_name='Fecha de Compra'),
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def agregar_ventas(apps, schema_editor):
+    Cliente = apps.get_model('clientes', 'Cliente')
+    VentaDiaria = apps.get_model('clientes', 'VentaDiaria')
+    filas = (
+        Cliente.objects.values('fecha_compra', 'socio_comercial', 'ciudad')
+        .annotate(cantidad=Count('id'), total=Sum('valor_compra'))
+        .order_by()
+    )
+    VentaDiaria.objects.bulk_create(
+        (VentaDiaria(fecha=fila['fecha_compra'], socio_comercial_id=fila['socio_comercial'],
+                     ciudad=fila['ciudad'], cantidad=fila['cantidad'], total=fila['total'])
+         for fila in filas.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clientes', '0004_indices_admin'),
+        ('socios', '0005_remove_asesor_asignado'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('ciudad', models.CharField(blank=True, max_length=100, verbose_name='Ciudad')),
+                ('cantidad', models.PositiveIntegerField(default=0, verbose_name='Cantidad de Ventas')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Total Vendido')),
+                ('socio_comercial', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ventas_diarias', to='socios.sociocomercial', verbose_name='Socio Comercial')),
+            ],
+            options={
+                'verbose_name': 'Venta Diaria',
+                'verbose_name_plural': 'Ventas Diarias',
+                'ordering': ['-fecha'],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'socio_comercial', 'ciudad'), name='venta_diaria_unica')],
+            },
+        ),
+        migrations.RunPython(agregar_ventas, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,7 @@
+import hashlib
+import json
+import zlib
+
 from django.db import models
 from django.urls import reverse
 from socios.models import SocioComercial
@@ -7,7 +11,7 @@ from decimal import Decimal
 class Cliente(models.Model):
     nombre = models.CharField(max_length=200, verbose_name="Nombre del Cliente")
     cedula = models.CharField(max_length=20, unique=True, verbose_name="Cédula")
-    fecha_compra = models.DateField(verbose_name="Fecha de Compra")
+    fecha_compra = models.DateField(verbose_name="Fecha de Compra", db_index=True)
     valor_compra = models.DecimalField(
         max_digits=12, 
         decimal_places=2, 
@@ -39,7 +43,26 @@ class Cliente(models.Model):
         return reverse('clientes:detalle', kwargs={'pk': self.pk})
 
 class CupoCredito(models.Model):
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('aprobado', 'Aprobado'),
+        ('rechazado', 'Rechazado'),
+    ]
+    TIPO_DOCUMENTO_CHOICES = [
+        ('CC', 'Cédula de Ciudadanía'),
+        ('CE', 'Cédula de Extranjería'),
+        ('NIT', 'NIT'),
+        ('PP', 'Pasaporte'),
+    ]
+
     nombre = models.CharField(max_length=200, verbose_name="Nombre")
+    tipo_documento = models.CharField(
+        max_length=3,
+        choices=TIPO_DOCUMENTO_CHOICES,
+        default='CC',
+        verbose_name="Tipo de Documento"
+    )
+    numero_documento = models.CharField(max_length=20, verbose_name="Número de Documento", blank=True)
     ciudad = models.CharField(max_length=100, verbose_name="Ciudad")
     valor_aprobado = models.DecimalField(
         max_digits=12, 
@@ -51,6 +74,19 @@ class CupoCredito(models.Model):
     email = models.EmailField(verbose_name="Email", blank=True)
     fecha_aprobacion = models.DateField(verbose_name="Fecha de Aprobación")
     observaciones = models.TextField(verbose_name="Observaciones", blank=True)
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADO_CHOICES,
+        default='aprobado',
+        db_index=True,
+        verbose_name="Estado"
+    )
+
+    # Resultado de la consulta en DataCrédito
+    score_crediticio = models.PositiveIntegerField(null=True, blank=True, verbose_name="Score Crediticio")
+    categoria_crediticia = models.CharField(max_length=20, blank=True, verbose_name="Categoría Crediticia")
+    fecha_consulta_credito = models.DateTimeField(null=True, blank=True, verbose_name="Fecha de Consulta Crediticia")
+
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
     
@@ -61,3 +97,122 @@ class CupoCredito(models.Model):
     
     def __str__(self):
         return f"{self.nombre} - {self.ciudad} - ${self.valor_aprobado}"
+
+
+class DetalleObligaciones(models.Model):
+    """
+    Detalle de obligaciones de una consulta a DataCrédito, comprimido y
+    compartido: las consultas con el mismo detalle (p. ej. sin obligaciones, o
+    la misma cédula consultada de nuevo sin cambios) apuntan a la misma fila
+    """
+    huella = models.CharField(max_length=64, unique=True, verbose_name="Huella SHA-256")
+    datos = models.BinaryField(verbose_name="Detalle comprimido")
+    cantidad = models.PositiveSmallIntegerField(default=0, verbose_name="Obligaciones")
+
+    # Columnas del formato compacto: una lista de valores por obligación
+    COLUMNAS = ['entidad', 'tipo_producto', 'valor_inicial', 'saldo_actual', 'estado', 'dias_vencido']
+
+    class Meta:
+        verbose_name = "Detalle de Obligaciones"
+        verbose_name_plural = "Detalles de Obligaciones"
+
+    def __str__(self):
+        return f"{self.cantidad} obligaciones ({self.huella[:12]})"
+
+    @classmethod
+    def codificar(cls, obligaciones):
+        """
+        (huella, datos) de una lista de obligaciones: filas sin nombres de campo,
+        montos en pesos enteros y JSON mínimo comprimido con zlib
+        """
+        filas = [
+            [round(valor) if isinstance(valor, float) else valor
+             for valor in (obligacion.get(columna) for columna in cls.COLUMNAS)]
+            for obligacion in obligaciones
+        ]
+        datos = zlib.compress(json.dumps(filas, separators=(',', ':')).encode(), 9)
+        return hashlib.sha256(datos).hexdigest(), datos
+
+    def obligaciones(self):
+        """El detalle como lista de diccionarios, igual que en la respuesta de DataCrédito"""
+        filas = json.loads(zlib.decompress(bytes(self.datos)))
+        return [dict(zip(self.COLUMNAS, fila)) for fila in filas]
+
+
+class ConsultaCrediticia(models.Model):
+    """Resultado compacto de una consulta a DataCrédito (score y resumen del historial)"""
+    tipo_documento = models.CharField(
+        max_length=3,
+        choices=CupoCredito.TIPO_DOCUMENTO_CHOICES,
+        default='CC',
+        verbose_name="Tipo de Documento"
+    )
+    numero_documento = models.CharField(max_length=20, verbose_name="Número de Documento")
+    fecha_consulta = models.DateTimeField(verbose_name="Fecha de Consulta")
+
+    score = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Score")
+    categoria = models.CharField(max_length=1, blank=True, verbose_name="Categoría")
+
+    # Resumen del historial (vacío si solo se consultó el score)
+    con_historial = models.BooleanField(default=False, verbose_name="Incluye Historial")
+    total_obligaciones = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Total Obligaciones")
+    obligaciones_al_dia = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Obligaciones al Día")
+    obligaciones_vencidas = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="Obligaciones Vencidas")
+    valor_total_deuda = models.DecimalField(
+        max_digits=14, decimal_places=0, null=True, blank=True, verbose_name="Valor Total Deuda"
+    )
+    score_comportamiento = models.CharField(max_length=20, blank=True, verbose_name="Comportamiento")
+    detalle = models.ForeignKey(
+        DetalleObligaciones,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='consultas',
+        verbose_name="Detalle de Obligaciones"
+    )
+
+    class Meta:
+        verbose_name = "Consulta Crediticia"
+        verbose_name_plural = "Consultas Crediticias"
+        ordering = ['-fecha_consulta']
+        indexes = [
+            models.Index(fields=['numero_documento', 'tipo_documento', '-fecha_consulta'],
+                         name='consulta_documento_fecha'),
+        ]
+
+    def __str__(self):
+        return f"{self.tipo_documento} {self.numero_documento} - {self.score} ({self.fecha_consulta:%Y-%m-%d})"
+
+    @property
+    def detalles_obligaciones(self):
+        return self.detalle.obligaciones() if self.detalle_id else []
+
+
+class VentaDiaria(models.Model):
+    """
+    Ventas agregadas por día, socio comercial y ciudad, para las gráficas de
+    tendencia sin agrupar toda la tabla de clientes. Se mantiene al guardar o
+    borrar un Cliente (services/ventas_diarias.py) y se reconstruye con el
+    comando reconstruir_ventas_diarias
+    """
+    fecha = models.DateField(verbose_name="Fecha")
+    socio_comercial = models.ForeignKey(
+        SocioComercial,
+        on_delete=models.CASCADE,
+        related_name='ventas_diarias',
+        verbose_name="Socio Comercial"
+    )
+    ciudad = models.CharField(max_length=100, blank=True, verbose_name="Ciudad")
+    cantidad = models.PositiveIntegerField(default=0, verbose_name="Cantidad de Ventas")
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Total Vendido")
+
+    class Meta:
+        verbose_name = "Venta Diaria"
+        verbose_name_plural = "Ventas Diarias"
+        ordering = ['-fecha']
+        constraints = [
+            models.UniqueConstraint(fields=['fecha', 'socio_comercial', 'ciudad'], name='venta_diaria_unica'),
+        ]
+
+    def __str__(self):
+        return f"{self.fecha:%Y-%m-%d} - {self.socio_comercial_id} - {self.ciudad or 'Sin ciudad'}: ${self.total}"
@@ -1,3 +1,105 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from socios.models import SocioComercial
+from .forms import ClienteForm
+from .models import Cliente
+
+
+def crear_clientes(socios, cantidad, inicio=0):
+    Cliente.objects.bulk_create([
+        Cliente(
+            nombre=f'Cliente {i}',
+            cedula=str(10000000 + i),
+            fecha_compra=date(2026, 1, 1) + timedelta(days=i % 90),
+            valor_compra=Decimal('150000'),
+            socio_comercial=socios[i % len(socios)],
+            ciudad=['Bogotá', 'Cali', 'Pasto'][i % 3],
+        )
+        for i in range(inicio, inicio + cantidad)
+    ])
+
+
+class ClienteAdminConsultasTest(TestCase):
+    """El listado del admin no debe crecer en consultas con el número de clientes ni de socios"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.socios = SocioComercial.objects.bulk_create([
+            SocioComercial(nombre=f'Socio {i}', fecha_ingreso=date(2025, 1, 1), ciudad_sede='Bogotá')
+            for i in range(30)
+        ])
+        crear_clientes(cls.socios, 5)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:clientes_cliente_changelist')
+
+    def contar(self, url):
+        self.client.get(url)  # sesión y usuario quedan en caché
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas)
+
+    def test_consultas_constantes(self):
+        pocos = self.contar(self.url)
+        crear_clientes(self.socios, 95, inicio=5)
+        SocioComercial.objects.bulk_create([
+            SocioComercial(nombre=f'Otro {i}', fecha_ingreso=date(2025, 1, 1), ciudad_sede='Cali')
+            for i in range(50)
+        ])
+        self.assertEqual(self.contar(self.url), pocos)
+
+    def test_numero_de_consultas(self):
+        crear_clientes(self.socios, 95, inicio=5)
+        self.client.get(self.url)
+        # Conteo, filas de la página (socio_comercial en el mismo JOIN) y las
+        # dos del date_hierarchy (rango de fechas y meses)
+        with self.assertNumQueries(4):
+            self.client.get(self.url)
+
+    def test_filtros_sin_consultas_extra(self):
+        crear_clientes(self.socios, 95, inicio=5)
+        socio = self.socios[0]
+        base = self.contar(self.url)
+        # El filtro por socio solo carga la etiqueta del socio elegido
+        self.assertEqual(self.contar(f'{self.url}?socio_comercial__id__exact={socio.pk}'), base + 1)
+        self.assertEqual(self.contar(f'{self.url}?ciudad__icontains=cali'), base)
+
+    def test_filtro_con_valor_invalido(self):
+        respuesta = self.client.get(f'{self.url}?socio_comercial__id__exact=abc')
+        self.assertRedirects(respuesta, f'{self.url}?e=1', fetch_redirect_response=False)
+
+
+class ClienteFormTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.socio = SocioComercial.objects.create(nombre='Socio Uno', fecha_ingreso=date(2025, 1, 1),
+                                                  ciudad_sede='Bogotá')
+
+    def datos(self, socio):
+        return {'nombre': 'Cliente', 'cedula': '123', 'fecha_compra': '2026-01-05', 'valor_compra': '1000',
+                'socio_comercial': socio, 'ciudad': 'Cali'}
+
+    def test_widget_muestra_el_socio_elegido(self):
+        form = ClienteForm(data=self.datos(self.socio.pk))
+        self.assertIn('Socio Uno', str(form['socio_comercial']))
 
-# Create your tests here.
+    def test_socio_invalido_es_error_del_formulario(self):
+        for valor in ('abc', '99999'):
+            with self.subTest(valor=valor):
+                form = ClienteForm(data=self.datos(valor))
+                self.assertFalse(form.is_valid())
+                self.assertIn('socio_comercial', form.errors)
+                str(form['socio_comercial'])  # se vuelve a mostrar sin error 500
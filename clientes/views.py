@@ -9,13 +9,17 @@ from django.db.models import Q, Count, Sum
 from django.utils import timezone
 from datetime import datetime
 from django.db import models
+from socios.models import SocioComercial
+from services.conditional import ConditionalGetMixin
 
 # Vistas para Clientes
-class ClienteListView(LoginRequiredMixin, ListView):
+class ClienteListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = Cliente
     template_name = 'clientes/lista.html'
     context_object_name = 'clientes'
     paginate_by = 20
+    etag_models = [Cliente, SocioComercial]
+    etag_diario = True
     
     def get_queryset(self):
         queryset = Cliente.objects.select_related('socio_comercial').order_by('-fecha_compra')
@@ -77,10 +81,11 @@ class ClienteCreateView(LoginRequiredMixin, CreateView):
         messages.success(self.request, 'Cliente creado exitosamente.')
         return super().form_valid(form)
 
-class ClienteDetailView(LoginRequiredMixin, DetailView):
+class ClienteDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = Cliente
     template_name = 'clientes/detalle.html'
     context_object_name = 'cliente'
+    etag_models = [Cliente, SocioComercial]
 
 class ClienteUpdateView(LoginRequiredMixin, UpdateView):
     model = Cliente
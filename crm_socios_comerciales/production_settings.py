@@ -35,10 +35,58 @@ DATABASES = {
     }
 }
 
+# Caché compartida entre los workers de gunicorn (sesiones cached_db y usuario
+# autenticado); LocMemCache es por proceso y dejaría sesiones cerradas vivas
+# en otros workers
+CACHES = {
+    'default': {
+        'BACKEND': 'services.metrics.InstrumentedFileBasedCache',
+        'LOCATION': os.environ.get('CACHE_LOCATION', '/var/tmp/crm_socios_cache'),
+        'TIMEOUT': 300,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+SESSION_ENGINE = os.environ.get('SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db')
+
+# Directorio compartido por los workers para agregar las métricas de /metrics
+METRICS_DIR = os.environ.get('METRICS_DIR', '/var/tmp/crm_socios_metrics')
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Tokens de la API JSON separados por comas
+API_TOKENS = [t for t in os.environ.get('API_TOKENS', '').split(',') if t]
+
+# Perfilado de peticiones lentas (opcional)
+PROFILER_ENABLED = os.environ.get('PROFILER_ENABLED', 'False') == 'True'
+PROFILER_SAMPLE_RATE = float(os.environ.get('PROFILER_SAMPLE_RATE', '0.0'))
+PROFILER_SLOW_THRESHOLD = float(os.environ.get('PROFILER_SLOW_THRESHOLD', '2.0'))
+
+# Mensajes del simulador de SMS en la base de datos para que todos los workers los vean
+SMS_MESSAGE_STORE = os.environ.get('SMS_MESSAGE_STORE', 'db')
+
+# Claves de idempotencia de pagos compartidas entre workers
+PAYMENT_IDEMPOTENCY_STORE = os.environ.get('PAYMENT_IDEMPOTENCY_STORE', 'db')
+
+# Plazo por defecto de las llamadas a servicios externos; nunca se inyectan fallas
+RESILIENCIA['default']['deadline'] = float(os.environ.get('EXTERNAL_CALL_DEADLINE', '5.0'))
+MOCK_FAULTS = {}
+
 # Configuración de archivos estáticos para producción
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Nombres con hash de contenido + variantes gzip/brotli generadas en collectstatic
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'services.static_assets.CompressedManifestStaticFilesStorage',
+    },
+}
+SERVE_PRECOMPRESSED_STATIC = os.environ.get('SERVE_PRECOMPRESSED_STATIC', 'True') == 'True'
+
 # Configuración de seguridad adicional
 X_FRAME_OPTIONS = 'DENY'
 SECURE_REFERRER_POLICY = 'same-origin'
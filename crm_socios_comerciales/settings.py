@@ -45,10 +45,15 @@ INSTALLED_APPS = [
     'clientes',
     'socios',
     'seguimiento',
+    'asesores',
+    'services',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'services.static_assets.PrecompressedStaticMiddleware',
+    'services.metrics.MetricsMiddleware',
+    'services.profiling.SlowRequestProfilerMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -126,6 +131,10 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
+# Servir STATIC_ROOT (con variantes .br/.gz) desde la aplicación cuando no hay
+# un proxy delante; en desarrollo runserver ya sirve los estáticos
+SERVE_PRECOMPRESSED_STATIC = False
+
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
@@ -138,6 +147,107 @@ CRISPY_TEMPLATE_PACK = "bootstrap4"
 LANGUAGE_CODE = 'es-co'
 TIME_ZONE = 'America/Bogota'
 
+# Caché
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'services.metrics.InstrumentedLocMemCache',
+        'LOCATION': 'crm-socios',
+    }
+}
+
+# Sesiones y autenticación
+# cached_db lee la sesión de la caché y solo consulta django_session cuando no
+# está cacheada ('django.contrib.sessions.backends.signed_cookies' elimina la
+# consulta por completo a cambio de guardar la sesión firmada en la cookie).
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# CachedModelBackend guarda el User autenticado en caché durante estos segundos
+# (0 desactiva la caché). Es el único backend: CachedModelBackend ya hereda de
+# ModelBackend y repetirlo haría cada login fallido dos veces. Las sesiones
+# iniciadas con ModelBackend antes de este cambio piden volver a entrar una vez.
+AUTH_USER_CACHE_TIMEOUT = 300
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CachedModelBackend',
+]
+
+# Métricas Prometheus (/metrics)
+# Cada worker vuelca sus métricas a METRICS_DIR cada METRICS_FLUSH_INTERVAL
+# segundos; None usa un directorio dentro del temporal del sistema
+METRICS_ENABLED = True
+METRICS_DIR = None
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = ''
+
+# Perfilado de peticiones lentas (Admin > Perfiles de Peticiones)
+# Se guarda el perfil de toda petición que supere PROFILER_SLOW_THRESHOLD
+# segundos y de una fracción PROFILER_SAMPLE_RATE de peticiones (con cProfile)
+PROFILER_ENABLED = False
+PROFILER_SAMPLE_RATE = 0.0
+PROFILER_SLOW_THRESHOLD = 2.0
+PROFILER_SAMPLE_INTERVAL = 0.005
+PROFILER_MAX_PROFILES = 500
+PROFILER_IGNORE_PATHS = ['/static/', '/media/', '/metrics', '/admin/services/perfilpeticion/']
+
+# API JSON (/api/): tokens aceptados en 'Authorization: Bearer <token>'
+# para integraciones; los usuarios con sesión no necesitan token
+API_TOKENS = []
+
+# Caché de consultas a DataCrédito (services.datacredito_cache), en segundos
+DATACREDITO_CACHE_ALIAS = 'default'
+DATACREDITO_CACHE_TTLS = {
+    'score': 24 * 3600,
+    'historial': 24 * 3600,
+    'express': 24 * 3600,
+    'negativo': 5 * 60,
+}
+
+# Almacén de mensajes del simulador de SMS: 'memoria' (por proceso, acotado a
+# SMS_STORE_CAPACITY mensajes) o 'db' (compartido entre workers)
+SMS_MESSAGE_STORE = 'memoria'
+SMS_STORE_CAPACITY = 10000
+
+# Cola de salida de SMS: intentos máximos y backoff exponencial (segundos)
+SMS_QUEUE_MAX_INTENTOS = 5
+SMS_QUEUE_BACKOFF = 30
+SMS_QUEUE_BACKOFF_MAX = 3600
+
+# Claves de idempotencia de los pagos: 'memoria' (por proceso) o 'db' (entre workers)
+PAYMENT_IDEMPOTENCY_STORE = 'memoria'
+PAYMENT_IDEMPOTENCY_TTL = 24 * 3600
+PAYMENT_IDEMPOTENCY_CAPACITY = 10000
+
+# Capa de resiliencia de los servicios externos (services/resilience.py):
+# valores comunes en 'default' y ajustes por servicio ('datacredito', 'twilio', 'payu', ...)
+RESILIENCIA = {
+    'default': {'deadline': 5.0, 'umbral_fallas': 5, 'tiempo_abierto': 30.0, 'max_concurrentes': 10},
+    'datacredito': {'deadline': 4.0},
+}
+
+# Fallas inyectadas en los servicios simulados para pruebas locales
+# (ver services/fault_injection.py), p. ej. {'datacredito': {'error_rate': 0.3}}
+MOCK_FAULTS = {}
+
+# Días durante los que se reutiliza una ConsultaCrediticia guardada antes de
+# volver a consultar DataCrédito (services/datacredito_historial.py)
+CONSULTA_CREDITICIA_VIGENCIA_DIAS = 30
+
+# Perfiles de los servicios simulados (ver services/latency_profiles.py):
+# semilla para resultados reproducibles, distribución de la latencia por
+# servicio ({'default': {'tipo': 'cero'}} en pruebas unitarias) y archivo donde
+# grabar las latencias simuladas para reproducirlas después
+MOCK_SEMILLA = None
+MOCK_LATENCIA = {'default': {'tipo': 'uniforme'}}
+MOCK_TRAZA_GRABAR = None
+
+# Plazos (días) de cada paso del seguimiento de socios, sobre los de
+# seguimiento.models.PLAZOS_BASE, p. ej. {'contrato_firmado': 15}; y días de
+# anticipación con que un seguimiento cuenta como "por vencer". Después de
+# cambiarlos: python manage.py recalcular_vencimientos
+SLA_SEGUIMIENTO_DIAS = {}
+SLA_AVISO_DIAS = 3
+
 # Login URLs
 LOGIN_URL = '/accounts/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -19,6 +19,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from services.export_views import ExportClientesCSV, ExportSociosCSV, ExportSeguimientosCSV
+from services.metrics_views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -27,10 +28,15 @@ urlpatterns = [
     path('clientes/', include('clientes.urls')),
     path('socios/', include('socios.urls')),
     path('seguimiento/', include('seguimiento.urls')),
+    path('asesores/', include('asesores.urls')),
     # URLs para exportación
     path('exports/clientes/', ExportClientesCSV.as_view(), name='export_clientes_csv'),
     path('exports/socios/', ExportSociosCSV.as_view(), name='export_socios_csv'),
     path('exports/seguimientos/', ExportSeguimientosCSV.as_view(), name='export_seguimientos_csv'),
+    # API JSON para integraciones
+    path('api/', include('services.api_urls')),
+    # Métricas Prometheus
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 # Servir archivos media en desarrollo
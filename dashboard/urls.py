@@ -5,4 +5,5 @@ app_name = 'dashboard'
 
 urlpatterns = [
     path('', views.home, name='home'),
+    path('ventas/serie/', views.serie_ventas, name='serie_ventas'),
 ]
@@ -1,27 +1,31 @@
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
 from django.db.models import Sum, Count
-from clientes.models import Cliente, CupoCredito
+from django.http import JsonResponse
+from clientes.models import Cliente, CupoCredito, VentaDiaria
 from socios.models import SocioComercial
 from seguimiento.models import SeguimientoSocio
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from django.utils import timezone
+from services import ventas_diarias
+from services.conditional import condicional
 
 @login_required
+@condicional(Cliente, CupoCredito, SocioComercial, SeguimientoSocio, diario=True)
 def home(request):
     # Obtener estadísticas del dashboard
     total_socios = SocioComercial.objects.count()
     socios_activos = SocioComercial.objects.filter(activo=True).count()
     total_clientes = Cliente.objects.count()
     
-    # Ventas del último mes
-    ultimo_mes = timezone.now() - timedelta(days=30)
-    ventas_ultimo_mes = Cliente.objects.filter(
-        fecha_compra__gte=ultimo_mes
-    ).aggregate(total=Sum('valor_compra'))['total'] or 0
+    # Ventas del último mes (desde el agregado diario, sin recorrer los clientes)
+    ultimo_mes = timezone.localdate() - timedelta(days=30)
+    ventas_ultimo_mes = VentaDiaria.objects.filter(
+        fecha__gte=ultimo_mes
+    ).aggregate(total=Sum('total'))['total'] or 0
     
     # Ventas totales
-    ventas_totales = Cliente.objects.aggregate(total=Sum('valor_compra'))['total'] or 0
+    ventas_totales = VentaDiaria.objects.aggregate(total=Sum('total'))['total'] or 0
     
     # Seguimientos pendientes
     seguimientos_pendientes = SeguimientoSocio.objects.filter(
@@ -56,3 +60,39 @@ def home(request):
     }
     
     return render(request, 'dashboard/home.html', context)
+
+
+@login_required
+@condicional(Cliente, diario=True)
+def serie_ventas(request):
+    """
+    Ventas por periodo para las gráficas (JSON)
+
+    Parámetros: granularidad=dia|semana|mes, desde/hasta (AAAA-MM-DD, por
+    defecto los últimos 30 días, 12 semanas o 12 meses), socio (id) y ciudad
+    """
+    granularidad = request.GET.get('granularidad', 'dia')
+    if granularidad not in ventas_diarias.GRANULARIDADES:
+        return JsonResponse({'error': 'granularidad debe ser dia, semana o mes'}, status=400)
+    try:
+        hasta = date.fromisoformat(request.GET['hasta']) if request.GET.get('hasta') else timezone.localdate()
+        desde = (date.fromisoformat(request.GET['desde']) if request.GET.get('desde')
+                 else ventas_diarias.rango_por_defecto(granularidad, hasta))
+        socio = int(request.GET['socio']) if request.GET.get('socio') else None
+    except (ValueError, OverflowError):
+        return JsonResponse({'error': 'Fechas en formato AAAA-MM-DD y socio entero'}, status=400)
+    if desde > hasta:
+        return JsonResponse({'error': 'desde debe ser anterior a hasta'}, status=400)
+
+    # El rango se limita a los últimos MAX_PUNTOS periodos (sin pasar de date.min)
+    dias_por_periodo = {'dia': 1, 'semana': 7, 'mes': 31}[granularidad]
+    dias = min(dias_por_periodo * (ventas_diarias.MAX_PUNTOS - 1), (hasta - date.min).days)
+    desde = max(desde, hasta - timedelta(days=dias))
+
+    puntos = ventas_diarias.serie(granularidad, desde, hasta, socio=socio, ciudad=request.GET.get('ciudad'))
+    return JsonResponse({
+        'granularidad': granularidad,
+        'desde': puntos[0]['periodo'] if puntos else desde,
+        'hasta': hasta,
+        'periodos': puntos,
+    })
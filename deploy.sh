@@ -18,6 +18,10 @@ pip install -r requirements.txt
 # Configurar variables de entorno (estas se configurarán en Hostinger)
 export DJANGO_SETTINGS_MODULE="crm_socios_comerciales.production_settings"
 
+# Vendorizar assets de terceros (Bootstrap, iconos, fuentes) en static/vendor/
+echo "Vendorizando assets de terceros..."
+python manage.py vendorizar_estaticos || echo "No se pudieron vendorizar los assets, se usarán los CDN"
+
 # Generar archivos estáticos
 echo "Generando archivos estáticos..."
 python manage.py collectstatic --noinput
@@ -33,3 +37,5 @@ python manage.py migrate
 echo "=== Deployment completado ==="
 echo "La aplicación está lista para ejecutarse con:"
 echo "gunicorn -c gunicorn.conf.py crm_socios_comerciales.wsgi:application"
+echo "y el worker de la cola de SMS como proceso aparte:"
+echo "python manage.py procesar_cola_sms"
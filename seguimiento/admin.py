@@ -1,16 +1,37 @@
 from django.contrib import admin
+from services.admin_performance import AdminRendimientoMixin, FiltroAutocompletar
 from .models import SeguimientoSocio
 
+
+class PasoCompletadoFilter(admin.SimpleListFilter):
+    """Seguimientos con un paso completo, sobre el índice de pasos_mascara"""
+    title = 'Paso completado'
+    parameter_name = 'paso'
+
+    def lookups(self, request, model_admin):
+        return [(paso, SeguimientoSocio._meta.get_field(paso).verbose_name) for paso in SeguimientoSocio.PASOS]
+
+    def queryset(self, request, queryset):
+        if self.value() in SeguimientoSocio.PASOS:
+            return queryset.con_pasos(self.value())
+        return queryset
+
 @admin.register(SeguimientoSocio)
-class SeguimientoSocioAdmin(admin.ModelAdmin):
-    list_display = ['socio_potencial', 'estado', 'proceso_completo', 'porcentaje_completado_display', 'fecha_actualizacion']
-    list_filter = ['estado', 'proceso_completo', 'presentacion_negocio', 'contrato_firmado']
+class SeguimientoSocioAdmin(AdminRendimientoMixin, admin.ModelAdmin):
+    list_display = ['socio_potencial', 'asesor', 'estado', 'proceso_completo', 'porcentaje_completado_display',
+                    'fecha_vencimiento', 'fecha_actualizacion']
+    list_filter = ['estado', 'proceso_completo', 'pasos_completados', PasoCompletadoFilter,
+                   'presentacion_negocio', 'contrato_firmado', FiltroAutocompletar.para('asesor', 'Asesor')]
+    list_select_related = ['asesor']
+    date_hierarchy = 'fecha_creacion'
     search_fields = ['socio_potencial', 'ciudad']
-    readonly_fields = ['fecha_creacion', 'fecha_actualizacion', 'proceso_completo']
+    autocomplete_fields = ['socio_comercial', 'asesor']
+    readonly_fields = ['fecha_creacion', 'fecha_actualizacion', 'proceso_completo', 'pasos_completados',
+                       'fecha_vencimiento']
     
     fieldsets = (
         ('Información Básica', {
-            'fields': ('socio_potencial', 'socio_comercial', 'estado')
+            'fields': ('socio_potencial', 'socio_comercial', 'asesor', 'estado')
         }),
         ('Contacto', {
             'fields': ('telefono', 'email', 'ciudad')
@@ -29,7 +50,7 @@ class SeguimientoSocioAdmin(admin.ModelAdmin):
             'fields': ('observaciones',)
         }),
         ('Estado', {
-            'fields': ('proceso_completo',)
+            'fields': ('proceso_completo', 'pasos_completados', 'fecha_vencimiento')
         }),
         ('Fechas', {
             'fields': ('fecha_creacion', 'fecha_actualizacion'),
@@ -37,6 +58,6 @@ class SeguimientoSocioAdmin(admin.ModelAdmin):
         })
     )
     
+    @admin.display(description='Progreso', ordering='pasos_completados')
     def porcentaje_completado_display(self, obj):
-        return f"{obj.porcentaje_completado():.1f}%"
-    porcentaje_completado_display.short_description = 'Progreso'
+        return f"{obj.pasos_completados * 100 / len(SeguimientoSocio.PASOS):.1f}%"
@@ -1,6 +1,8 @@
 from django import forms
+from django.db.models import Q
 from .models import SeguimientoSocio
 from socios.models import SocioComercial
+from asesores.models import Asesor
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, Field, Fieldset
 from crispy_forms.bootstrap import FormActions
@@ -9,7 +11,7 @@ class SeguimientoSocioForm(forms.ModelForm):
     class Meta:
         model = SeguimientoSocio
         fields = [
-            'socio_potencial', 'asesor_asignado', 'estado',
+            'socio_potencial', 'asesor', 'estado',
             'presentacion_negocio', 'fecha_presentacion',
             'documentos_enviados', 'fecha_envio_documentos',
             'contrato_enviado', 'fecha_envio_contrato',
@@ -41,13 +43,16 @@ class SeguimientoSocioForm(forms.ModelForm):
                 'fecha_creacion_usuario': self.instance.fecha_creacion_usuario,
             })
         
+        # Solo asesores activos (y el actual, aunque ya no lo esté)
+        self.fields['asesor'].queryset = Asesor.objects.filter(Q(activo=True) | Q(pk=self.instance.asesor_id))
+        
         self.helper = FormHelper()
         self.helper.layout = Layout(
             Fieldset(
                 'Información Básica',
                 Row(
                     Column('socio_potencial', css_class='form-group col-md-6 mb-0'),
-                    Column('asesor_asignado', css_class='form-group col-md-6 mb-0'),
+                    Column('asesor', css_class='form-group col-md-6 mb-0'),
                     css_class='form-row'
                 ),
                 Row(
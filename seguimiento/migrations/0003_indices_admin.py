@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguimiento', '0002_add_asesor_asignado'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='seguimientosocio',
+            name='fecha_actualizacion',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='seguimientosocio',
+            name='fecha_creacion',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:09
+
+from django.db import migrations, models
+from django.db.models import Case, IntegerField, Value, When
+
+# Copia fija de SeguimientoSocio.PASOS y de expresiones_pasos() al crear la
+# migración: si el modelo cambia, la migración sigue dando el mismo resultado
+PASOS = [
+    'presentacion_negocio',
+    'documentos_enviados',
+    'contrato_enviado',
+    'contrato_firmado',
+    'capacitacion_realizada',
+    'usuario_creado',
+]
+
+
+def expresiones_pasos():
+    bits = [
+        Case(When(**{paso: True}, then=Value(1 << i)), default=Value(0), output_field=IntegerField())
+        for i, paso in enumerate(PASOS)
+    ]
+    unos = [
+        Case(When(**{paso: True}, then=Value(1)), default=Value(0), output_field=IntegerField())
+        for paso in PASOS
+    ]
+    return {'pasos_mascara': sum(bits[1:], bits[0]), 'pasos_completados': sum(unos[1:], unos[0])}
+
+
+def calcular_pasos(apps, schema_editor):
+    SeguimientoSocio = apps.get_model('seguimiento', 'SeguimientoSocio')
+    SeguimientoSocio.objects.update(**expresiones_pasos())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguimiento', '0003_indices_admin'),
+        ('socios', '0003_nombre_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seguimientosocio',
+            name='pasos_completados',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Cantidad de Pasos Completados'),
+        ),
+        migrations.AddField(
+            model_name='seguimientosocio',
+            name='pasos_mascara',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='Pasos Completados (máscara)'),
+        ),
+        migrations.RunPython(calcular_pasos, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='seguimientosocio',
+            index=models.Index(fields=['pasos_completados', 'fecha_actualizacion'], name='seguimiento_progreso'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientosocio',
+            index=models.Index(fields=['pasos_mascara'], name='seguimiento_pasos'),
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:11
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.utils import timezone
+
+# Copia fija de las reglas del SLA al crear la migración (PLAZOS_BASE, sin
+# settings.SLA_SEGUIMIENTO_DIAS): volver a aplicarla da siempre el mismo
+# resultado. Con plazos propios, correr después recalcular_vencimientos
+ESTADOS_SLA = ['pendiente', 'en_proceso']
+PLAZOS = {
+    'presentacion_negocio': 7,
+    'documentos_enviados': 7,
+    'contrato_enviado': 7,
+    'contrato_firmado': 10,
+    'capacitacion_realizada': 7,
+    'usuario_creado': 7,
+}
+FECHAS_PASOS = {
+    'presentacion_negocio': 'fecha_presentacion',
+    'documentos_enviados': 'fecha_envio_documentos',
+    'contrato_enviado': 'fecha_envio_contrato',
+    'contrato_firmado': 'fecha_firma_contrato',
+    'capacitacion_realizada': 'fecha_capacitacion',
+    'usuario_creado': 'fecha_creacion_usuario',
+}
+
+
+def calcular_fecha_vencimiento(seguimiento):
+    pendientes = [paso for paso in FECHAS_PASOS if not getattr(seguimiento, paso)]
+    if not pendientes:
+        return None
+    fechas = [
+        getattr(seguimiento, campo) for paso, campo in FECHAS_PASOS.items()
+        if getattr(seguimiento, paso) and getattr(seguimiento, campo)
+    ]
+    if fechas:
+        inicio = max(fechas)
+    elif seguimiento.fecha_creacion:
+        inicio = timezone.localdate(seguimiento.fecha_creacion)
+    else:
+        inicio = timezone.localdate()
+    return inicio + timedelta(days=PLAZOS[pendientes[0]])
+
+
+def llenar_fecha_vencimiento(apps, schema_editor):
+    SeguimientoSocio = apps.get_model('seguimiento', 'SeguimientoSocio')
+    seguimientos = list(SeguimientoSocio.objects.filter(estado__in=ESTADOS_SLA))
+    for seguimiento in seguimientos:
+        seguimiento.fecha_vencimiento = calcular_fecha_vencimiento(seguimiento)
+    SeguimientoSocio.objects.bulk_update(seguimientos, ['fecha_vencimiento'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seguimiento', '0004_pasos_completados'),
+        ('socios', '0003_nombre_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seguimientosocio',
+            name='fecha_vencimiento',
+            field=models.DateField(blank=True, editable=False, null=True, verbose_name='Vencimiento del Paso Actual'),
+        ),
+        migrations.RunPython(llenar_fecha_vencimiento, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='seguimientosocio',
+            index=models.Index(fields=['estado', 'fecha_vencimiento'], name='seguimiento_sla'),
+        ),
+        migrations.AddIndex(
+            model_name='seguimientosocio',
+            index=models.Index(fields=['asesor_asignado', 'estado', 'fecha_vencimiento'], name='seguimiento_sla_asesor'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asesores', '0002_migrar_asesores'),
+        ('seguimiento', '0006_seguimientosocio_asesor'),
+        ('socios', '0005_remove_asesor_asignado'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='seguimientosocio',
+            name='seguimiento_sla_asesor',
+        ),
+        migrations.RemoveField(
+            model_name='seguimientosocio',
+            name='asesor_asignado',
+        ),
+        migrations.AddIndex(
+            model_name='seguimientosocio',
+            index=models.Index(fields=['asesor', 'estado', 'fecha_vencimiento'], name='seguimiento_sla_asesor'),
+        ),
+    ]
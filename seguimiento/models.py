@@ -1,7 +1,134 @@
+from datetime import timedelta
+
+from django.conf import settings
 from django.db import models
+from django.db.models import Case, IntegerField, Value, When
 from django.urls import reverse
+from django.utils import timezone
+from services.conditional import invalidar_version
 from socios.models import SocioComercial
 
+# Días para completar cada paso desde que se completó el anterior (o desde la
+# creación del seguimiento); settings.SLA_SEGUIMIENTO_DIAS los ajusta por paso
+PLAZOS_BASE = {
+    'presentacion_negocio': 7,
+    'documentos_enviados': 7,
+    'contrato_enviado': 7,
+    'contrato_firmado': 10,
+    'capacitacion_realizada': 7,
+    'usuario_creado': 7,
+}
+
+# Estados con un paso en curso, y por tanto con fecha de vencimiento
+ESTADOS_SLA = ['pendiente', 'en_proceso']
+
+
+def mascara_pasos(*pasos):
+    """Bits de los pasos dados (el paso i de SeguimientoSocio.PASOS es el bit 1 << i)"""
+    return sum(1 << SeguimientoSocio.PASOS.index(paso) for paso in set(pasos))
+
+
+def expresiones_pasos():
+    """
+    {pasos_mascara, pasos_completados} calculados en SQL a partir de los
+    booleanos, para queryset.update()
+    """
+    bits = [
+        Case(When(**{paso: True}, then=Value(1 << i)), default=Value(0), output_field=IntegerField())
+        for i, paso in enumerate(SeguimientoSocio.PASOS)
+    ]
+    unos = [
+        Case(When(**{paso: True}, then=Value(1)), default=Value(0), output_field=IntegerField())
+        for paso in SeguimientoSocio.PASOS
+    ]
+    return {'pasos_mascara': sum(bits[1:], bits[0]), 'pasos_completados': sum(unos[1:], unos[0])}
+
+
+def plazos_sla():
+    """PLAZOS_BASE combinado con settings.SLA_SEGUIMIENTO_DIAS"""
+    return {**PLAZOS_BASE, **getattr(settings, 'SLA_SEGUIMIENTO_DIAS', {})}
+
+
+def calcular_fecha_vencimiento(seguimiento, plazos=None):
+    """
+    Fecha límite del primer paso pendiente: la fecha del último paso completado
+    (o la de creación) más el plazo de ese paso. None si el seguimiento no está
+    en un estado de ESTADOS_SLA o ya completó todos los pasos
+    """
+    if seguimiento.estado not in ESTADOS_SLA:
+        return None
+    pendientes = [paso for paso in SeguimientoSocio.PASOS if not getattr(seguimiento, paso)]
+    if not pendientes:
+        return None
+    fechas = [
+        getattr(seguimiento, campo) for paso, campo in SeguimientoSocio.FECHAS_PASOS.items()
+        if getattr(seguimiento, paso) and getattr(seguimiento, campo)
+    ]
+    if fechas:
+        inicio = max(fechas)
+    elif seguimiento.fecha_creacion:
+        inicio = timezone.localdate(seguimiento.fecha_creacion)
+    else:
+        inicio = timezone.localdate()
+    return inicio + timedelta(days=(plazos or plazos_sla())[pendientes[0]])
+
+
+class SeguimientoSocioQuerySet(models.QuerySet):
+
+    def con_pasos(self, *pasos):
+        """
+        Seguimientos que tienen completos todos los pasos dados (y cualquier
+        otro). Filtra por IN sobre las máscaras posibles para usar el índice
+        """
+        mascara = mascara_pasos(*pasos)
+        posibles = [valor for valor in range(1 << len(SeguimientoSocio.PASOS)) if valor & mascara == mascara]
+        return self.filter(pasos_mascara__in=posibles)
+
+    def recalcular_pasos(self):
+        """
+        Actualiza pasos_mascara y pasos_completados en una sola consulta, después
+        de un update() o bulk_update() que cambie los pasos sin pasar por save()
+        """
+        actualizados = self.update(**expresiones_pasos())
+        if actualizados:
+            # update() no emite post_save: los ETags del seguimiento deben cambiar
+            invalidar_version(self.model)
+        return actualizados
+
+    def abiertos(self):
+        return self.filter(estado__in=ESTADOS_SLA)
+
+    def vencidos(self, hoy=None):
+        """Con el paso en curso fuera de plazo (índice (estado, fecha_vencimiento))"""
+        return self.abiertos().filter(fecha_vencimiento__lt=hoy or timezone.localdate())
+
+    def por_vencer(self, dias=None, hoy=None):
+        """Con el paso en curso venciendo hoy o en los próximos `dias` (SLA_AVISO_DIAS)"""
+        hoy = hoy or timezone.localdate()
+        if dias is None:
+            dias = getattr(settings, 'SLA_AVISO_DIAS', 3)
+        return self.abiertos().filter(fecha_vencimiento__gte=hoy, fecha_vencimiento__lte=hoy + timedelta(days=dias))
+
+    def recalcular_vencimientos(self, batch_size=500):
+        """
+        Recalcula fecha_vencimiento (después de cambiar los plazos o de un
+        update() masivo de pasos o estados). Devuelve las filas que cambiaron
+        """
+        plazos = plazos_sla()
+        cambiados = []
+        for seguimiento in self.only('pk', 'estado', 'fecha_creacion', 'fecha_vencimiento',
+                                     *SeguimientoSocio.PASOS, *SeguimientoSocio.FECHAS_PASOS.values()).iterator():
+            vencimiento = calcular_fecha_vencimiento(seguimiento, plazos)
+            if vencimiento != seguimiento.fecha_vencimiento:
+                seguimiento.fecha_vencimiento = vencimiento
+                cambiados.append(seguimiento)
+        SeguimientoSocio.objects.bulk_update(cambiados, ['fecha_vencimiento'], batch_size=batch_size)
+        if cambiados:
+            # bulk_update no emite post_save
+            invalidar_version(SeguimientoSocio)
+        return len(cambiados)
+
+
 class SeguimientoSocio(models.Model):
     ESTADO_CHOICES = [
         ('pendiente', 'Pendiente'),
@@ -10,6 +137,25 @@ class SeguimientoSocio(models.Model):
         ('cancelado', 'Cancelado'),
     ]
     
+    # Campos booleanos de los pasos del proceso, en orden
+    PASOS = [
+        'presentacion_negocio',
+        'documentos_enviados',
+        'contrato_enviado',
+        'contrato_firmado',
+        'capacitacion_realizada',
+        'usuario_creado',
+    ]
+    # Fecha en que se completó cada paso
+    FECHAS_PASOS = {
+        'presentacion_negocio': 'fecha_presentacion',
+        'documentos_enviados': 'fecha_envio_documentos',
+        'contrato_enviado': 'fecha_envio_contrato',
+        'contrato_firmado': 'fecha_firma_contrato',
+        'capacitacion_realizada': 'fecha_capacitacion',
+        'usuario_creado': 'fecha_creacion_usuario',
+    }
+    
     socio_potencial = models.CharField(
         max_length=200, 
         verbose_name="Nombre del Socio Potencial"
@@ -88,13 +234,28 @@ class SeguimientoSocio(models.Model):
         default=False, 
         verbose_name="Proceso Completo"
     )
+    # Copia de los pasos para filtrar y ordenar por progreso en SQL; las
+    # mantiene save() (o recalcular_pasos() en las actualizaciones masivas)
+    pasos_mascara = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Pasos Completados (máscara)"
+    )
+    pasos_completados = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Cantidad de Pasos Completados"
+    )
     
     # Información adicional
-    asesor_asignado = models.CharField(
-        max_length=200, 
-        verbose_name="Asesor Asignado", 
+    asesor = models.ForeignKey(
+        'asesores.Asesor',
+        on_delete=models.SET_NULL,
+        null=True,
         blank=True,
-        help_text="Nombre del asesor que atendió este cliente"
+        related_name='seguimientos',
+        verbose_name="Asesor Asignado",
+        help_text="Asesor que atendió este socio potencial"
     )
     telefono = models.CharField(max_length=20, verbose_name="Teléfono", blank=True)
     email = models.EmailField(verbose_name="Email", blank=True)
@@ -107,13 +268,29 @@ class SeguimientoSocio(models.Model):
         verbose_name="Estado"
     )
     
-    fecha_creacion = models.DateTimeField(auto_now_add=True)
-    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    # Plazo del paso en curso (ver calcular_fecha_vencimiento); lo mantiene save()
+    fecha_vencimiento = models.DateField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Vencimiento del Paso Actual"
+    )
+    
+    fecha_creacion = models.DateTimeField(auto_now_add=True, db_index=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True, db_index=True)
+    
+    objects = SeguimientoSocioQuerySet.as_manager()
     
     class Meta:
         verbose_name = "Seguimiento de Socio"
         verbose_name_plural = "Seguimiento de Socios"
         ordering = ['-fecha_actualizacion']
+        indexes = [
+            models.Index(fields=['pasos_completados', 'fecha_actualizacion'], name='seguimiento_progreso'),
+            models.Index(fields=['pasos_mascara'], name='seguimiento_pasos'),
+            models.Index(fields=['estado', 'fecha_vencimiento'], name='seguimiento_sla'),
+            models.Index(fields=['asesor', 'estado', 'fecha_vencimiento'], name='seguimiento_sla_asesor'),
+        ]
     
     def __str__(self):
         return f"Seguimiento: {self.socio_potencial}"
@@ -123,16 +300,26 @@ class SeguimientoSocio(models.Model):
     
     def porcentaje_completado(self):
         """Calcula el porcentaje de completado del proceso"""
-        pasos = [
-            self.presentacion_negocio,
-            self.documentos_enviados,
-            self.contrato_enviado,
-            self.contrato_firmado,
-            self.capacitacion_realizada,
-            self.usuario_creado,
-        ]
-        completados = sum(pasos)
-        return (completados / len(pasos)) * 100
+        return (self.pasos_completados / len(self.PASOS)) * 100
+    
+    def calcular_pasos(self):
+        """Actualiza pasos_mascara y pasos_completados según los booleanos de los pasos"""
+        completos = [paso for paso in self.PASOS if getattr(self, paso)]
+        self.pasos_mascara = mascara_pasos(*completos)
+        self.pasos_completados = len(completos)
+    
+    def etapa_actual(self):
+        """Nombre del primer paso pendiente, o '' si están todos completos"""
+        for paso in self.PASOS:
+            if not getattr(self, paso):
+                return self._meta.get_field(paso).verbose_name
+        return ''
+    
+    def dias_vencido(self):
+        """Días desde el vencimiento del paso en curso (negativo si aún está en plazo)"""
+        if self.fecha_vencimiento is None:
+            return None
+        return (timezone.localdate() - self.fecha_vencimiento).days
     
     def save(self, *args, **kwargs):
         from datetime import date
@@ -201,4 +388,9 @@ class SeguimientoSocio(models.Model):
             if self.estado == 'completado':
                 self.estado = 'en_proceso'
         
+        self.calcular_pasos()
+        self.fecha_vencimiento = calcular_fecha_vencimiento(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & {*self.PASOS, 'estado'}:
+            kwargs['update_fields'] = {*update_fields, 'pasos_mascara', 'pasos_completados', 'fecha_vencimiento'}
         super().save(*args, **kwargs)
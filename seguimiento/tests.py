@@ -1,3 +1,68 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from asesores.models import Asesor
+from .models import SeguimientoSocio
+
+
+def crear_seguimientos(asesores, cantidad, inicio=0):
+    for i in range(inicio, inicio + cantidad):
+        SeguimientoSocio.objects.create(
+            socio_potencial=f'Potencial {i}',
+            asesor=asesores[i % len(asesores)],
+            estado=['pendiente', 'en_proceso', 'completado'][i % 3],
+            presentacion_negocio=i % 2 == 0,
+            documentos_enviados=i % 4 == 0,
+        )
+
+
+class SeguimientoSocioAdminConsultasTest(TestCase):
+    """El listado del admin no debe crecer en consultas con el número de seguimientos ni de asesores"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'clave')
+        cls.asesores = [Asesor.objects.create(nombre=f'Asesor {i}') for i in range(10)]
+        crear_seguimientos(cls.asesores, 5)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:seguimiento_seguimientosocio_changelist')
+
+    def contar(self, url):
+        self.client.get(url)  # sesión y usuario quedan en caché
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(consultas)
+
+    def test_consultas_constantes(self):
+        pocos = self.contar(self.url)
+        crear_seguimientos(self.asesores, 45, inicio=5)
+        self.assertEqual(self.contar(self.url), pocos)
+
+    def test_numero_de_consultas(self):
+        crear_seguimientos(self.asesores, 45, inicio=5)
+        self.client.get(self.url)
+        # Conteo, filas de la página (asesor en el mismo JOIN), las dos del
+        # date_hierarchy y los valores de pasos_completados para su filtro (0 a 6)
+        with self.assertNumQueries(5):
+            self.client.get(self.url)
+
+    def test_filtro_por_paso_y_orden_por_progreso(self):
+        crear_seguimientos(self.asesores, 45, inicio=5)
+        base = self.contar(self.url)
+        self.assertEqual(self.contar(f'{self.url}?paso=documentos_enviados'), base)
+        self.assertEqual(self.contar(f'{self.url}?pasos_completados=2&o=5'), base)
+        respuesta = self.client.get(f'{self.url}?paso=documentos_enviados')
+        self.assertEqual(respuesta.context['cl'].result_count,
+                         SeguimientoSocio.objects.filter(documentos_enviados=True).count())
+
+    def test_filtro_con_valor_invalido(self):
+        respuesta = self.client.get(f'{self.url}?asesor__id__exact=abc')
+        self.assertRedirects(respuesta, f'{self.url}?e=1', fetch_redirect_response=False)
@@ -5,6 +5,7 @@ app_name = 'seguimiento'
 
 urlpatterns = [
     path('', views.SeguimientoSocioListView.as_view(), name='lista'),
+    path('vencidos/', views.SeguimientoVencidosView.as_view(), name='vencidos'),
     path('crear/', views.SeguimientoSocioCreateView.as_view(), name='crear'),
     path('<int:pk>/', views.SeguimientoSocioDetailView.as_view(), name='detalle'),
     path('<int:pk>/editar/', views.SeguimientoSocioUpdateView.as_view(), name='editar'),
@@ -9,26 +9,32 @@ from django.db.models import Q, Count, Avg
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.http import HttpResponse
+from django.conf import settings
 import csv
+from socios.models import SocioComercial
+from asesores.models import Asesor
+from services.conditional import ConditionalGetMixin
 
-class SeguimientoSocioListView(LoginRequiredMixin, ListView):
+class SeguimientoSocioListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = SeguimientoSocio
     template_name = 'seguimiento/lista.html'
     context_object_name = 'seguimientos'
     paginate_by = 20
+    etag_models = [SeguimientoSocio, SocioComercial, Asesor]
+    etag_diario = True
     
     def export_seguimientos_csv(self, request):
         response = HttpResponse(content_type='text/csv')
         response['Content-Disposition'] = 'attachment; filename="seguimientos.csv"'
         writer = csv.writer(response)
         writer.writerow(['ID', 'Socio Potencial', 'Estado', 'Fecha de Creación', 'Fecha de Actualización', 'Asesor Asignado'])
-        seguimientos = SeguimientoSocio.objects.all().values_list('id', 'socio_potencial', 'estado', 'fecha_creacion', 'fecha_actualizacion', 'asesor_asignado')
+        seguimientos = SeguimientoSocio.objects.all().values_list('id', 'socio_potencial', 'estado', 'fecha_creacion', 'fecha_actualizacion', 'asesor__nombre')
         for seguimiento in seguimientos:
             writer.writerow(seguimiento)
         return response
     
     def get_queryset(self):
-        queryset = SeguimientoSocio.objects.select_related('socio_comercial').order_by('-fecha_actualizacion')
+        queryset = SeguimientoSocio.objects.select_related('socio_comercial', 'asesor').order_by('-fecha_actualizacion')
         
         query = self.request.GET.get('q')
         if query:
@@ -46,6 +52,17 @@ class SeguimientoSocioListView(LoginRequiredMixin, ListView):
             queryset = queryset.filter(proceso_completo=True)
         elif proceso == 'pendiente':
             queryset = queryset.filter(proceso_completo=False)
+        
+        # ?paso=contrato_firmado&paso=capacitacion_realizada: con todos esos pasos completos
+        pasos = [paso for paso in self.request.GET.getlist('paso') if paso in SeguimientoSocio.PASOS]
+        if pasos:
+            queryset = queryset.con_pasos(*pasos)
+        
+        orden = self.request.GET.get('orden')
+        if orden == 'progreso':
+            queryset = queryset.order_by('pasos_completados', 'fecha_actualizacion')
+        elif orden == '-progreso':
+            queryset = queryset.order_by('-pasos_completados', '-fecha_actualizacion')
             
         return queryset
     
@@ -54,6 +71,11 @@ class SeguimientoSocioListView(LoginRequiredMixin, ListView):
         context['query'] = self.request.GET.get('q', '')
         context['estado'] = self.request.GET.get('estado', '')
         context['proceso'] = self.request.GET.get('proceso', '')
+        context['paso'] = self.request.GET.get('paso', '')
+        context['orden'] = self.request.GET.get('orden', '')
+        context['pasos'] = [
+            (paso, SeguimientoSocio._meta.get_field(paso).verbose_name) for paso in SeguimientoSocio.PASOS
+        ]
         context['estados'] = SeguimientoSocio.ESTADO_CHOICES
         
         # Calcular estadísticas
@@ -182,20 +204,10 @@ class SeguimientoSocioListView(LoginRequiredMixin, ListView):
             if count_con_fechas > 0:
                 metricas_tiempo['promedio_dias'] = round(dias_totales / count_con_fechas, 1)
         
-        # Seguimientos "vencidos" (en proceso por más de 45 días)
-        hace_45_dias = ahora - timedelta(days=45)
-        metricas_tiempo['vencidos'] = todos_seguimientos.filter(
-            estado='en_proceso',
-            fecha_creacion__lt=hace_45_dias
-        ).count()
-        
-        # Próximos a vencer (en proceso por más de 30 días)
-        hace_30_dias = ahora - timedelta(days=30)
-        metricas_tiempo['proximos_vencer'] = todos_seguimientos.filter(
-            estado='en_proceso',
-            fecha_creacion__lt=hace_30_dias,
-            fecha_creacion__gte=hace_45_dias
-        ).count()
+        # Seguimientos con el paso en curso fuera de plazo y próximos a vencer
+        # (SLA por paso, sobre el índice (estado, fecha_vencimiento))
+        metricas_tiempo['vencidos'] = todos_seguimientos.vencidos().count()
+        metricas_tiempo['proximos_vencer'] = todos_seguimientos.por_vencer().count()
         
         return {
             'estadisticas': {
@@ -207,6 +219,51 @@ class SeguimientoSocioListView(LoginRequiredMixin, ListView):
             }
         }
 
+class SeguimientoVencidosView(LoginRequiredMixin, ConditionalGetMixin, ListView):
+    """
+    Cola de seguimientos con el paso en curso vencido, del más atrasado al más
+    reciente, filtrable por asesor (?asesor=<id>) y con los por vencer (?incluir=proximos)
+    """
+    model = SeguimientoSocio
+    template_name = 'seguimiento/vencidos.html'
+    context_object_name = 'seguimientos'
+    paginate_by = 50
+    etag_models = [SeguimientoSocio, Asesor]
+    etag_diario = True
+    
+    def get_queryset(self):
+        if self.request.GET.get('incluir') == 'proximos':
+            queryset = SeguimientoSocio.objects.abiertos().filter(
+                fecha_vencimiento__lte=timezone.localdate() + timedelta(days=settings.SLA_AVISO_DIAS)
+            )
+        else:
+            queryset = SeguimientoSocio.objects.vencidos()
+        # ?asesor=<id>, o ?asesor=sin para los que no tienen asesor
+        asesor = self.request.GET.get('asesor')
+        if asesor == 'sin':
+            queryset = queryset.filter(asesor__isnull=True)
+        elif asesor and asesor.isdigit():
+            queryset = queryset.filter(asesor_id=asesor)
+        return queryset.select_related('socio_comercial', 'asesor').order_by('fecha_vencimiento', 'pk')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['asesor'] = self.request.GET.get('asesor')
+        if context['asesor'] == 'sin':
+            context['asesor_elegido'] = 'Sin asesor'
+        elif context['asesor'] and context['asesor'].isdigit():
+            context['asesor_elegido'] = Asesor.objects.filter(pk=context['asesor']).first()
+        context['incluir'] = self.request.GET.get('incluir', '')
+        context['aviso_dias'] = settings.SLA_AVISO_DIAS
+        # Vencidos por asesor para el resumen y el filtro
+        context['por_asesor'] = (
+            SeguimientoSocio.objects.vencidos()
+            .values('asesor', 'asesor__nombre')
+            .annotate(vencidos=Count('id'))
+            .order_by('-vencidos', 'asesor__nombre')
+        )
+        return context
+
 class SeguimientoSocioCreateView(LoginRequiredMixin, CreateView):
     model = SeguimientoSocio
     form_class = SeguimientoSocioForm
@@ -217,10 +274,11 @@ class SeguimientoSocioCreateView(LoginRequiredMixin, CreateView):
         messages.success(self.request, 'Seguimiento creado exitosamente.')
         return super().form_valid(form)
 
-class SeguimientoSocioDetailView(LoginRequiredMixin, DetailView):
+class SeguimientoSocioDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = SeguimientoSocio
     template_name = 'seguimiento/detalle.html'
     context_object_name = 'seguimiento'
+    etag_models = [SeguimientoSocio, SocioComercial, Asesor]
 
 class SeguimientoSocioUpdateView(LoginRequiredMixin, UpdateView):
     model = SeguimientoSocio
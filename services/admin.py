@@ -0,0 +1,78 @@
+from django.contrib import admin
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html
+from .models import EnvioSMS, PerfilPeticion
+
+
+@admin.register(PerfilPeticion)
+class PerfilPeticionAdmin(admin.ModelAdmin):
+    list_display = ['ruta', 'vista', 'metodo', 'codigo_estado', 'motivo', 'duracion_display',
+                    'num_consultas', 'tiempo_sql_display', 'fecha_creacion']
+    list_filter = ['motivo', 'metodo', 'vista']
+    search_fields = ['ruta', 'vista', 'usuario']
+    date_hierarchy = 'fecha_creacion'
+    exclude = ['datos_cprofile']
+    readonly_fields = ['ruta', 'vista', 'metodo', 'codigo_estado', 'motivo', 'duracion', 'num_consultas',
+                       'tiempo_sql', 'usuario', 'fecha_creacion', 'descargas', 'consultas_sql',
+                       'resumen_cprofile', 'pila_colapsada']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path('<int:pk>/pilas.folded', self.admin_site.admin_view(self.descargar_pilas),
+                 name='services_perfilpeticion_pilas'),
+            path('<int:pk>/perfil.prof', self.admin_site.admin_view(self.descargar_cprofile),
+                 name='services_perfilpeticion_cprofile'),
+        ]
+        return urls + super().get_urls()
+
+    def descargar_pilas(self, request, pk):
+        """Pilas colapsadas para flamegraph.pl / speedscope"""
+        perfil = get_object_or_404(PerfilPeticion, pk=pk)
+        response = HttpResponse(perfil.pila_colapsada, content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="perfil_{pk}.folded"'
+        return response
+
+    def descargar_cprofile(self, request, pk):
+        """Datos pstats para snakeviz / python -m pstats"""
+        perfil = get_object_or_404(PerfilPeticion, pk=pk)
+        if not perfil.datos_cprofile:
+            raise Http404("Este perfil no tiene datos de cProfile.")
+        response = HttpResponse(bytes(perfil.datos_cprofile), content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="perfil_{pk}.prof"'
+        return response
+
+    def descargas(self, obj):
+        enlaces = [format_html('<a href="{}">Pilas (.folded)</a>',
+                               reverse('admin:services_perfilpeticion_pilas', args=[obj.pk]))]
+        if obj.datos_cprofile:
+            enlaces.append(format_html('<a href="{}">cProfile (.prof)</a>',
+                                       reverse('admin:services_perfilpeticion_cprofile', args=[obj.pk])))
+        return format_html(' | '.join(['{}'] * len(enlaces)), *enlaces)
+    descargas.short_description = 'Descargas'
+
+    def duracion_display(self, obj):
+        return f"{obj.duracion:.3f}s"
+    duracion_display.short_description = 'Duración'
+    duracion_display.admin_order_field = 'duracion'
+
+    def tiempo_sql_display(self, obj):
+        return f"{obj.tiempo_sql:.3f}s"
+    tiempo_sql_display.short_description = 'Tiempo SQL'
+    tiempo_sql_display.admin_order_field = 'tiempo_sql'
+
+
+@admin.register(EnvioSMS)
+class EnvioSMSAdmin(admin.ModelAdmin):
+    list_display = ['to_number', 'proveedor', 'estado', 'intentos', 'proximo_intento', 'ultimo_error', 'fecha_creacion']
+    list_filter = ['estado', 'proveedor']
+    search_fields = ['to_number', 'message_id']
+    readonly_fields = ['intentos', 'lote', 'reclamado_en', 'message_id', 'ultimo_error',
+                       'fecha_creacion', 'fecha_actualizacion']
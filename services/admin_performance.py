@@ -0,0 +1,174 @@
+"""
+Utilidades para listados del admin con tablas grandes
+
+- FiltroAutocompletar: filtro por llave foránea con el buscador de Django
+  (autocomplete) en lugar de una opción por cada registro relacionado
+- FiltroTexto: filtro por texto libre para campos con muchos valores distintos
+  (ciudad), en lugar de un SELECT DISTINCT en cada carga
+- PaginadorEstimado: sin filtros usa el conteo estimado de la base de datos en
+  lugar de COUNT(*) sobre toda la tabla
+- AdminRendimientoMixin: show_full_result_count=False, el paginador estimado y
+  los archivos de select2 que necesitan los filtros
+"""
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+# Por debajo de este número de filas estimadas se cuenta exacto (es barato)
+UMBRAL_ESTIMACION = 10000
+
+
+def conteo_estimado(model):
+    """Filas de la tabla según las estadísticas del motor, o None si no las tiene"""
+    tabla = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [tabla])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [tabla]
+            )
+        else:
+            return None
+        fila = cursor.fetchone()
+    return int(fila[0]) if fila and fila[0] is not None and fila[0] >= 0 else None
+
+
+class PaginadorEstimado(Paginator):
+    """Paginator que no cuenta toda la tabla cuando el listado no tiene filtros"""
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if hasattr(queryset, 'query') and not queryset.query.where:
+            estimado = conteo_estimado(queryset.model)
+            if estimado is not None and estimado > UMBRAL_ESTIMACION:
+                return estimado
+        return super().count
+
+
+class FiltroAutocompletar(admin.SimpleListFilter):
+    """
+    Filtro por una llave foránea usando la vista de autocompletado del admin.
+    El modelo relacionado debe tener un ModelAdmin con search_fields.
+
+    Uso: FiltroAutocompletar.para('socio_comercial', 'Socio Comercial')
+    """
+    template = 'admin/filtro_autocompletar.html'
+    campo = None
+
+    @classmethod
+    def para(cls, campo, titulo):
+        return type(f'FiltroAutocompletar_{campo}', (cls,), {
+            'campo': campo,
+            'title': titulo,
+            'parameter_name': f'{campo}__id__exact',
+        })
+
+    def lookups(self, request, model_admin):
+        # Las opciones las trae el navegador a medida que se escribe
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            pk = self._pk(queryset.model)
+            if pk is None:
+                # Igual que el filtro de Django: el listado redirige con ?e=1
+                raise IncorrectLookupParameters(f'Valor inválido para {self.parameter_name}')
+            return queryset.filter(**{self.parameter_name: pk})
+        return queryset
+
+    def choices(self, changelist):
+        # El template usa la URL sin el parámetro para "Todos" y para armar la del valor elegido
+        yield {
+            'url_todos': changelist.get_query_string(remove=[self.parameter_name]),
+            'parametro': self.parameter_name,
+            'valor': self.value() or '',
+            'etiqueta': self._etiqueta(changelist.model),
+            'app_label': changelist.model._meta.app_label,
+            'model_name': changelist.model._meta.model_name,
+            'campo': self.campo,
+        }
+
+    def _relacionado(self, model):
+        return model._meta.get_field(self.campo).related_model
+
+    def _pk(self, model):
+        """El valor del parámetro convertido al tipo de la llave, o None si no es válido"""
+        try:
+            return self._relacionado(model)._meta.pk.to_python(self.value())
+        except (ValidationError, ValueError, TypeError):
+            return None
+
+    def _etiqueta(self, model):
+        pk = self._pk(model) if self.value() else None
+        if pk is None:
+            return ''
+        objeto = self._relacionado(model)._default_manager.filter(pk=pk).first()
+        return str(objeto) if objeto is not None else ''
+
+
+class FiltroTexto(admin.SimpleListFilter):
+    """
+    Filtro por texto (coincidencia parcial, sin distinguir mayúsculas)
+
+    Uso: FiltroTexto.para('ciudad', 'Ciudad')
+    """
+    template = 'admin/filtro_texto.html'
+    campo = None
+
+    @classmethod
+    def para(cls, campo, titulo):
+        return type(f'FiltroTexto_{campo}', (cls,), {
+            'campo': campo,
+            'title': titulo,
+            'parameter_name': f'{campo}__icontains',
+        })
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.parameter_name: self.value()})
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'url_todos': changelist.get_query_string(remove=[self.parameter_name]),
+            'parametro': self.parameter_name,
+            'valor': self.value() or '',
+            # Los demás parámetros del listado (filtros, búsqueda, orden) se
+            # conservan como campos ocultos; la página vuelve a la primera
+            'otros': [
+                (clave, valor)
+                for clave, valores in changelist.params.items() if clave not in (self.parameter_name, 'p')
+                for valor in valores
+            ],
+        }
+
+
+class AdminRendimientoMixin:
+    """Opciones comunes de los ModelAdmin con muchas filas"""
+    show_full_result_count = False
+    paginator = PaginadorEstimado
+
+    class Media:
+        css = {'all': ['admin/css/vendor/select2/select2.min.css', 'admin/css/autocomplete.css']}
+        js = [
+            'admin/js/vendor/jquery/jquery.min.js',
+            'admin/js/vendor/select2/select2.full.min.js',
+            'admin/js/jquery.init.js',
+            'admin/js/autocomplete.js',
+            'js/filtro_autocompletar.js',
+        ]
@@ -0,0 +1,427 @@
+"""
+API JSON para integraciones
+Lectura desde values() (sin instanciar modelos), selección de campos con
+?fields=, paginación por keyset sobre el id, filtros equivalentes a los de las
+vistas de lista y creación/actualización masiva.
+"""
+import copy
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.forms import modelform_factory
+from django.forms.models import model_to_dict
+from django.http import HttpResponse, JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from clientes.models import Cliente, CupoCredito
+from seguimiento.models import SeguimientoSocio
+from socios.models import SocioComercial
+from . import ventas_diarias
+from .conditional import invalidar_version
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_BULK_ITEMS = 1000
+
+
+class ApiResource:
+    """Configuración de un recurso expuesto por la API"""
+    model = None
+    # Campos que se pueden leer (y pedir con ?fields=)
+    fields = []
+    # Campos que acepta la escritura
+    writable_fields = []
+    # True si el modelo tiene lógica en save() que bulk_create/bulk_update saltarían
+    usar_save = False
+
+    def filtrar(self, queryset, params):
+        return queryset
+
+    def lote_guardado(self, objetos, anteriores=()):
+        """
+        Después de un bulk_create/bulk_update (que no emiten señales);
+        `anteriores` son copias de los objetos antes de la actualización
+        """
+        invalidar_version(self.model)
+
+
+class ClienteResource(ApiResource):
+    model = Cliente
+    fields = ['id', 'nombre', 'cedula', 'fecha_compra', 'valor_compra', 'socio_comercial',
+              'telefono', 'email', 'ciudad', 'observaciones', 'fecha_creacion', 'fecha_actualizacion']
+    writable_fields = ['nombre', 'cedula', 'fecha_compra', 'valor_compra', 'socio_comercial',
+                       'telefono', 'email', 'ciudad', 'observaciones']
+
+    def filtrar(self, queryset, params):
+        # Igual que ClienteListView
+        query = params.get('q')
+        if query:
+            queryset = queryset.filter(
+                Q(nombre__icontains=query) |
+                Q(cedula__icontains=query) |
+                Q(socio_comercial__nombre__icontains=query)
+            )
+        socio = params.get('socio_comercial')
+        if socio:
+            queryset = queryset.filter(socio_comercial_id=socio)
+        return queryset
+
+    def lote_guardado(self, objetos, anteriores=()):
+        super().lote_guardado(objetos, anteriores)
+        # Un mismo id repetido en el PATCH llega dos veces como el mismo objeto
+        ventas_diarias.registrar_lote({obj.pk: obj for obj in objetos}.values(), anteriores)
+
+
+class CupoCreditoResource(ApiResource):
+    model = CupoCredito
+    fields = ['id', 'nombre', 'tipo_documento', 'numero_documento', 'ciudad', 'valor_aprobado', 'telefono',
+              'email', 'fecha_aprobacion', 'observaciones', 'estado', 'score_crediticio',
+              'categoria_crediticia', 'fecha_consulta_credito', 'fecha_creacion', 'fecha_actualizacion']
+    writable_fields = ['nombre', 'tipo_documento', 'numero_documento', 'ciudad', 'valor_aprobado', 'telefono',
+                       'email', 'fecha_aprobacion', 'observaciones', 'estado']
+
+    def filtrar(self, queryset, params):
+        # Igual que CupoCreditoListView
+        query = params.get('q')
+        if query:
+            queryset = queryset.filter(Q(nombre__icontains=query) | Q(ciudad__icontains=query))
+        return queryset
+
+
+class SocioComercialResource(ApiResource):
+    model = SocioComercial
+    fields = ['id', 'nombre', 'fecha_ingreso', 'ciudad_sede', 'activo', 'asesor',
+              'telefono', 'email', 'fecha_creacion', 'fecha_actualizacion']
+    writable_fields = ['nombre', 'fecha_ingreso', 'ciudad_sede', 'activo', 'asesor',
+                       'telefono', 'email']
+    usar_save = True
+
+    def filtrar(self, queryset, params):
+        # Igual que SocioComercialListView
+        query = params.get('q')
+        if query:
+            queryset = queryset.filter(Q(nombre__icontains=query) | Q(ciudad_sede__icontains=query))
+        activo = params.get('activo')
+        if activo == 'true':
+            queryset = queryset.filter(activo=True)
+        elif activo == 'false':
+            queryset = queryset.filter(activo=False)
+        return queryset
+
+
+class SeguimientoSocioResource(ApiResource):
+    model = SeguimientoSocio
+    fields = ['id', 'socio_potencial', 'socio_comercial', 'asesor', 'estado',
+              'presentacion_negocio', 'fecha_presentacion', 'documentos_enviados', 'fecha_envio_documentos',
+              'contrato_enviado', 'fecha_envio_contrato', 'contrato_firmado', 'fecha_firma_contrato',
+              'capacitacion_realizada', 'fecha_capacitacion', 'usuario_creado', 'fecha_creacion_usuario',
+              'proceso_completo', 'pasos_mascara', 'pasos_completados', 'telefono', 'email', 'ciudad',
+              'observaciones', 'fecha_creacion', 'fecha_actualizacion']
+    writable_fields = ['socio_potencial', 'socio_comercial', 'asesor', 'estado',
+                       'presentacion_negocio', 'fecha_presentacion', 'documentos_enviados',
+                       'fecha_envio_documentos', 'contrato_enviado', 'fecha_envio_contrato',
+                       'contrato_firmado', 'fecha_firma_contrato', 'capacitacion_realizada',
+                       'fecha_capacitacion', 'usuario_creado', 'fecha_creacion_usuario',
+                       'telefono', 'email', 'ciudad', 'observaciones']
+    # save() asigna fechas de los pasos y recalcula proceso_completo/estado
+    usar_save = True
+
+    def filtrar(self, queryset, params):
+        # Igual que SeguimientoSocioListView
+        query = params.get('q')
+        if query:
+            queryset = queryset.filter(Q(socio_potencial__icontains=query) | Q(ciudad__icontains=query))
+        estado = params.get('estado')
+        if estado:
+            queryset = queryset.filter(estado=estado)
+        proceso = params.get('proceso')
+        if proceso == 'completo':
+            queryset = queryset.filter(proceso_completo=True)
+        elif proceso == 'pendiente':
+            queryset = queryset.filter(proceso_completo=False)
+        pasos = [paso for paso in params.getlist('paso') if paso in SeguimientoSocio.PASOS]
+        if pasos:
+            queryset = queryset.con_pasos(*pasos)
+        return queryset
+
+
+RESOURCES = {
+    'clientes': ClienteResource(),
+    'cupos': CupoCreditoResource(),
+    'socios': SocioComercialResource(),
+    'seguimientos': SeguimientoSocioResource(),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, errors=None):
+        super().__init__(message)
+        self.status = status
+        self.errors = errors
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class ApiView(View):
+    """
+    Base de las vistas de la API: autenticación por sesión (con CSRF en
+    escrituras) o por 'Authorization: Bearer <token>' de API_TOKENS
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.autenticar(request)
+            self.resource = RESOURCES.get(kwargs.pop('recurso'))
+            if self.resource is None:
+                raise ApiError('Recurso no encontrado', status=404)
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as exc:
+            data = {'error': str(exc)}
+            if exc.errors is not None:
+                data['errors'] = exc.errors
+            return JsonResponse(data, status=exc.status)
+
+    def autenticar(self, request):
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        if authorization.startswith('Bearer '):
+            if any(constant_time_compare(authorization[7:], token) for token in getattr(settings, 'API_TOKENS', [])):
+                return
+            raise ApiError('Token inválido', status=401)
+
+        if not request.user.is_authenticated:
+            raise ApiError('Autenticación requerida', status=401)
+
+        if request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            rechazo = CsrfViewMiddleware(lambda r: None).process_view(request, None, (), {})
+            if rechazo is not None:
+                raise ApiError('Token CSRF inválido', status=403)
+
+    def campos_solicitados(self, request):
+        fields = request.GET.get('fields')
+        if not fields:
+            return self.resource.fields
+        solicitados = [f.strip() for f in fields.split(',') if f.strip()]
+        desconocidos = [f for f in solicitados if f not in self.resource.fields]
+        if desconocidos:
+            raise ApiError(f'Campos no disponibles: {", ".join(desconocidos)}')
+        if 'id' not in solicitados:
+            solicitados.insert(0, 'id')
+        return solicitados
+
+    def leer_json(self, request):
+        try:
+            return json.loads(request.body or b'null')
+        except ValueError:
+            raise ApiError('JSON inválido')
+
+    def formulario(self, data, instance=None):
+        form_class = modelform_factory(self.resource.model, fields=self.resource.writable_fields)
+        if instance is not None:
+            # Escritura parcial: los campos no enviados conservan su valor actual
+            data = {**model_to_dict(instance, fields=self.resource.writable_fields), **data}
+        return form_class(data=data, instance=instance)
+
+    def serializar(self, pks, fields):
+        queryset = self.resource.model.objects.filter(pk__in=pks).order_by('pk')
+        return list(queryset.values(*fields))
+
+
+class ApiListView(ApiView):
+    """
+    GET: lista paginada por keyset (?after=<id>&limit=<n>)
+    POST: crea un objeto o una lista de objetos
+    PATCH: actualiza una lista de objetos (cada uno con su 'id')
+    """
+
+    def get(self, request, *args, **kwargs):
+        fields = self.campos_solicitados(request)
+        try:
+            limit = min(int(request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+            after = int(request.GET['after']) if request.GET.get('after') else None
+        except ValueError:
+            raise ApiError('Los parámetros limit y after deben ser enteros')
+        if limit < 1:
+            raise ApiError('El parámetro limit debe ser mayor que cero')
+
+        queryset = self.resource.filtrar(self.resource.model.objects.all(), request.GET)
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+        # Se pide una fila extra para saber si hay página siguiente sin hacer COUNT
+        filas = list(queryset.order_by('pk').values(*fields)[:limit + 1])
+
+        siguiente = None
+        if len(filas) > limit:
+            filas = filas[:limit]
+            params = request.GET.copy()
+            params['after'] = filas[-1]['id']
+            siguiente = f'{request.path}?{params.urlencode()}'
+
+        return JsonResponse({'results': filas, 'next': siguiente})
+
+    def post(self, request, *args, **kwargs):
+        payload = self.leer_json(request)
+        items = payload if isinstance(payload, list) else [payload]
+        self.validar_lote(items)
+
+        formularios = [self.formulario(item) for item in items]
+        errores = {i: form.errors.get_json_data() for i, form in enumerate(formularios) if not form.is_valid()}
+        if errores:
+            raise ApiError('Datos inválidos', errors=errores)
+
+        def guardar():
+            # Sin RETURNING (MySQL) bulk_create no asigna los ids que se devuelven
+            if self.resource.usar_save or not connection.features.can_return_rows_from_bulk_insert:
+                return [form.save() for form in formularios]
+            objetos = self.resource.model.objects.bulk_create(
+                [form.save(commit=False) for form in formularios]
+            )
+            # bulk_create no emite post_save
+            self.resource.lote_guardado(objetos)
+            return objetos
+
+        objetos = self.guardar_lote(formularios, guardar)
+        resultados = self.serializar([obj.pk for obj in objetos], self.campos_solicitados(request))
+        return JsonResponse({'results': resultados}, status=201)
+
+    def patch(self, request, *args, **kwargs):
+        items = self.leer_json(request)
+        if not isinstance(items, list):
+            raise ApiError('Se esperaba una lista de objetos con "id"')
+        self.validar_lote(items)
+
+        try:
+            ids = [int(item['id']) for item in items]
+        except (KeyError, TypeError, ValueError):
+            raise ApiError('Cada objeto debe incluir un "id" entero')
+
+        instancias = self.resource.model.objects.in_bulk(ids)
+        faltantes = [pk for pk in ids if pk not in instancias]
+        if faltantes:
+            raise ApiError(f'No existen: {faltantes}', status=404)
+        # Los formularios modifican las instancias al validar
+        anteriores = [copy.copy(instancia) for instancia in instancias.values()]
+
+        formularios = [
+            self.formulario({k: v for k, v in item.items() if k != 'id'}, instance=instancias[pk])
+            for pk, item in zip(ids, items)
+        ]
+        errores = {i: form.errors.get_json_data() for i, form in enumerate(formularios) if not form.is_valid()}
+        if errores:
+            raise ApiError('Datos inválidos', errors=errores)
+
+        def guardar():
+            if self.resource.usar_save:
+                for form in formularios:
+                    form.save()
+                return
+            objetos = [form.save(commit=False) for form in formularios]
+            # bulk_update no aplica auto_now: la fecha de actualización se asigna a mano
+            ahora = timezone.now()
+            for obj in objetos:
+                obj.fecha_actualizacion = ahora
+            self.resource.model.objects.bulk_update(
+                objetos, self.resource.writable_fields + ['fecha_actualizacion'], batch_size=500
+            )
+            # bulk_update no emite post_save
+            self.resource.lote_guardado(objetos, anteriores)
+
+        self.guardar_lote(formularios, guardar)
+        return JsonResponse({'results': self.serializar(ids, self.campos_solicitados(request))})
+
+    def errores_unicos(self, formularios):
+        """
+        {índice: errores} de los objetos del lote que repiten el valor de un
+        campo único (p. ej. la cédula) entre sí o con otro registro guardado.
+        Cada formulario ya valida contra la base de datos, pero no contra el
+        resto del lote
+        """
+        model = self.resource.model
+        errores = {}
+        for nombre in self.resource.writable_fields:
+            campo = model._meta.get_field(nombre)
+            if not campo.unique:
+                continue
+            vistos = {}
+            for i, form in enumerate(formularios):
+                valor = form.cleaned_data.get(nombre)
+                if valor in (None, ''):
+                    continue
+                if valor not in vistos:
+                    vistos[valor] = i
+                elif form.instance.pk is None or form.instance.pk != formularios[vistos[valor]].instance.pk:
+                    # Un mismo id repetido en un PATCH no es un duplicado
+                    errores.setdefault(i, {})[nombre] = [{
+                        'message': f'{campo.verbose_name}: el valor se repite en el objeto {vistos[valor]} del lote.',
+                        'code': 'unique',
+                    }]
+            propios = [form.instance.pk for form in formularios if form.instance.pk is not None]
+            existentes = set(
+                model.objects.filter(**{f'{nombre}__in': list(vistos)}).exclude(pk__in=propios)
+                .values_list(nombre, flat=True)
+            )
+            for valor in existentes:
+                errores.setdefault(vistos[valor], {})[nombre] = [{
+                    'message': f'{campo.verbose_name}: ya existe un registro con este valor.', 'code': 'unique',
+                }]
+        return errores
+
+    def guardar_lote(self, formularios, guardar):
+        """
+        Valida los campos únicos del lote y ejecuta `guardar` en una
+        transacción; un IntegrityError (p. ej. otra petición guardó la misma
+        cédula al tiempo) se responde como 400 con los objetos en conflicto
+        """
+        errores = self.errores_unicos(formularios)
+        if errores:
+            raise ApiError('Datos inválidos', errors=errores)
+        try:
+            with transaction.atomic():
+                return guardar()
+        except IntegrityError as exc:
+            raise ApiError('Conflicto al guardar el lote', errors=self.errores_unicos(formularios) or {'lote': str(exc)})
+
+    def validar_lote(self, items):
+        if not items or not all(isinstance(item, dict) for item in items):
+            raise ApiError('Se esperaba un objeto o una lista de objetos')
+        if len(items) > MAX_BULK_ITEMS:
+            raise ApiError(f'Máximo {MAX_BULK_ITEMS} objetos por petición')
+
+
+class ApiDetailView(ApiView):
+    """GET / PATCH (escritura parcial) / DELETE de un objeto"""
+
+    def get_instance(self, pk):
+        instance = self.resource.model.objects.filter(pk=pk).first()
+        if instance is None:
+            raise ApiError('Objeto no encontrado', status=404)
+        return instance
+
+    def get(self, request, pk, *args, **kwargs):
+        filas = list(self.resource.model.objects.filter(pk=pk).values(*self.campos_solicitados(request)))
+        if not filas:
+            raise ApiError('Objeto no encontrado', status=404)
+        return JsonResponse(filas[0])
+
+    def patch(self, request, pk, *args, **kwargs):
+        data = self.leer_json(request)
+        if not isinstance(data, dict):
+            raise ApiError('Se esperaba un objeto')
+        form = self.formulario(data, instance=self.get_instance(pk))
+        if not form.is_valid():
+            raise ApiError('Datos inválidos', errors=form.errors.get_json_data())
+        try:
+            with transaction.atomic():
+                form.save()
+        except IntegrityError as exc:
+            raise ApiError('Conflicto al guardar', errors={'objeto': str(exc)})
+        return self.get(request, pk)
+
+    def delete(self, request, pk, *args, **kwargs):
+        self.get_instance(pk).delete()
+        return HttpResponse(status=204)
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<str:recurso>/', api.ApiListView.as_view(), name='lista'),
+    path('<str:recurso>/<int:pk>/', api.ApiDetailView.as_view(), name='detalle'),
+]
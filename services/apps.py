@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+
+
+class ServicesConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'services'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save, pre_save
+        from asesores.models import Asesor
+        from clientes.models import Cliente, CupoCredito
+        from seguimiento.models import SeguimientoSocio
+        from socios.models import SocioComercial
+        from .conditional import invalidar_version_receiver
+        from . import ventas_diarias
+
+        # Versiones por modelo usadas por los ETags de listas, detalles y exportaciones
+        for model in (Cliente, CupoCredito, SocioComercial, SeguimientoSocio, Asesor):
+            post_save.connect(invalidar_version_receiver, sender=model, dispatch_uid=f'version_{model._meta.label_lower}_save')
+            post_delete.connect(invalidar_version_receiver, sender=model, dispatch_uid=f'version_{model._meta.label_lower}_delete')
+
+        # Agregado diario de ventas para las gráficas del dashboard
+        pre_save.connect(ventas_diarias.venta_guardada_receiver, sender=Cliente, dispatch_uid='ventas_diarias_pre_save')
+        post_save.connect(ventas_diarias.cliente_guardado_receiver, sender=Cliente, dispatch_uid='ventas_diarias_save')
+        post_delete.connect(ventas_diarias.cliente_borrado_receiver, sender=Cliente, dispatch_uid='ventas_diarias_delete')
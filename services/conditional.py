@@ -0,0 +1,145 @@
+"""
+Peticiones condicionales (ETag / 304 Not Modified)
+Cada modelo tiene una versión guardada en la caché compartida que cambia en
+cada escritura (señales post_save/post_delete y las rutas masivas de la API).
+El ETag de una página combina las versiones de los modelos que muestra, de modo
+que una recarga sin cambios responde 304 sin ejecutar las consultas pesadas.
+"""
+import functools
+import hashlib
+import os
+import uuid
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.db import transaction
+from django.template import engines
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+VERSION_KEY = 'version_modelo:{label}'
+
+_token_plantillas = None
+
+
+def _version_key(model):
+    return VERSION_KEY.format(label=model._meta.label_lower)
+
+
+def obtener_version(model):
+    """Versión actual del modelo; si no está en caché se genera una nueva"""
+    key = _version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def invalidar_version(model):
+    """
+    Marca el modelo como modificado (invalida todos los ETags que dependen de él).
+    Se aplica al confirmar la transacción: antes, otra petición aún lee los datos
+    anteriores y no debe asociarlos a la versión nueva.
+    """
+    key = _version_key(model)
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, None))
+
+
+def invalidar_version_receiver(sender, **kwargs):
+    """Receptor de post_save/post_delete"""
+    invalidar_version(sender)
+
+
+def directorios_plantillas():
+    """
+    Directorios que recorren los loaders de los motores de plantillas: DIRS
+    y los templates/ de cada aplicación (APP_DIRS)
+    """
+    directorios = []
+    for motor in engines.all():
+        for loader in getattr(getattr(motor, 'engine', None), 'template_loaders', []):
+            if hasattr(loader, 'get_dirs'):
+                directorios.extend(str(directorio) for directorio in loader.get_dirs())
+    return list(dict.fromkeys(directorios))
+
+
+def token_plantillas():
+    """
+    Huella de las plantillas del proyecto y de las aplicaciones, para que un
+    despliegue que cambia el HTML no siga respondiendo 304 con las versiones
+    de datos anteriores
+    """
+    global _token_plantillas
+    if _token_plantillas is None:
+        huella = hashlib.sha1()
+        for directorio in directorios_plantillas():
+            for raiz, subdirectorios, archivos in os.walk(directorio):
+                subdirectorios.sort()
+                for nombre in sorted(archivos):
+                    ruta = os.path.join(raiz, nombre)
+                    stat = os.stat(ruta)
+                    huella.update(f'{ruta}:{stat.st_mtime_ns}:{stat.st_size}'.encode())
+        _token_plantillas = huella.hexdigest()[:12]
+    return _token_plantillas
+
+
+def etag_por_modelos(*models, diario=False):
+    """
+    Construye la función de ETag para django.views.decorators.http.condition
+
+    Args:
+        models: Modelos cuyos datos aparecen en la respuesta
+        diario: True si la respuesta depende de la fecha actual
+                (estadísticas del mes, últimos 30 días, vencimientos)
+    """
+    def etag_func(request, *args, **kwargs):
+        # Mensajes pendientes (p. ej. "Cliente creado") deben renderizarse
+        if len(messages.get_messages(request)):
+            return None
+
+        partes = [obtener_version(model) for model in models]
+        partes.append(token_plantillas())
+        partes.append(str(request.user.pk))
+        partes.append(request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''))
+        partes.append(request.get_full_path())
+        if diario:
+            partes.append(timezone.localdate().isoformat())
+        return hashlib.sha1('|'.join(partes).encode()).hexdigest()
+
+    return etag_func
+
+
+def condicional(*models, diario=False):
+    """
+    Decorador para vistas de función: responde 304 si el ETag coincide.
+    Las respuestas quedan como privadas y con revalidación obligatoria.
+    """
+    def decorator(view_func):
+        conditional_view = condition(etag_func=etag_por_modelos(*models, diario=diario))(view_func)
+
+        @functools.wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            response = conditional_view(request, *args, **kwargs)
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    Mixin para vistas basadas en clases (colocar después de LoginRequiredMixin)
+
+        etag_models = [Cliente, SocioComercial]
+        etag_diario = True
+    """
+    etag_models = ()
+    etag_diario = False
+
+    def dispatch(self, request, *args, **kwargs):
+        vista = condicional(*self.etag_models, diario=self.etag_diario)(super().dispatch)
+        return vista(request, *args, **kwargs)
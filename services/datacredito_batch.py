@@ -0,0 +1,112 @@
+"""
+Consultas de score crediticio en lote
+Reparte las consultas a DataCrédito en un pool acotado de hilos con límite de
+tasa, tiempo máximo por consulta y reporte de fallas parciales.
+"""
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from .datacredito_cache import datacredito_cache_service, normalizar_documento
+from .rate_limit import TokenBucket
+
+
+@dataclass
+class ResultadoLote:
+    """Resultado de una consulta en lote"""
+    resultados: Dict[Tuple[str, str], Dict[str, Any]] = field(default_factory=dict)
+    fallidos: Dict[Tuple[str, str], str] = field(default_factory=dict)
+    duracion: float = 0.0
+
+    @property
+    def total(self) -> int:
+        return len(self.resultados) + len(self.fallidos)
+
+    @property
+    def consultas_por_segundo(self) -> float:
+        return self.total / self.duracion if self.duracion else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "exitosos": len(self.resultados),
+            "fallidos": {f"{tipo}:{numero}": error for (tipo, numero), error in self.fallidos.items()},
+            "duracion": round(self.duracion, 3),
+            "consultas_por_segundo": round(self.consultas_por_segundo, 2),
+        }
+
+
+def consultar_scores_en_lote(
+    documentos: List[Tuple[str, str]],
+    service=datacredito_cache_service,
+    max_workers: int = 8,
+    timeout: float = 5.0,
+    rate_limit: Optional[float] = 10.0,
+) -> ResultadoLote:
+    """
+    Consulta el score de varios documentos en paralelo
+
+    Args:
+        documentos: Lista de (tipo_documento, numero_documento); los repetidos se consultan una vez
+        service: Servicio con consultar_score_crediticio (por defecto el que tiene caché)
+        max_workers: Consultas simultáneas como máximo
+        timeout: Segundos máximos por consulta desde que empieza a ejecutarse
+        rate_limit: Consultas por segundo permitidas por el proveedor (None = sin límite)
+
+    Returns:
+        ResultadoLote con las respuestas exitosas y el motivo de cada falla
+    """
+    lote = ResultadoLote()
+    limitador = TokenBucket(rate_limit) if rate_limit else None
+    inicios = {}
+    inicios_lock = threading.Lock()
+
+    unicos = list(dict.fromkeys(
+        (tipo_documento.upper(), normalizar_documento(numero_documento))
+        for tipo_documento, numero_documento in documentos
+    ))
+
+    def consultar(documento):
+        if limitador is not None:
+            limitador.adquirir()
+        with inicios_lock:
+            inicios[documento] = time.monotonic()
+        tipo_documento, numero_documento = documento
+        return service.consultar_score_crediticio(numero_documento, tipo_documento)
+
+    inicio = time.monotonic()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='datacredito')
+    try:
+        pendientes = {executor.submit(consultar, documento): documento for documento in unicos}
+        while pendientes:
+            terminados, _ = wait(pendientes, timeout=0.05, return_when=FIRST_COMPLETED)
+            for future in terminados:
+                documento = pendientes.pop(future)
+                try:
+                    respuesta = future.result()
+                except Exception as exc:
+                    lote.fallidos[documento] = f'{type(exc).__name__}: {exc}'
+                    continue
+                if respuesta.get("success"):
+                    lote.resultados[documento] = respuesta
+                else:
+                    lote.fallidos[documento] = respuesta.get("error") or respuesta.get("message", "Consulta fallida")
+
+            # Consultas que superaron su tiempo máximo: se reportan y se dejan de esperar
+            ahora = time.monotonic()
+            with inicios_lock:
+                vencidos = [
+                    future for future, documento in pendientes.items()
+                    if documento in inicios and ahora - inicios[documento] > timeout
+                ]
+            for future in vencidos:
+                documento = pendientes.pop(future)
+                lote.fallidos[documento] = f'Tiempo de espera agotado ({timeout}s)'
+    finally:
+        # No bloquear por consultas vencidas que siguen en curso
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    lote.duracion = time.monotonic() - inicio
+    return lote
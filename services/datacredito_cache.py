@@ -0,0 +1,102 @@
+"""
+Caché de consultas a DataCrédito
+Evita repetir consultas a la central de riesgo (0.5-3 s cada una) guardando las
+respuestas en la caché de Django (compartida entre workers en producción), con
+TTL por tipo de consulta, caché negativa para respuestas fallidas e
+invalidación explícita por documento.
+"""
+from typing import Dict, Any
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .datacredito_mock import DataCreditoMockService, datacredito_service
+
+CACHE_KEY = 'datacredito:{tipo_consulta}:{tipo_documento}:{numero_documento}'
+TIPOS_CONSULTA = ('score', 'historial', 'express')
+
+# TTL en segundos por tipo de consulta; 'negativo' aplica a respuestas sin éxito
+DEFAULT_TTLS = {
+    'score': 24 * 3600,
+    'historial': 24 * 3600,
+    'express': 24 * 3600,
+    'negativo': 5 * 60,
+}
+
+
+def normalizar_documento(numero_documento: str) -> str:
+    """Quita espacios, puntos y guiones para que '1.234.567' y '1234567' compartan entrada"""
+    return ''.join(caracter for caracter in str(numero_documento) if caracter.isalnum()).upper()
+
+
+class CachedDataCreditoService:
+    """
+    Envoltura con caché sobre DataCreditoMockService con los mismos métodos
+    públicos. Las excepciones del servicio no se cachean (errores transitorios);
+    las respuestas con success=False se cachean con el TTL 'negativo'.
+    """
+
+    def __init__(self, service: DataCreditoMockService = datacredito_service):
+        self.service = service
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'DATACREDITO_CACHE_ALIAS', 'default')]
+
+    def ttl(self, tipo_consulta: str) -> int:
+        ttls = {**DEFAULT_TTLS, **getattr(settings, 'DATACREDITO_CACHE_TTLS', {})}
+        return ttls[tipo_consulta]
+
+    def _key(self, tipo_consulta: str, numero_documento: str, tipo_documento: str) -> str:
+        return CACHE_KEY.format(
+            tipo_consulta=tipo_consulta,
+            tipo_documento=tipo_documento.upper(),
+            numero_documento=normalizar_documento(numero_documento),
+        )
+
+    def _consultar(self, tipo_consulta, numero_documento, tipo_documento, consulta):
+        key = self._key(tipo_consulta, numero_documento, tipo_documento)
+        resultado = self.cache.get(key)
+        if resultado is not None:
+            return resultado
+
+        resultado = consulta()
+        ttl = self.ttl(tipo_consulta if resultado.get("success") else 'negativo')
+        self.cache.set(key, resultado, ttl)
+        return resultado
+
+    def consultar_score_crediticio(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        return self._consultar(
+            'score', numero_documento, tipo_documento,
+            lambda: self.service.consultar_score_crediticio(numero_documento, tipo_documento),
+        )
+
+    def consultar_historial_credito(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        return self._consultar(
+            'historial', numero_documento, tipo_documento,
+            lambda: self.service.consultar_historial_credito(numero_documento, tipo_documento),
+        )
+
+    def consulta_express(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        """
+        La consulta express se arma desde el score (cacheado o consultado una
+        sola vez), en lugar de pagar la latencia express más la del score
+        """
+        return self._consultar(
+            'express', numero_documento, tipo_documento,
+            lambda: self.service.armar_consulta_express(
+                numero_documento,
+                self.consultar_score_crediticio(numero_documento, tipo_documento),
+            ),
+        )
+
+    def invalidar(self, numero_documento: str, tipo_documento: str = "CC"):
+        """Descarta todas las consultas cacheadas de un documento"""
+        self.cache.delete_many([
+            self._key(tipo_consulta, numero_documento, tipo_documento)
+            for tipo_consulta in TIPOS_CONSULTA
+        ])
+
+
+# Instancia global con caché
+datacredito_cache_service = CachedDataCreditoService()
@@ -0,0 +1,135 @@
+"""
+Historial persistente de consultas a DataCrédito
+Cada consulta se guarda como ConsultaCrediticia (score y resumen del historial)
+y se reutiliza mientras tenga menos de CONSULTA_CREDITICIA_VIGENCIA_DIAS días,
+en lugar de volver a consultar la misma cédula cada vez que se revisa un
+Cliente o un CupoCredito. A diferencia de la caché (services/datacredito_cache.py)
+queda como registro auditable y sobrevive a reinicios.
+
+El detalle de obligaciones se guarda comprimido en DetalleObligaciones y se
+comparte entre consultas con el mismo contenido.
+"""
+from datetime import timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from clientes.models import ConsultaCrediticia, DetalleObligaciones
+
+from .datacredito_cache import datacredito_cache_service, normalizar_documento
+
+
+def vigencia_dias(max_dias: Optional[int] = None) -> int:
+    return max_dias if max_dias is not None else getattr(settings, 'CONSULTA_CREDITICIA_VIGENCIA_DIAS', 30)
+
+
+def consulta_vigente(numero_documento: str, tipo_documento: str = 'CC', max_dias: Optional[int] = None,
+                     con_historial: bool = False) -> Optional[ConsultaCrediticia]:
+    """La consulta más reciente del documento con menos de `max_dias` días, o None"""
+    consultas = ConsultaCrediticia.objects.filter(
+        numero_documento=normalizar_documento(numero_documento),
+        tipo_documento=tipo_documento.upper(),
+        fecha_consulta__gte=timezone.now() - timedelta(days=vigencia_dias(max_dias)),
+    )
+    if con_historial:
+        consultas = consultas.filter(con_historial=True)
+    return consultas.select_related('detalle').order_by('-fecha_consulta').first()
+
+
+def consultas_vigentes(documentos: Iterable[Tuple[str, str]],
+                       max_dias: Optional[int] = None) -> Dict[Tuple[str, str], ConsultaCrediticia]:
+    """
+    {(tipo_documento, numero_documento normalizado): consulta más reciente}
+    de los documentos con consulta vigente, en una sola consulta SQL
+    """
+    claves = {(tipo.upper(), normalizar_documento(numero)) for tipo, numero in documentos}
+    if not claves:
+        return {}
+    consultas = ConsultaCrediticia.objects.filter(
+        numero_documento__in={numero for _, numero in claves},
+        fecha_consulta__gte=timezone.now() - timedelta(days=vigencia_dias(max_dias)),
+    ).order_by('numero_documento', 'fecha_consulta')
+
+    vigentes = {}
+    for consulta in consultas:
+        clave = (consulta.tipo_documento, consulta.numero_documento)
+        if clave in claves:
+            vigentes[clave] = consulta  # queda la más reciente
+    return vigentes
+
+
+def guardar_detalle(obligaciones) -> Optional[DetalleObligaciones]:
+    """Fila de DetalleObligaciones con ese contenido, creada solo si no existe"""
+    if obligaciones is None:
+        return None
+    huella, datos = DetalleObligaciones.codificar(obligaciones)
+    detalle = DetalleObligaciones.objects.filter(huella=huella).first()
+    if detalle is not None:
+        return detalle
+    try:
+        with transaction.atomic():
+            return DetalleObligaciones.objects.create(huella=huella, datos=datos, cantidad=len(obligaciones))
+    except IntegrityError:
+        # Otro proceso guardó el mismo detalle al tiempo
+        return DetalleObligaciones.objects.get(huella=huella)
+
+
+def guardar_consulta(numero_documento: str, tipo_documento: str, score_result: Dict,
+                     historial_result: Optional[Dict] = None) -> Optional[ConsultaCrediticia]:
+    """Guarda las respuestas exitosas de DataCrédito; None si el score no fue exitoso"""
+    if not score_result.get("success"):
+        return None
+    score = score_result["data"]["score"]
+    consulta = ConsultaCrediticia(
+        tipo_documento=tipo_documento.upper(),
+        numero_documento=normalizar_documento(numero_documento),
+        fecha_consulta=timezone.now(),
+        score=score["score"],
+        categoria=score["categoria"],
+    )
+    if historial_result and historial_result.get("success"):
+        historial = historial_result["data"]["historial"]
+        consulta.con_historial = True
+        consulta.total_obligaciones = historial["total_obligaciones"]
+        consulta.obligaciones_al_dia = historial["obligaciones_al_dia"]
+        consulta.obligaciones_vencidas = historial["obligaciones_vencidas"]
+        consulta.valor_total_deuda = Decimal(round(historial["valor_total_deuda"]))
+        consulta.score_comportamiento = historial["score_comportamiento"]
+        consulta.detalle = guardar_detalle(historial_result["data"].get("detalles_obligaciones") or [])
+    consulta.save()
+    return consulta
+
+
+def consultar_credito(numero_documento: str, tipo_documento: str = 'CC', max_dias: Optional[int] = None,
+                      con_historial: bool = True, service=datacredito_cache_service) -> Optional[ConsultaCrediticia]:
+    """
+    Consulta vigente del documento o, si no la hay, una nueva a DataCrédito
+
+    Args:
+        numero_documento: Cédula, NIT o pasaporte
+        tipo_documento: Tipo de documento
+        max_dias: Antigüedad máxima de una consulta reutilizable (0 = consultar siempre)
+        con_historial: También consultar y guardar el historial
+        service: Servicio de DataCrédito a usar si hay que consultar
+
+    Returns:
+        ConsultaCrediticia con `reutilizada` en True si no se llamó al servicio,
+        o None si DataCrédito no devolvió el score
+    """
+    numero_documento = normalizar_documento(numero_documento)
+    consulta = consulta_vigente(numero_documento, tipo_documento, max_dias, con_historial)
+    if consulta is not None:
+        consulta.reutilizada = True
+        return consulta
+
+    score_result = service.consultar_score_crediticio(numero_documento, tipo_documento)
+    historial_result = None
+    if con_historial and score_result.get("success"):
+        historial_result = service.consultar_historial_credito(numero_documento, tipo_documento)
+    consulta = guardar_consulta(numero_documento, tipo_documento, score_result, historial_result)
+    if consulta is not None:
+        consulta.reutilizada = False
+    return consulta
@@ -2,12 +2,15 @@
 Simulador de servicios de DataCrédito/Centrales de Riesgo
 Este simulador imita las respuestas de las APIs de consulta crediticia
 """
-import random
+import asyncio
 import time
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
 
+from .latency_profiles import SimuladorMixin
+from .metrics import medir_llamada_externa
+
 
 @dataclass
 class CreditScore:
@@ -34,7 +37,7 @@ class HistorialCredito:
         return asdict(self)
 
 
-class DataCreditoMockService:
+class DataCreditoMockService(SimuladorMixin):
     """
     Servicio simulado para consultas a DataCrédito
     Simula las operaciones más comunes de consulta crediticia
@@ -77,10 +80,22 @@ class DataCreditoMockService:
         }
     }
     
+    SERVICIO = "datacredito"
+    
+    # Latencia simulada (segundos mínimo, máximo) por operación; la
+    # distribución real la define el perfil (ver services/latency_profiles.py)
+    LATENCIAS = {
+        "consultar_score_crediticio": (0.5, 2.0),
+        "consultar_historial_credito": (1.0, 3.0),
+        "consulta_express": (0.2, 0.8),
+    }
+    
     def __init__(self):
         self.api_key = "mock_api_key"
         self.base_url = "https://api.datacredito-mock.com"
-        
+        self.configurar_simulacion()
+    
+    @medir_llamada_externa('datacredito')
     def consultar_score_crediticio(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
         """
         Simula la consulta de score crediticio
@@ -93,8 +108,12 @@ class DataCreditoMockService:
             Dict con información del score crediticio
         """
         # Simular latencia de red
-        time.sleep(random.uniform(0.5, 2.0))
+        time.sleep(self._latencia("consultar_score_crediticio"))
         
+        return self._armar_score(numero_documento, tipo_documento)
+    
+    def _armar_score(self, numero_documento: str, tipo_documento: str) -> Dict[str, Any]:
+        """Genera la respuesta de consultar_score_crediticio"""
         # Verificar si tenemos datos mock para este documento
         if numero_documento in self.MOCK_DATA:
             mock_data = self.MOCK_DATA[numero_documento]
@@ -118,7 +137,7 @@ class DataCreditoMockService:
             }
         else:
             # Generar datos aleatorios para documentos no definidos
-            score_value = random.randint(300, 850)
+            score_value = self.rng.randint(300, 850)
             categoria = self._get_categoria_by_score(score_value)
             
             score = CreditScore(
@@ -139,6 +158,7 @@ class DataCreditoMockService:
                 "message": "Consulta exitosa (datos simulados)"
             }
     
+    @medir_llamada_externa('datacredito')
     def consultar_historial_credito(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
         """
         Simula la consulta del historial crediticio completo
@@ -151,8 +171,12 @@ class DataCreditoMockService:
             Dict con el historial crediticio
         """
         # Simular latencia de red
-        time.sleep(random.uniform(1.0, 3.0))
+        time.sleep(self._latencia("consultar_historial_credito"))
         
+        return self._armar_historial(numero_documento, tipo_documento)
+    
+    def _armar_historial(self, numero_documento: str, tipo_documento: str) -> Dict[str, Any]:
+        """Genera la respuesta de consultar_historial_credito"""
         if numero_documento in self.MOCK_DATA:
             mock_data = self.MOCK_DATA[numero_documento]
             
@@ -162,7 +186,7 @@ class DataCreditoMockService:
                 obligaciones_al_dia=mock_data["obligaciones_al_dia"],
                 obligaciones_vencidas=mock_data["obligaciones_vencidas"],
                 score_comportamiento=mock_data["score_comportamiento"],
-                ultima_actualizacion=datetime.now() - timedelta(days=random.randint(1, 30))
+                ultima_actualizacion=datetime.now() - timedelta(days=self.rng.randint(1, 30))
             )
             
             return {
@@ -177,10 +201,10 @@ class DataCreditoMockService:
             }
         else:
             # Generar datos aleatorios
-            total_obligaciones = random.randint(0, 8)
-            obligaciones_vencidas = random.randint(0, min(total_obligaciones, 3))
+            total_obligaciones = self.rng.randint(0, 8)
+            obligaciones_vencidas = self.rng.randint(0, min(total_obligaciones, 3))
             obligaciones_al_dia = total_obligaciones - obligaciones_vencidas
-            valor_total_deuda = random.uniform(1000000, 50000000)
+            valor_total_deuda = self.rng.uniform(1000000, 50000000)
             
             historial = HistorialCredito(
                 total_obligaciones=total_obligaciones,
@@ -188,7 +212,7 @@ class DataCreditoMockService:
                 obligaciones_al_dia=obligaciones_al_dia,
                 obligaciones_vencidas=obligaciones_vencidas,
                 score_comportamiento=self._get_comportamiento_by_vencidas(obligaciones_vencidas),
-                ultima_actualizacion=datetime.now() - timedelta(days=random.randint(1, 30))
+                ultima_actualizacion=datetime.now() - timedelta(days=self.rng.randint(1, 30))
             )
             
             return {
@@ -202,6 +226,7 @@ class DataCreditoMockService:
                 "message": "Consulta de historial exitosa (datos simulados)"
             }
     
+    @medir_llamada_externa('datacredito')
     def consulta_express(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
         """
         Consulta rápida que combina score y resumen del historial
@@ -214,10 +239,23 @@ class DataCreditoMockService:
             Dict con información resumida
         """
         # Simular latencia reducida para consulta express
-        time.sleep(random.uniform(0.2, 0.8))
+        time.sleep(self._latencia("consulta_express"))
         
         score_result = self.consultar_score_crediticio(numero_documento, tipo_documento)
         
+        return self.armar_consulta_express(numero_documento, score_result)
+    
+    def armar_consulta_express(self, numero_documento: str, score_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Construye la respuesta de consulta express a partir de un resultado de score
+        
+        Args:
+            numero_documento: Número de documento
+            score_result: Respuesta de consultar_score_crediticio
+            
+        Returns:
+            Dict con información resumida
+        """
         if score_result["success"]:
             score_data = score_result["data"]["score"]
             recommendation = self._get_recommendation_by_score(score_data["score"])
@@ -274,16 +312,41 @@ class DataCreditoMockService:
         obligaciones = []
         for i in range(mock_data["total_obligaciones"]):
             obligacion = {
-                "entidad": random.choice(["BANCO_COLOMBIA", "BANCO_BOGOTA", "BANCOLOMBIA", "DAVIVIENDA", "BBVA"]),
-                "tipo_producto": random.choice(["TARJETA_CREDITO", "CREDITO_CONSUMO", "CREDITO_VEHICULO", "HIPOTECARIO"]),
-                "valor_inicial": random.uniform(1000000, 10000000),
-                "saldo_actual": random.uniform(100000, 5000000),
+                "entidad": self.rng.choice(["BANCO_COLOMBIA", "BANCO_BOGOTA", "BANCOLOMBIA", "DAVIVIENDA", "BBVA"]),
+                "tipo_producto": self.rng.choice(["TARJETA_CREDITO", "CREDITO_CONSUMO", "CREDITO_VEHICULO", "HIPOTECARIO"]),
+                "valor_inicial": self.rng.uniform(1000000, 10000000),
+                "saldo_actual": self.rng.uniform(100000, 5000000),
                 "estado": "AL_DIA" if i < mock_data["obligaciones_al_dia"] else "VENCIDA",
-                "dias_vencido": 0 if i < mock_data["obligaciones_al_dia"] else random.randint(30, 180)
+                "dias_vencido": 0 if i < mock_data["obligaciones_al_dia"] else self.rng.randint(30, 180)
             }
             obligaciones.append(obligacion)
         return obligaciones
 
 
-# Instancia global del servicio mock
+class AsyncDataCreditoMockService(DataCreditoMockService):
+    """
+    Variante asíncrona para vistas async: los mismos métodos públicos como
+    corrutinas, con la latencia simulada mediante asyncio.sleep y las mismas
+    respuestas que el servicio síncrono
+    """
+    
+    @medir_llamada_externa('datacredito')
+    async def consultar_score_crediticio(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("consultar_score_crediticio"))
+        return self._armar_score(numero_documento, tipo_documento)
+    
+    @medir_llamada_externa('datacredito')
+    async def consultar_historial_credito(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("consultar_historial_credito"))
+        return self._armar_historial(numero_documento, tipo_documento)
+    
+    @medir_llamada_externa('datacredito')
+    async def consulta_express(self, numero_documento: str, tipo_documento: str = "CC") -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("consulta_express"))
+        score_result = await self.consultar_score_crediticio(numero_documento, tipo_documento)
+        return self.armar_consulta_express(numero_documento, score_result)
+
+
+# Instancias globales del servicio mock
 datacredito_service = DataCreditoMockService()
+async_datacredito_service = AsyncDataCreditoMockService()
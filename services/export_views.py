@@ -7,10 +7,15 @@ from datetime import datetime
 from clientes.models import Cliente
 from socios.models import SocioComercial
 from seguimiento.models import SeguimientoSocio
+from asesores.models import Asesor
+from .conditional import ConditionalGetMixin
+from .metrics import medir_exportacion
 
 
 @method_decorator(login_required, name='dispatch')
-class ExportClientesCSV(View):
+class ExportClientesCSV(ConditionalGetMixin, View):
+    etag_models = [Cliente, SocioComercial]
+
     def get(self, request, *args, **kwargs):
         response = HttpResponse(content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="clientes_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
@@ -34,27 +39,31 @@ class ExportClientesCSV(View):
         
         # Datos
         clientes = Cliente.objects.select_related('socio_comercial').all()
-        for cliente in clientes:
-            writer.writerow([
-                cliente.id,
-                cliente.nombre,
-                cliente.cedula,
-                cliente.fecha_compra.strftime('%Y-%m-%d') if cliente.fecha_compra else '',
-                cliente.valor_compra,
-                cliente.socio_comercial.nombre if cliente.socio_comercial else '',
-                cliente.telefono,
-                cliente.email,
-                cliente.ciudad,
-                cliente.observaciones,
-                cliente.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_creacion else '',
-                cliente.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_actualizacion else ''
-            ])
+        with medir_exportacion('clientes') as exportacion:
+            for cliente in clientes:
+                exportacion['filas'] += 1
+                writer.writerow([
+                    cliente.id,
+                    cliente.nombre,
+                    cliente.cedula,
+                    cliente.fecha_compra.strftime('%Y-%m-%d') if cliente.fecha_compra else '',
+                    cliente.valor_compra,
+                    cliente.socio_comercial.nombre if cliente.socio_comercial else '',
+                    cliente.telefono,
+                    cliente.email,
+                    cliente.ciudad,
+                    cliente.observaciones,
+                    cliente.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_creacion else '',
+                    cliente.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if cliente.fecha_actualizacion else ''
+                ])
         
         return response
 
 
 @method_decorator(login_required, name='dispatch')
-class ExportSociosCSV(View):
+class ExportSociosCSV(ConditionalGetMixin, View):
+    etag_models = [SocioComercial, Cliente, Asesor]
+
     def get(self, request, *args, **kwargs):
         response = HttpResponse(content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="socios_comerciales_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
@@ -77,28 +86,32 @@ class ExportSociosCSV(View):
         ])
         
         # Datos
-        socios = SocioComercial.objects.all()
-        for socio in socios:
-            writer.writerow([
-                socio.id,
-                socio.nombre,
-                socio.fecha_ingreso.strftime('%Y-%m-%d') if socio.fecha_ingreso else '',
-                socio.ciudad_sede,
-                socio.asesor_asignado,
-                'Sí' if socio.activo else 'No',
-                socio.telefono,
-                socio.email,
-                socio.total_ventas(),
-                socio.cantidad_ventas(),
-                socio.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if socio.fecha_creacion else '',
-                socio.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if socio.fecha_actualizacion else ''
-            ])
+        socios = SocioComercial.objects.select_related('asesor').all()
+        with medir_exportacion('socios') as exportacion:
+            for socio in socios:
+                exportacion['filas'] += 1
+                writer.writerow([
+                    socio.id,
+                    socio.nombre,
+                    socio.fecha_ingreso.strftime('%Y-%m-%d') if socio.fecha_ingreso else '',
+                    socio.ciudad_sede,
+                    socio.asesor.nombre if socio.asesor else '',
+                    'Sí' if socio.activo else 'No',
+                    socio.telefono,
+                    socio.email,
+                    socio.total_ventas(),
+                    socio.cantidad_ventas(),
+                    socio.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if socio.fecha_creacion else '',
+                    socio.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if socio.fecha_actualizacion else ''
+                ])
         
         return response
 
 
 @method_decorator(login_required, name='dispatch')
-class ExportSeguimientosCSV(View):
+class ExportSeguimientosCSV(ConditionalGetMixin, View):
+    etag_models = [SeguimientoSocio, SocioComercial, Asesor]
+
     def get(self, request, *args, **kwargs):
         response = HttpResponse(content_type='text/csv; charset=utf-8')
         response['Content-Disposition'] = f'attachment; filename="seguimientos_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv"'
@@ -134,34 +147,36 @@ class ExportSeguimientosCSV(View):
         ])
         
         # Datos
-        seguimientos = SeguimientoSocio.objects.select_related('socio_comercial').all()
-        for seg in seguimientos:
-            writer.writerow([
-                seg.id,
-                seg.socio_potencial,
-                seg.socio_comercial.nombre if seg.socio_comercial else '',
-                seg.asesor_asignado,
-                dict(seg.ESTADO_CHOICES).get(seg.estado, seg.estado),
-                round(seg.porcentaje_completado(), 1),
-                seg.telefono,
-                seg.email,
-                seg.ciudad,
-                'Sí' if seg.presentacion_negocio else 'No',
-                seg.fecha_presentacion.strftime('%Y-%m-%d') if seg.fecha_presentacion else '',
-                'Sí' if seg.documentos_enviados else 'No',
-                seg.fecha_envio_documentos.strftime('%Y-%m-%d') if seg.fecha_envio_documentos else '',
-                'Sí' if seg.contrato_enviado else 'No',
-                seg.fecha_envio_contrato.strftime('%Y-%m-%d') if seg.fecha_envio_contrato else '',
-                'Sí' if seg.contrato_firmado else 'No',
-                seg.fecha_firma_contrato.strftime('%Y-%m-%d') if seg.fecha_firma_contrato else '',
-                'Sí' if seg.capacitacion_realizada else 'No',
-                seg.fecha_capacitacion.strftime('%Y-%m-%d') if seg.fecha_capacitacion else '',
-                'Sí' if seg.usuario_creado else 'No',
-                seg.fecha_creacion_usuario.strftime('%Y-%m-%d') if seg.fecha_creacion_usuario else '',
-                'Sí' if seg.proceso_completo else 'No',
-                seg.observaciones,
-                seg.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if seg.fecha_creacion else '',
-                seg.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if seg.fecha_actualizacion else ''
-            ])
+        seguimientos = SeguimientoSocio.objects.select_related('socio_comercial', 'asesor').all()
+        with medir_exportacion('seguimientos') as exportacion:
+            for seg in seguimientos:
+                exportacion['filas'] += 1
+                writer.writerow([
+                    seg.id,
+                    seg.socio_potencial,
+                    seg.socio_comercial.nombre if seg.socio_comercial else '',
+                    seg.asesor.nombre if seg.asesor else '',
+                    dict(seg.ESTADO_CHOICES).get(seg.estado, seg.estado),
+                    round(seg.porcentaje_completado(), 1),
+                    seg.telefono,
+                    seg.email,
+                    seg.ciudad,
+                    'Sí' if seg.presentacion_negocio else 'No',
+                    seg.fecha_presentacion.strftime('%Y-%m-%d') if seg.fecha_presentacion else '',
+                    'Sí' if seg.documentos_enviados else 'No',
+                    seg.fecha_envio_documentos.strftime('%Y-%m-%d') if seg.fecha_envio_documentos else '',
+                    'Sí' if seg.contrato_enviado else 'No',
+                    seg.fecha_envio_contrato.strftime('%Y-%m-%d') if seg.fecha_envio_contrato else '',
+                    'Sí' if seg.contrato_firmado else 'No',
+                    seg.fecha_firma_contrato.strftime('%Y-%m-%d') if seg.fecha_firma_contrato else '',
+                    'Sí' if seg.capacitacion_realizada else 'No',
+                    seg.fecha_capacitacion.strftime('%Y-%m-%d') if seg.fecha_capacitacion else '',
+                    'Sí' if seg.usuario_creado else 'No',
+                    seg.fecha_creacion_usuario.strftime('%Y-%m-%d') if seg.fecha_creacion_usuario else '',
+                    'Sí' if seg.proceso_completo else 'No',
+                    seg.observaciones,
+                    seg.fecha_creacion.strftime('%Y-%m-%d %H:%M:%S') if seg.fecha_creacion else '',
+                    seg.fecha_actualizacion.strftime('%Y-%m-%d %H:%M:%S') if seg.fecha_actualizacion else ''
+                ])
         
         return response
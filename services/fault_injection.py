@@ -0,0 +1,41 @@
+"""
+Inyección de fallas en los servicios simulados, para probar localmente el
+comportamiento ante un proveedor degradado (ver services/resilience.py)
+
+Se configura en settings.MOCK_FAULTS por servicio ('datacredito', 'sms',
+'payment_gateway'):
+
+    MOCK_FAULTS = {
+        'datacredito': {
+            'error_rate': 0.2,      # fracción de llamadas que fallan con FallaSimulada
+            'latencia_extra': 1.5,  # segundos añadidos a cada llamada
+            'bloqueo_rate': 0.05,   # fracción de llamadas que se cuelgan `bloqueo` segundos
+            'bloqueo': 30,
+        },
+    }
+"""
+import random
+
+from django.conf import settings
+
+
+class FallaSimulada(ConnectionError):
+    """Error de red inyectado en un servicio simulado"""
+
+
+def inyectar_fallas(servicio: str, rng: random.Random = None) -> float:
+    """
+    Aplica la configuración de fallas del servicio: lanza FallaSimulada o
+    devuelve los segundos extra de latencia a simular. `rng` es el generador
+    del mock (ver services/latency_profiles.py)
+    """
+    rng = rng or random
+    fallas = getattr(settings, 'MOCK_FAULTS', {}).get(servicio)
+    if not fallas:
+        return 0.0
+    if rng.random() < fallas.get('error_rate', 0):
+        raise FallaSimulada(f'Falla simulada en {servicio}')
+    extra = fallas.get('latencia_extra', 0)
+    if rng.random() < fallas.get('bloqueo_rate', 0):
+        extra += fallas.get('bloqueo', 30)
+    return extra
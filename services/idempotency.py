@@ -0,0 +1,148 @@
+"""
+Claves de idempotencia para la creación de pagos
+Un reintento con la misma clave (por defecto la referencia del pago) devuelve
+la transacción original en lugar de cobrar otra vez. La primera solicitud
+reserva la clave; las duplicadas concurrentes esperan su resultado.
+
+- MemoryIdempotencyStore: por proceso, con capacidad máxima y TTL
+- DatabaseIdempotencyStore: restricción única en la base de datos, segura entre
+  workers de gunicorn
+"""
+import hashlib
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+# Resultados de reservar()
+NUEVO = 'nuevo'            # la clave quedó reservada para quien llama
+EN_CURSO = 'en_curso'      # otra solicitud con la misma clave se está procesando
+COMPLETADO = 'completado'  # ya hay respuesta guardada
+CONFLICTO = 'conflicto'    # la clave se usó con otros datos
+
+# Una reserva sin completar (worker caído) se libera después de este tiempo
+TTL_EN_CURSO = 30
+
+
+def huella_solicitud(datos: Dict[str, Any]) -> str:
+    """Hash de los datos de la solicitud, para detectar una clave reutilizada con otro pago"""
+    return hashlib.sha256(json.dumps(datos, sort_keys=True, cls=DjangoJSONEncoder, default=str).encode()).hexdigest()
+
+
+class IdempotencyStore:
+    """Interfaz común de los almacenes de claves de idempotencia"""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def reservar(self, clave: str, huella: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Devuelve (NUEVO | EN_CURSO | COMPLETADO | CONFLICTO, respuesta guardada o None)"""
+        raise NotImplementedError
+
+    def completar(self, clave: str, respuesta: Dict[str, Any]):
+        raise NotImplementedError
+
+    def liberar(self, clave: str):
+        """Descarta una reserva sin completar, para permitir el reintento"""
+        raise NotImplementedError
+
+    def esperar(self, clave: str, huella: str, timeout: float) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """reservar() repetido mientras otra solicitud tenga la clave en curso, hasta `timeout` segundos"""
+        limite = time.monotonic() + timeout
+        while True:
+            estado, respuesta = self.reservar(clave, huella)
+            if estado != EN_CURSO or time.monotonic() >= limite:
+                return estado, respuesta
+            time.sleep(0.05)
+
+
+class MemoryIdempotencyStore(IdempotencyStore):
+    """Almacén por proceso; descarta las claves más antiguas al superar `capacidad`"""
+
+    def __init__(self, ttl: int, capacidad: int = 10000):
+        super().__init__(ttl)
+        self.capacidad = capacidad
+        self._claves = OrderedDict()  # clave -> (huella, respuesta, expira)
+        self._lock = threading.Lock()
+
+    def reservar(self, clave, huella):
+        ahora = time.monotonic()
+        with self._lock:
+            registro = self._claves.get(clave)
+            if registro is not None and registro[2] > ahora:
+                huella_original, respuesta, _ = registro
+                if huella_original != huella:
+                    return CONFLICTO, None
+                return (COMPLETADO, respuesta) if respuesta is not None else (EN_CURSO, None)
+
+            self._claves[clave] = (huella, None, ahora + TTL_EN_CURSO)
+            self._claves.move_to_end(clave)
+            while len(self._claves) > self.capacidad:
+                self._claves.popitem(last=False)
+            return NUEVO, None
+
+    def completar(self, clave, respuesta):
+        with self._lock:
+            registro = self._claves.get(clave)
+            if registro is not None:
+                self._claves[clave] = (registro[0], respuesta, time.monotonic() + self.ttl)
+
+    def liberar(self, clave):
+        with self._lock:
+            registro = self._claves.get(clave)
+            if registro is not None and registro[1] is None:
+                del self._claves[clave]
+
+
+class DatabaseIdempotencyStore(IdempotencyStore):
+    """Almacén en el modelo ClaveIdempotencia; la restricción única resuelve las carreras"""
+
+    def reservar(self, clave, huella):
+        from .models import ClaveIdempotencia
+        ahora = timezone.now()
+        ClaveIdempotencia.objects.filter(clave=clave, expira_en__lte=ahora).delete()
+        try:
+            with transaction.atomic():
+                ClaveIdempotencia.objects.create(
+                    clave=clave, huella=huella, expira_en=ahora + timedelta(seconds=TTL_EN_CURSO)
+                )
+        except IntegrityError:
+            registro = ClaveIdempotencia.objects.filter(clave=clave).first()
+            if registro is None:
+                # La reserva se liberó entre el intento y la lectura
+                return EN_CURSO, None
+            if registro.huella != huella:
+                return CONFLICTO, None
+            return (COMPLETADO, registro.respuesta) if registro.respuesta is not None else (EN_CURSO, None)
+
+        # De vez en cuando se purgan las claves vencidas para mantener la tabla acotada
+        if random.random() < 0.01:
+            ClaveIdempotencia.objects.filter(expira_en__lte=ahora).delete()
+        return NUEVO, None
+
+    def completar(self, clave, respuesta):
+        from .models import ClaveIdempotencia
+        ClaveIdempotencia.objects.filter(clave=clave).update(
+            respuesta=json.loads(json.dumps(respuesta, cls=DjangoJSONEncoder)),
+            expira_en=timezone.now() + timedelta(seconds=self.ttl),
+        )
+
+    def liberar(self, clave):
+        from .models import ClaveIdempotencia
+        ClaveIdempotencia.objects.filter(clave=clave, respuesta__isnull=True).delete()
+
+
+def crear_idempotency_store() -> IdempotencyStore:
+    """Almacén configurado en settings.PAYMENT_IDEMPOTENCY_STORE ('memoria' o 'db')"""
+    ttl = getattr(settings, 'PAYMENT_IDEMPOTENCY_TTL', 24 * 3600)
+    if getattr(settings, 'PAYMENT_IDEMPOTENCY_STORE', 'memoria') == 'db':
+        return DatabaseIdempotencyStore(ttl)
+    return MemoryIdempotencyStore(ttl, getattr(settings, 'PAYMENT_IDEMPOTENCY_CAPACITY', 10000))
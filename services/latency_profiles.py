@@ -0,0 +1,222 @@
+"""
+Perfiles de latencia y resultados reproducibles para los servicios simulados
+(DataCrédito, SMS y pasarelas de pago)
+
+Cada instancia de un mock tiene su propio generador aleatorio (`self.rng`),
+que decide latencias y resultados (aprobado/rechazado, entregado, score...).
+Con settings.MOCK_SEMILLA fija, la misma secuencia de llamadas produce siempre
+los mismos resultados; con llamadas concurrentes el orden de los hilos sigue
+siendo libre.
+
+La latencia se configura por servicio en settings.MOCK_LATENCIA:
+
+    MOCK_LATENCIA = {
+        'default': {'tipo': 'uniforme'},                  # rangos LATENCIAS de cada mock
+        'datacredito': {'tipo': 'lognormal', 'sigma': 0.5},
+        'sms': {'tipo': 'traza', 'archivo': 'trazas/sms.jsonl'},
+        'payment_gateway': {'tipo': 'fijo', 'segundos': 0.2},
+    }
+
+Tipos: 'uniforme', 'fijo', 'lognormal' (mediana en el centro del rango de
+LATENCIAS salvo que se indique 'medianas'), 'traza' (latencias grabadas,
+reproducidas en orden o muestreadas) y 'cero' para pruebas unitarias.
+
+Las trazas son archivos JSON lines con {"servicio", "operacion", "latencia"};
+con settings.MOCK_TRAZA_GRABAR los mocks escriben en ese formato cada latencia
+que simulan.
+"""
+import hashlib
+import itertools
+import json
+import math
+import random
+import threading
+import weakref
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from .fault_injection import inyectar_fallas
+
+
+class PerfilLatencia:
+    """Distribución de la latencia de red de cada operación"""
+
+    def muestra(self, servicio: str, operacion: str, rango, rng: random.Random) -> float:
+        raise NotImplementedError
+
+
+class PerfilUniforme(PerfilLatencia):
+    """Uniforme entre el mínimo y el máximo de LATENCIAS (comportamiento original)"""
+
+    def muestra(self, servicio, operacion, rango, rng):
+        return rng.uniform(*rango)
+
+
+class PerfilCero(PerfilLatencia):
+    """Sin latencia, para pruebas unitarias"""
+
+    def muestra(self, servicio, operacion, rango, rng):
+        return 0.0
+
+
+class PerfilFijo(PerfilLatencia):
+    """Los mismos segundos en cada llamada (un valor o uno por operación)"""
+
+    def __init__(self, segundos=0.1):
+        self.segundos = segundos
+
+    def muestra(self, servicio, operacion, rango, rng):
+        if isinstance(self.segundos, dict):
+            return self.segundos.get(operacion, sum(rango) / 2)
+        return self.segundos
+
+
+class PerfilLogNormal(PerfilLatencia):
+    """
+    Lognormal: la mayoría de llamadas cerca de la mediana y una cola larga de
+    llamadas lentas, como en los proveedores reales
+    """
+
+    def __init__(self, sigma: float = 0.5, medianas: Optional[Dict[str, float]] = None, maximo: float = 60.0):
+        self.sigma = sigma
+        self.medianas = medianas or {}
+        self.maximo = maximo
+
+    def muestra(self, servicio, operacion, rango, rng):
+        mediana = self.medianas.get(operacion, sum(rango) / 2)
+        return min(rng.lognormvariate(math.log(mediana), self.sigma), self.maximo)
+
+
+class PerfilTraza(PerfilLatencia):
+    """
+    Latencias grabadas en un archivo JSON lines. En orden 'secuencial' se
+    reproducen una tras otra (y se vuelve a empezar al terminar); en 'muestreo'
+    se toman al azar con el generador del mock. Las operaciones sin datos en la
+    traza usan el rango de LATENCIAS.
+    """
+
+    def __init__(self, archivo: str, orden: str = 'secuencial'):
+        self.archivo = archivo
+        self.orden = orden
+        self.latencias = cargar_traza(archivo)
+        self._ciclos = {clave: itertools.cycle(valores) for clave, valores in self.latencias.items()}
+        self._lock = threading.Lock()
+
+    def muestra(self, servicio, operacion, rango, rng):
+        clave = (servicio, operacion)
+        if clave not in self.latencias:
+            return rng.uniform(*rango)
+        if self.orden == 'muestreo':
+            return rng.choice(self.latencias[clave])
+        with self._lock:
+            return next(self._ciclos[clave])
+
+
+def cargar_traza(archivo: str) -> Dict[tuple, List[float]]:
+    """{(servicio, operacion): [latencias en el orden grabado]}"""
+    latencias = defaultdict(list)
+    with open(archivo, encoding='utf-8') as lineas:
+        for linea in lineas:
+            if linea.strip():
+                registro = json.loads(linea)
+                latencias[(registro['servicio'], registro['operacion'])].append(float(registro['latencia']))
+    return dict(latencias)
+
+
+class GrabadorTraza:
+    """Agrega al archivo una línea JSON por cada latencia simulada"""
+
+    def __init__(self, archivo: str):
+        self.archivo = archivo
+        self._lock = threading.Lock()
+
+    def registrar(self, servicio: str, operacion: str, latencia: float):
+        linea = json.dumps({'servicio': servicio, 'operacion': operacion, 'latencia': round(latencia, 6)})
+        with self._lock, open(self.archivo, 'a', encoding='utf-8') as archivo:
+            archivo.write(linea + '\n')
+
+
+PERFILES = {
+    'uniforme': PerfilUniforme,
+    'cero': PerfilCero,
+    'fijo': PerfilFijo,
+    'lognormal': PerfilLogNormal,
+    'traza': PerfilTraza,
+}
+
+
+def crear_perfil(servicio: str) -> PerfilLatencia:
+    """Perfil de settings.MOCK_LATENCIA para el servicio (o el de 'default')"""
+    configuracion = getattr(settings, 'MOCK_LATENCIA', {})
+    opciones = dict(configuracion.get(servicio) or configuracion.get('default') or {})
+    return PERFILES[opciones.pop('tipo', 'uniforme')](**opciones)
+
+
+def crear_rng(servicio: str, instancia: str = '', semilla=None) -> random.Random:
+    """
+    Generador de la instancia; la semilla (por defecto settings.MOCK_SEMILLA)
+    se combina con el servicio y la instancia para que cada mock tenga su
+    propia secuencia. Sin semilla el generador no es reproducible.
+    """
+    if semilla is None:
+        semilla = getattr(settings, 'MOCK_SEMILLA', None)
+    if semilla is None:
+        return random.Random()
+    return random.Random(int(hashlib.sha256(f'{semilla}:{servicio}:{instancia}'.encode()).hexdigest()[:16], 16))
+
+
+class SimuladorMixin:
+    """
+    Latencia y generador aleatorio configurables para los mocks. Cada clase
+    define SERVICIO ('datacredito', 'sms' o 'payment_gateway') y LATENCIAS
+    """
+
+    SERVICIO = ''
+    LATENCIAS: Dict[str, tuple] = {}
+
+    # Instancias vivas, para reconfigurarlas cuando cambian los settings
+    _instancias = weakref.WeakSet()
+
+    def configurar_simulacion(self, perfil: Optional[PerfilLatencia] = None, semilla=None):
+        """
+        Aplica el perfil y la semilla (por defecto los de settings). La
+        instancia se distingue por nombre_instancia() al derivar la semilla
+        """
+        self.perfil = perfil or crear_perfil(self.SERVICIO)
+        self.rng = crear_rng(self.SERVICIO, self.nombre_instancia(), semilla)
+        archivo = getattr(settings, 'MOCK_TRAZA_GRABAR', None)
+        self.grabador = GrabadorTraza(archivo) if archivo else None
+        SimuladorMixin._instancias.add(self)
+
+    def nombre_instancia(self) -> str:
+        return type(self).__name__
+
+    def _latencia(self, operacion: str) -> float:
+        """
+        Segundos de latencia de red a simular para la operación, incluidas las
+        fallas configuradas en settings.MOCK_FAULTS (puede lanzar FallaSimulada)
+        """
+        latencia = self.perfil.muestra(self.SERVICIO, operacion, self.LATENCIAS[operacion], self.rng)
+        if self.grabador is not None:
+            self.grabador.registrar(self.SERVICIO, operacion, latencia)
+        return latencia + inyectar_fallas(self.SERVICIO, self.rng)
+
+
+def configurar_mocks(perfil: Optional[PerfilLatencia] = None, semilla=None):
+    """
+    Reconfigura todos los mocks existentes, p. ej. para un benchmark:
+    configurar_mocks(PerfilTraza('trazas/produccion.jsonl'), semilla=42)
+    """
+    for instancia in list(SimuladorMixin._instancias):
+        instancia.configurar_simulacion(perfil, semilla)
+
+
+@receiver(setting_changed)
+def _reconfigurar(setting, **kwargs):
+    # override_settings(MOCK_LATENCIA=..., MOCK_SEMILLA=...) en las pruebas
+    if setting in ('MOCK_LATENCIA', 'MOCK_SEMILLA', 'MOCK_TRAZA_GRABAR'):
+        configurar_mocks()
@@ -0,0 +1,77 @@
+"""
+Compara el rendimiento (filas por segundo) de la API JSON contra las vistas
+HTML de lista, recorriendo todas las páginas de cada una con el cliente de
+pruebas de Django. Solo lee datos.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import resolve, reverse
+
+# recurso de la API -> vista HTML de lista equivalente
+# (los cupos no se comparan: CupoCreditoListView aún no tiene plantilla)
+COMPARACIONES = {
+    'clientes': 'clientes:lista',
+    'socios': 'socios:lista',
+    'seguimientos': 'seguimiento:lista',
+}
+
+
+class Command(BaseCommand):
+    help = 'Mide filas/segundo de la API JSON frente a las vistas HTML de lista'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--usuario', required=True, help='Usuario con el que se autentican las peticiones')
+        parser.add_argument('--recursos', nargs='*', default=list(COMPARACIONES), choices=list(COMPARACIONES))
+        parser.add_argument('--limit', type=int, default=1000, help='Tamaño de página de la API')
+        parser.add_argument('--max-paginas-html', type=int, default=50,
+                            help='Máximo de páginas HTML a recorrer por recurso')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        try:
+            user = User.objects.get(username=options['usuario'])
+        except User.DoesNotExist:
+            raise CommandError(f'No existe el usuario {options["usuario"]}')
+
+        host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else 'testserver'
+        client = Client(HTTP_HOST=host.lstrip('.'), secure=not settings.DEBUG)
+        client.force_login(user)
+
+        for recurso in options['recursos']:
+            url_html = COMPARACIONES[recurso]
+            filas_api, segundos_api = self.medir_api(client, recurso, options['limit'])
+            filas_html, segundos_html = self.medir_html(client, url_html, options['max_paginas_html'])
+
+            api_fps = filas_api / segundos_api if segundos_api else 0
+            html_fps = filas_html / segundos_html if segundos_html else 0
+            factor = api_fps / html_fps if html_fps else 0
+            self.stdout.write(
+                f'{recurso:<13} API: {filas_api} filas en {segundos_api:.3f}s ({api_fps:,.0f} filas/s) | '
+                f'HTML: {filas_html} filas en {segundos_html:.3f}s ({html_fps:,.0f} filas/s) | x{factor:.1f}'
+            )
+
+    def medir_api(self, client, recurso, limit):
+        url = f'{reverse("api:lista", args=[recurso])}?limit={limit}'
+        filas = 0
+        inicio = time.perf_counter()
+        while url:
+            data = client.get(url).json()
+            filas += len(data['results'])
+            url = data['next']
+        return filas, time.perf_counter() - inicio
+
+    def medir_html(self, client, url_name, max_paginas):
+        url = reverse(url_name)
+        view_class = resolve(url).func.view_class
+        total = view_class.model.objects.count()
+        paginas = min(max_paginas, max(1, -(-total // view_class.paginate_by)))
+
+        inicio = time.perf_counter()
+        for pagina in range(1, paginas + 1):
+            client.get(url, {'page': pagina})
+        segundos = time.perf_counter() - inicio
+        return min(total, paginas * view_class.paginate_by), segundos
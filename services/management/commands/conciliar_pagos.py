@@ -0,0 +1,96 @@
+"""
+Concilia las transacciones de las pasarelas contra las ventas de los clientes
+y reporta las discrepancias. Las pasarelas simuladas guardan las transacciones
+en la memoria del proceso, así que desde la línea de comandos se usa
+--simular N para generar N transacciones sintéticas sobre los clientes del
+periodo y medir el rendimiento.
+"""
+import csv
+import random
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from services.payment_gateway_mock import (PaymentMethod, PaymentResponse, PaymentStatus, mercadopago_service,
+                                           payu_service, wompi_service)
+from services.reconciliation import cargar_transacciones, cargar_ventas, conciliar, referencia_cliente
+
+
+class Command(BaseCommand):
+    help = 'Concilia pagos de PayU, Wompi y Mercado Pago contra las ventas de los clientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=date.fromisoformat, help='Fecha inicial (AAAA-MM-DD)')
+        parser.add_argument('--hasta', type=date.fromisoformat, help='Fecha final (AAAA-MM-DD, por defecto hoy)')
+        parser.add_argument('--tolerancia', type=int, default=3, help='Días de diferencia aceptados')
+        parser.add_argument('--csv', help='Archivo donde escribir las discrepancias')
+        parser.add_argument('--simular', type=int, default=0,
+                            help='Generar N transacciones sintéticas antes de conciliar')
+
+    def handle(self, *args, **options):
+        hasta = options['hasta'] or date.today()
+        desde = options['desde'] or hasta - timedelta(days=30)
+        if desde > hasta:
+            raise CommandError('--desde debe ser anterior a --hasta')
+
+        ventas = list(cargar_ventas(desde, hasta))
+        if options['simular']:
+            self.simular(ventas, options['simular'])
+
+        inicio = time.perf_counter()
+        resultado = conciliar(cargar_transacciones(desde, hasta), ventas, options['tolerancia'])
+        segundos = time.perf_counter() - inicio
+
+        self.stdout.write(
+            f'{resultado.transacciones} transacciones y {resultado.ventas} ventas en {segundos:.2f}s: '
+            f'{resultado.conciliados} conciliadas, {len(resultado.discrepancias)} discrepancias'
+        )
+        for tipo, cantidad in resultado.resumen.most_common():
+            self.stdout.write(f'  {tipo}: {cantidad}')
+
+        if options['csv']:
+            with open(options['csv'], 'w', newline='', encoding='utf-8') as archivo:
+                writer = csv.DictWriter(archivo, fieldnames=[
+                    'tipo', 'gateway', 'transaction_id', 'referencia', 'cliente_id',
+                    'monto_pago', 'monto_venta', 'fecha_pago', 'fecha_venta',
+                ])
+                writer.writeheader()
+                writer.writerows(resultado.filas())
+            self.stdout.write(self.style.SUCCESS(f'Discrepancias escritas en {options["csv"]}'))
+
+    def simular(self, ventas, cantidad):
+        """
+        Pagos sintéticos: uno por venta (con algunos errores de monto, referencia y
+        estado); si se piden más que ventas, el resto son pagos ajenos al CRM
+        """
+        if not ventas:
+            raise CommandError('No hay ventas en el periodo para simular pagos')
+        servicios = [payu_service, wompi_service, mercadopago_service]
+        inicio = time.perf_counter()
+        for i in range(cantidad):
+            cliente_id, valor_compra, fecha_compra = ventas[i % len(ventas)]
+            amount = float(valor_compra)
+            referencia = referencia_cliente(cliente_id)
+            if i >= len(ventas):
+                amount = float(random.randint(10000, 5000000))
+                referencia = f'EXT-{i}'
+            azar = random.random()
+            if azar < 0.02:
+                amount += 1000
+            elif azar < 0.04:
+                referencia = f'MANUAL-{uuid.uuid4().hex[:8]}'
+            creado = datetime.combine(fecha_compra, datetime.min.time()) + timedelta(hours=random.randint(8, 20))
+            transaction = PaymentResponse(
+                transaction_id=str(uuid.uuid4()),
+                reference=referencia,
+                status=PaymentStatus.APPROVED if random.random() < 0.97 else PaymentStatus.REFUNDED,
+                amount=amount,
+                currency='COP',
+                payment_method=PaymentMethod.CREDIT_CARD,
+                created_at=creado,
+                updated_at=creado,
+            )
+            random.choice(servicios).transactions[transaction.transaction_id] = transaction
+        self.stdout.write(f'{cantidad} transacciones simuladas en {time.perf_counter() - inicio:.2f}s')
@@ -0,0 +1,73 @@
+"""
+Envía un SMS de campaña a los teléfonos de los socios comerciales activos y/o
+de los clientes, en paralelo y con el límite de tasa del proveedor elegido.
+Con --proveedor auto el envío se reparte entre los proveedores según costo,
+tasa de éxito y latencia (services/sms_router.py).
+Con --cola solo los encola y el envío lo hace el worker procesar_cola_sms.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from clientes.models import Cliente
+from services.sms_mock import aws_sns_service, messagemedia_service, twilio_service
+from services.sms_queue import encolar_sms_masivo
+from services.sms_router import sms_router
+from socios.models import SocioComercial
+
+PROVEEDORES = {
+    'twilio': twilio_service,
+    'aws_sns': aws_sns_service,
+    'messagemedia': messagemedia_service,
+    'auto': sms_router,
+}
+
+
+class Command(BaseCommand):
+    help = 'Envía un SMS masivo a socios comerciales y/o clientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('mensaje', help='Texto del SMS')
+        parser.add_argument('--destinatarios', choices=['socios', 'clientes', 'todos'], default='socios')
+        parser.add_argument('--proveedor', choices=list(PROVEEDORES), default='twilio')
+        parser.add_argument('--workers', type=int, help='Envíos simultáneos')
+        parser.add_argument('--lote', type=int, help='Números por lote (frecuencia del reporte de avance)')
+        parser.add_argument('--cola', action='store_true',
+                            help='Encolar los mensajes para el worker en lugar de enviarlos ahora')
+
+    def handle(self, *args, **options):
+        numeros = []
+        if options['destinatarios'] in ('socios', 'todos'):
+            numeros += SocioComercial.objects.filter(activo=True).exclude(telefono='').values_list('telefono', flat=True)
+        if options['destinatarios'] in ('clientes', 'todos'):
+            numeros += Cliente.objects.exclude(telefono='').values_list('telefono', flat=True)
+        if not numeros:
+            raise CommandError('No hay destinatarios con teléfono')
+
+        servicio = PROVEEDORES[options['proveedor']]
+        if options['cola']:
+            # En modo auto la cola usa el proveedor mejor puntuado en este momento
+            proveedor = sms_router.ranking()[0] if servicio is sms_router else servicio.provider.value
+            encolados = encolar_sms_masivo(numeros, options['mensaje'], proveedor=proveedor)
+            self.stdout.write(self.style.SUCCESS(f'{encolados} SMS encolados'))
+            return
+
+        def avance(enviados, total):
+            self.stdout.write(f'  {enviados}/{total} enviados')
+
+        resultado = servicio.send_bulk_sms(
+            numeros,
+            options['mensaje'],
+            max_workers=options['workers'],
+            chunk_size=options['lote'],
+            # Con varios proveedores en paralelo el avance de cada parte no es el del total
+            progress_callback=None if servicio is sms_router else avance,
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Lote {resultado["batch_id"]}: {resultado["successful_sends"]} enviados, '
+            f'{resultado["failed_sends"]} fallidos, {resultado["duplicates_skipped"]} duplicados omitidos, '
+            f'costo ${resultado["total_cost"]:,}'
+        ))
+        if servicio is sms_router:
+            for proveedor, cantidad in resultado['providers'].items():
+                self.stdout.write(f'  {proveedor}: {cantidad} números')
+            self.stdout.write(f'  {resultado["failovers"]} reenviados por otro proveedor')
@@ -0,0 +1,89 @@
+"""
+Consulta en DataCrédito el score de todos los cupos pendientes, en paralelo,
+y guarda el resultado en cada cupo. Los documentos con una ConsultaCrediticia
+vigente no se vuelven a consultar. No aprueba ni rechaza: eso sigue siendo
+una decisión del asesor.
+"""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from clientes.models import CupoCredito
+from services.conditional import invalidar_version
+from services.datacredito_batch import consultar_scores_en_lote
+from services.datacredito_cache import datacredito_cache_service, normalizar_documento
+from services.datacredito_historial import consultas_vigentes, guardar_consulta
+from services.datacredito_mock import datacredito_service
+
+
+class Command(BaseCommand):
+    help = 'Consulta el score crediticio de los cupos pendientes y reporta el rendimiento'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help='Consultas simultáneas')
+        parser.add_argument('--timeout', type=float, default=5.0, help='Segundos máximos por consulta')
+        parser.add_argument('--rate-limit', type=float, default=10.0,
+                            help='Consultas por segundo permitidas (0 = sin límite)')
+        parser.add_argument('--limite', type=int, help='Máximo de cupos a evaluar')
+        parser.add_argument('--todos', action='store_true',
+                            help='Incluir cupos pendientes que ya tienen score')
+        parser.add_argument('--sin-cache', action='store_true',
+                            help='Consultar siempre DataCrédito, sin usar la caché')
+        parser.add_argument('--vigencia', type=int,
+                            help='Días durante los que se reutiliza una consulta guardada '
+                                 '(por defecto CONSULTA_CREDITICIA_VIGENCIA_DIAS; 0 = consultar siempre)')
+
+    def handle(self, *args, **options):
+        cupos = CupoCredito.objects.filter(estado='pendiente').exclude(numero_documento='')
+        if not options['todos']:
+            cupos = cupos.filter(score_crediticio__isnull=True)
+        cupos = list(cupos.order_by('fecha_creacion')[:options['limite']])
+        if not cupos:
+            self.stdout.write('No hay cupos pendientes por evaluar')
+            return
+
+        documentos = [(cupo.tipo_documento, cupo.numero_documento) for cupo in cupos]
+        vigentes = consultas_vigentes(documentos, options['vigencia'])
+        reutilizadas = len(vigentes)
+        lote = consultar_scores_en_lote(
+            [
+                (tipo_documento, numero_documento) for tipo_documento, numero_documento in documentos
+                if (tipo_documento.upper(), normalizar_documento(numero_documento)) not in vigentes
+            ],
+            service=datacredito_service if options['sin_cache'] else datacredito_cache_service,
+            max_workers=options['workers'],
+            timeout=options['timeout'],
+            rate_limit=options['rate_limit'] or None,
+        )
+
+        for (tipo_documento, numero_documento), respuesta in lote.resultados.items():
+            vigentes[(tipo_documento, numero_documento)] = guardar_consulta(numero_documento, tipo_documento, respuesta)
+
+        ahora = timezone.now()
+        actualizados = []
+        for cupo in cupos:
+            consulta = vigentes.get((cupo.tipo_documento.upper(), normalizar_documento(cupo.numero_documento)))
+            if consulta is None:
+                continue
+            cupo.score_crediticio = consulta.score
+            cupo.categoria_crediticia = consulta.categoria
+            cupo.fecha_consulta_credito = consulta.fecha_consulta
+            cupo.fecha_actualizacion = ahora
+            actualizados.append(cupo)
+
+        CupoCredito.objects.bulk_update(
+            actualizados,
+            ['score_crediticio', 'categoria_crediticia', 'fecha_consulta_credito', 'fecha_actualizacion'],
+            batch_size=500,
+        )
+        if actualizados:
+            invalidar_version(CupoCredito)
+
+        for (tipo_documento, numero_documento), error in lote.fallidos.items():
+            self.stderr.write(f'{tipo_documento} {numero_documento}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(actualizados)} de {len(cupos)} cupos evaluados '
+            f'({len(lote.resultados)} consultas exitosas, {len(lote.fallidos)} fallidas, '
+            f'{reutilizadas} reutilizadas) '
+            f'en {lote.duracion:.2f}s - {lote.consultas_por_segundo:.1f} consultas/s'
+        ))
@@ -0,0 +1,37 @@
+"""
+Worker de la cola de salida de SMS (services.sms_queue). Se deja corriendo
+como proceso aparte, p. ej. con systemd o supervisor.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from services.sms_queue import ProcesadorColaSMS
+
+
+class Command(BaseCommand):
+    help = 'Envía los SMS encolados, procesa las confirmaciones y reintenta los fallidos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=100, help='Envíos reclamados por vuelta')
+        parser.add_argument('--workers', type=int, default=10, help='Envíos simultáneos')
+        parser.add_argument('--intervalo', type=float, default=2.0,
+                            help='Segundos de espera cuando no hay nada que procesar')
+        parser.add_argument('--una-vez', action='store_true', help='Procesar una sola vuelta y salir')
+
+    def handle(self, *args, **options):
+        procesador = ProcesadorColaSMS(lote=options['lote'], max_workers=options['workers'])
+        try:
+            while True:
+                # Como en cada petición: descarta conexiones caídas o más viejas que CONN_MAX_AGE
+                close_old_connections()
+                resumen = procesador.procesar()
+                if any(resumen.values()):
+                    self.stdout.write(' '.join(f'{clave}={valor}' for clave, valor in resumen.items()))
+                if options['una_vez']:
+                    break
+                if not any(resumen.values()):
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
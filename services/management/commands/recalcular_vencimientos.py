@@ -0,0 +1,19 @@
+"""
+Recalcula la fecha de vencimiento del paso en curso de los seguimientos
+abiertos, p. ej. después de cambiar settings.SLA_SEGUIMIENTO_DIAS o de un
+update() masivo que no pasó por save()
+"""
+from django.core.management.base import BaseCommand
+
+from seguimiento.models import SeguimientoSocio
+
+
+class Command(BaseCommand):
+    help = 'Recalcula fecha_vencimiento de los seguimientos según los plazos del SLA'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Filas por UPDATE')
+
+    def handle(self, *args, **options):
+        cambiados = SeguimientoSocio.objects.recalcular_vencimientos(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{cambiados} seguimientos con nuevo vencimiento'))
@@ -0,0 +1,32 @@
+"""
+Reconstruye el agregado VentaDiaria desde los clientes, p. ej. después de
+cargas con bulk_create/update() que no pasaron por save() o para verificar
+que el agregado incremental no se desvió
+"""
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from clientes.models import Cliente
+from services.conditional import invalidar_version
+from services.ventas_diarias import reconstruir
+
+
+class Command(BaseCommand):
+    help = 'Recalcula VentaDiaria (ventas por día, socio y ciudad) desde Cliente'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', help='Primera fecha a reconstruir (AAAA-MM-DD)')
+        parser.add_argument('--hasta', help='Última fecha a reconstruir (AAAA-MM-DD)')
+
+    def handle(self, *args, **options):
+        try:
+            desde = date.fromisoformat(options['desde']) if options['desde'] else None
+            hasta = date.fromisoformat(options['hasta']) if options['hasta'] else None
+        except ValueError as exc:
+            raise CommandError(f'Fecha inválida: {exc}')
+
+        filas = reconstruir(desde, hasta)
+        # Las gráficas usan la versión de Cliente en su ETag
+        invalidar_version(Cliente)
+        self.stdout.write(self.style.SUCCESS(f'{filas} filas de ventas diarias'))
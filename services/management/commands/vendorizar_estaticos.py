@@ -0,0 +1,182 @@
+"""
+Descarga a static/vendor/ los assets que base.html cargaba desde CDNs externos,
+recorta las fuentes de iconos a los iconos que usan las plantillas y reescribe
+las referencias url() para que apunten a las copias locales
+"""
+import posixpath
+import re
+import urllib.request
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from services.static_assets import VENDOR_ASSETS
+
+try:
+    from fontTools import subset as font_subset
+except ImportError:  # fonttools es opcional: sin él se copian las fuentes completas
+    font_subset = None
+
+
+# Google Fonts solo entrega woff2 a navegadores modernos
+USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0 Safari/537.36'
+)
+
+CSS_URL_RE = re.compile(r'url\(\s*["\']?([^"\')]+)["\']?\s*\)')
+CONTENT_CODEPOINT_RE = re.compile(r'content\s*:\s*["\']\\([0-9a-fA-F]{2,6})["\']')
+FONT_EXTENSIONS = ('.woff2', '.woff', '.ttf', '.otf', '.eot', '.svg')
+
+
+def descargar(url):
+    request = urllib.request.Request(url, headers={'User-Agent': USER_AGENT})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return response.read()
+
+
+def dividir_bloques(css):
+    """
+    Divide una hoja de estilos en bloques de primer nivel (prelude, cuerpo),
+    respetando llaves anidadas de @media, @keyframes, @supports, etc.
+    """
+    bloques = []
+    profundidad = 0
+    inicio = 0
+    apertura = None
+    for i, caracter in enumerate(css):
+        if caracter == '{':
+            if profundidad == 0:
+                apertura = i
+            profundidad += 1
+        elif caracter == '}':
+            profundidad -= 1
+            if profundidad == 0:
+                bloques.append((css[inicio:apertura].strip(), css[apertura + 1:i]))
+                inicio = i + 1
+    return bloques
+
+
+def recortar_iconos(css, prefix, usados):
+    """
+    Conserva solo las reglas cuyos selectores de iconos (clases con el prefijo
+    dado) aparecen en las plantillas. Las reglas sin clases de iconos y los
+    bloques @ se conservan tal cual.
+    """
+    clase_re = re.compile(r'\.(' + re.escape(prefix) + r'[a-z0-9-]+)')
+    salida = []
+    for prelude, cuerpo in dividir_bloques(css):
+        if prelude.startswith('@'):
+            salida.append(f'{prelude}{{{cuerpo}}}')
+            continue
+
+        selectores = [
+            selector for selector in prelude.split(',')
+            if all(clase in usados for clase in clase_re.findall(selector))
+        ]
+        if selectores:
+            salida.append(f'{",".join(selectores)}{{{cuerpo}}}')
+    return '\n'.join(salida)
+
+
+class Command(BaseCommand):
+    help = 'Vendoriza los assets de terceros (Bootstrap, iconos, fuentes) en static/vendor/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sin-recorte',
+            action='store_true',
+            help='No recortar las fuentes de iconos a los iconos usados',
+        )
+        parser.add_argument(
+            '--incluir',
+            nargs='*',
+            default=[],
+            help='Clases de iconos adicionales a conservar (ej. bi-star fa-user)',
+        )
+
+    def handle(self, *args, **options):
+        static_dir = Path(settings.STATICFILES_DIRS[0])
+        usados = self.iconos_usados() | set(options['incluir'])
+
+        for nombre, asset in VENDOR_ASSETS.items():
+            destino = static_dir / asset['path']
+            destino.parent.mkdir(parents=True, exist_ok=True)
+            self.stdout.write(f'Descargando {nombre}...')
+
+            try:
+                contenido = descargar(asset['url'])
+            except OSError as exc:
+                raise CommandError(f'No se pudo descargar {asset["url"]}: {exc}')
+
+            if not asset['path'].endswith('.css'):
+                destino.write_bytes(contenido)
+                continue
+
+            css = contenido.decode('utf-8')
+            codepoints = None
+            if asset.get('icon_prefix') and not options['sin_recorte']:
+                css = recortar_iconos(css, asset['icon_prefix'], usados)
+                codepoints = {int(cp, 16) for cp in CONTENT_CODEPOINT_RE.findall(css)}
+                self.stdout.write(f'  {len(codepoints)} iconos conservados')
+
+            css = self.vendorizar_urls(css, asset['url'], destino.parent, codepoints)
+            destino.write_text(css, encoding='utf-8')
+
+        self.stdout.write(self.style.SUCCESS('Assets vendorizados en static/vendor/'))
+
+    def iconos_usados(self):
+        """Clases bi-* y fa-* referenciadas en las plantillas del proyecto"""
+        directorios = [Path(d) for d in settings.TEMPLATES[0]['DIRS']]
+        for app_config in apps.get_app_configs():
+            directorios.append(Path(app_config.path) / 'templates')
+
+        usados = set()
+        for directorio in directorios:
+            for plantilla in directorio.rglob('*.html'):
+                texto = plantilla.read_text(encoding='utf-8', errors='ignore')
+                usados.update(re.findall(r'\b((?:bi|fa)-[a-z0-9-]+)', texto))
+        return usados
+
+    def vendorizar_urls(self, css, css_url, directorio, codepoints):
+        """Descarga los archivos referenciados con url() y reescribe las rutas"""
+        descargados = {}
+
+        def reemplazar(match):
+            referencia = match.group(1)
+            if referencia.startswith('data:'):
+                return match.group(0)
+
+            absoluta = urljoin(css_url, referencia)
+            if absoluta not in descargados:
+                nombre = posixpath.basename(urlsplit(absoluta).path)
+                archivo = directorio / 'fonts' / nombre
+                archivo.parent.mkdir(parents=True, exist_ok=True)
+                archivo.write_bytes(descargar(absoluta))
+                if codepoints is not None and nombre.endswith(FONT_EXTENSIONS):
+                    self.recortar_fuente(archivo, codepoints)
+                descargados[absoluta] = f'fonts/{nombre}'
+            return f'url("{descargados[absoluta]}")'
+
+        return CSS_URL_RE.sub(reemplazar, css)
+
+    def recortar_fuente(self, archivo, codepoints):
+        """Reduce la fuente a los glifos de los iconos conservados"""
+        if font_subset is None or archivo.suffix in ('.eot', '.svg'):
+            return
+
+        opciones = font_subset.Options()
+        opciones.flavor = archivo.suffix.lstrip('.') if archivo.suffix in ('.woff', '.woff2') else None
+        opciones.layout_features = ['*']
+        try:
+            fuente = font_subset.load_font(str(archivo), opciones)
+            subsetter = font_subset.Subsetter(opciones)
+            subsetter.populate(unicodes=codepoints)
+            subsetter.subset(fuente)
+            font_subset.save_font(fuente, str(archivo), opciones)
+        except Exception as exc:
+            # Una fuente que no se puede recortar se deja completa
+            self.stderr.write(f'  No se pudo recortar {archivo.name}: {exc}')
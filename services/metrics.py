@@ -0,0 +1,385 @@
+"""
+Métricas de ejecución en formato Prometheus
+Cada proceso (worker de gunicorn) acumula sus métricas en memoria y las vuelca
+periódicamente a un archivo propio dentro de METRICS_DIR; el endpoint /metrics
+suma los archivos de todos los workers antes de exponerlos.
+"""
+import atexit
+import fcntl
+import functools
+import inspect
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+
+# Límites superiores (en segundos) de los buckets de los histogramas de latencia
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Descripción de cada métrica para las líneas # HELP
+METRICS_HELP = {
+    'crm_http_requests_total': 'Peticiones HTTP atendidas por vista, método y código de estado',
+    'crm_http_request_duration_seconds': 'Latencia de las peticiones HTTP por vista',
+    'crm_db_queries_total': 'Consultas SQL ejecutadas por vista',
+    'crm_db_query_duration_seconds_total': 'Tiempo acumulado en consultas SQL por vista',
+    'crm_cache_requests_total': 'Lecturas de caché por backend y resultado (hit/miss)',
+    'crm_export_duration_seconds': 'Duración de las exportaciones CSV',
+    'crm_export_rows_total': 'Filas escritas por las exportaciones CSV',
+    'crm_external_call_duration_seconds': 'Latencia de las llamadas a servicios externos',
+}
+
+PROCESS_FILE_PREFIX = 'metrics_'
+ARCHIVE_FILE = 'metrics_archivo.json'
+
+
+def _labels_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+class MetricsRegistry:
+    """Contadores e histogramas del proceso actual"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._last_flush = time.monotonic()
+        self._process_id = self._nuevo_process_id()
+
+    @staticmethod
+    def _nuevo_process_id():
+        # pid + token: un pid reutilizado por un worker nuevo no pisa el archivo anterior
+        return f'{os.getpid()}_{uuid.uuid4().hex[:8]}'
+
+    def reiniciar_en_hijo(self):
+        """
+        Después de un fork (gunicorn con preload_app): el worker escribe su
+        propio archivo y no vuelve a contar lo que el master ya tenía en memoria
+        """
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self._last_flush = time.monotonic()
+        self._process_id = self._nuevo_process_id()
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+        self.maybe_flush()
+
+    def observe(self, name, value, labels=None, buckets=LATENCY_BUCKETS):
+        key = (name, _labels_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': list(buckets),
+                    'counts': [0] * len(buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            index = bisect_left(histogram['buckets'], value)
+            if index < len(histogram['counts']):
+                histogram['counts'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'counters': [[name, list(labels), value] for (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, list(labels), dict(data, counts=list(data['counts']))]
+                    for (name, labels), data in self.histograms.items()
+                ],
+            }
+
+    def maybe_flush(self):
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def flush(self):
+        """Vuelca el estado del proceso a su archivo en METRICS_DIR"""
+        directory = metrics_dir()
+        if directory is None:
+            return
+        self._last_flush = time.monotonic()
+        path = directory / f'{PROCESS_FILE_PREFIX}{self._process_id}.json'
+        _write_json_atomic(path, self.snapshot())
+
+
+registry = MetricsRegistry()
+atexit.register(registry.flush)
+os.register_at_fork(after_in_child=registry.reiniciar_en_hijo)
+
+
+def metrics_enabled():
+    return settings.configured and getattr(settings, 'METRICS_ENABLED', False)
+
+
+def metrics_dir():
+    if not metrics_enabled():
+        return None
+    directory = Path(getattr(settings, 'METRICS_DIR', None) or Path(tempfile.gettempdir()) / 'crm_socios_metrics')
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def _write_json_atomic(path, data):
+    tmp_path = path.with_suffix(f'.tmp{os.getpid()}')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(total, snapshot):
+    for name, labels, value in snapshot.get('counters', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        total['counters'][key] = total['counters'].get(key, 0) + value
+    for name, labels, data in snapshot.get('histograms', []):
+        key = (name, tuple(tuple(pair) for pair in labels))
+        current = total['histograms'].get(key)
+        if current is None or current['buckets'] != data['buckets']:
+            total['histograms'][key] = dict(data, counts=list(data['counts']))
+            continue
+        current['counts'] = [a + b for a, b in zip(current['counts'], data['counts'])]
+        current['sum'] += data['sum']
+        current['count'] += data['count']
+
+
+def _to_snapshot(total):
+    return {
+        'counters': [[name, [list(p) for p in labels], value] for (name, labels), value in total['counters'].items()],
+        'histograms': [[name, [list(p) for p in labels], data] for (name, labels), data in total['histograms'].items()],
+    }
+
+
+def collect():
+    """
+    Suma las métricas de todos los workers. Los archivos de procesos que ya
+    terminaron (max_requests recicla workers) se compactan en un archivo
+    de archivo histórico para que el directorio no crezca sin límite.
+    """
+    registry.flush()
+    directory = metrics_dir()
+    total = {'counters': {}, 'histograms': {}}
+    if directory is None:
+        _merge(total, registry.snapshot())
+        return total
+
+    with open(directory / '.lock', 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        archive_path = directory / ARCHIVE_FILE
+        archive = {'counters': {}, 'histograms': {}}
+        if archive_path.exists():
+            _merge(archive, json.loads(archive_path.read_text(encoding='utf-8')))
+
+        compacted = []
+        for path in directory.glob(f'{PROCESS_FILE_PREFIX}*_*.json'):
+            try:
+                snapshot = json.loads(path.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                continue
+            pid = int(path.stem[len(PROCESS_FILE_PREFIX):].split('_')[0])
+            if _pid_alive(pid):
+                _merge(total, snapshot)
+            else:
+                _merge(archive, snapshot)
+                compacted.append(path)
+
+        if compacted:
+            _write_json_atomic(archive_path, _to_snapshot(archive))
+            for path in compacted:
+                path.unlink(missing_ok=True)
+
+    _merge(total, _to_snapshot(archive))
+    return total
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus(total):
+    """Serializa las métricas agregadas en el formato de texto de Prometheus"""
+    lines = []
+    by_name = {}
+    for (name, labels), value in total['counters'].items():
+        by_name.setdefault(name, ('counter', []))[1].append((labels, value))
+    for (name, labels), data in total['histograms'].items():
+        by_name.setdefault(name, ('histogram', []))[1].append((labels, data))
+
+    for name in sorted(by_name):
+        kind, samples = by_name[name]
+        if name in METRICS_HELP:
+            lines.append(f'# HELP {name} {METRICS_HELP[name]}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in sorted(samples, key=lambda s: s[0]):
+            if kind == 'counter':
+                lines.append(f'{name}{_format_labels(labels)} {value}')
+                continue
+            acumulado = 0
+            for bucket, count in zip(value['buckets'], value['counts']):
+                acumulado += count
+                lines.append(f'{name}_bucket{_format_labels(labels, [("le", bucket)])} {acumulado}')
+            lines.append(f'{name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value["count"]}')
+            lines.append(f'{name}_sum{_format_labels(labels)} {value["sum"]}')
+            lines.append(f'{name}_count{_format_labels(labels)} {value["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+class MetricsMiddleware:
+    """
+    Registra latencia por nombre de URL (clientes:lista, socios:detalle,
+    export_clientes_csv, ...) y el número/tiempo de consultas SQL de cada petición
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not metrics_enabled():
+            return self.get_response(request)
+
+        consultas = {'count': 0, 'time': 0.0}
+
+        def contar_consulta(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                consultas['count'] += 1
+                consultas['time'] += time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        with connection.execute_wrapper(contar_consulta):
+            response = self.get_response(request)
+        duracion = time.perf_counter() - inicio
+
+        match = getattr(request, 'resolver_match', None)
+        vista = match.view_name if match else 'sin_ruta'
+        registry.inc('crm_http_requests_total', {
+            'view': vista, 'method': request.method, 'status': str(response.status_code),
+        })
+        registry.observe('crm_http_request_duration_seconds', duracion, {'view': vista})
+        registry.inc('crm_db_queries_total', {'view': vista}, consultas['count'])
+        registry.inc('crm_db_query_duration_seconds_total', {'view': vista}, consultas['time'])
+        return response
+
+
+@contextmanager
+def medir_exportacion(nombre):
+    """
+    Mide la duración y las filas de una exportación CSV
+
+    Uso:
+        with medir_exportacion('clientes') as exportacion:
+            for fila in ...:
+                exportacion['filas'] += 1
+    """
+    exportacion = {'filas': 0}
+    inicio = time.perf_counter()
+    try:
+        yield exportacion
+    finally:
+        registry.observe('crm_export_duration_seconds', time.perf_counter() - inicio, {'export': nombre})
+        registry.inc('crm_export_rows_total', {'export': nombre}, exportacion['filas'])
+
+
+def medir_llamada_externa(servicio):
+    """
+    Decorador para los métodos públicos de los servicios externos: registra la
+    latencia por servicio, proveedor, operación y resultado (según 'success').
+    Acepta también métodos async (corrutinas).
+    """
+    def registrar(self, func, inicio, respuesta):
+        if respuesta is _MISS:
+            resultado = 'error'
+        elif isinstance(respuesta, dict):
+            resultado = 'ok' if respuesta.get('success') else 'fallido'
+        else:
+            resultado = 'ok'
+        registry.observe('crm_external_call_duration_seconds', time.perf_counter() - inicio, {
+            'service': servicio,
+            'provider': getattr(self, 'proveedor_metricas', servicio),
+            'operation': func.__name__,
+            'outcome': resultado,
+        })
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(self, *args, **kwargs):
+                inicio = time.perf_counter()
+                respuesta = _MISS
+                try:
+                    respuesta = await func(self, *args, **kwargs)
+                    return respuesta
+                finally:
+                    registrar(self, func, inicio, respuesta)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            inicio = time.perf_counter()
+            respuesta = _MISS
+            try:
+                respuesta = func(self, *args, **kwargs)
+                return respuesta
+            finally:
+                registrar(self, func, inicio, respuesta)
+        return wrapper
+    return decorator
+
+
+_MISS = object()
+
+
+class CacheMetricsMixin:
+    """Cuenta hits y misses de las lecturas de caché"""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISS, version)
+        hit = value is not _MISS
+        registry.inc('crm_cache_requests_total', {
+            'backend': type(self).__name__, 'result': 'hit' if hit else 'miss',
+        })
+        return value if hit else default
+
+
+class InstrumentedLocMemCache(CacheMetricsMixin, LocMemCache):
+    pass
+
+
+class InstrumentedFileBasedCache(CacheMetricsMixin, FileBasedCache):
+    pass
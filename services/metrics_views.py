@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views import View
+
+from .metrics import collect, render_prometheus
+
+
+class MetricsView(View):
+    """
+    Expone las métricas agregadas de todos los workers en formato Prometheus.
+    Acceso para usuarios staff o para el scraper con 'Authorization: Bearer <METRICS_TOKEN>'.
+    """
+
+    def get(self, request, *args, **kwargs):
+        if not self.autorizado(request):
+            return HttpResponseForbidden('No autorizado')
+
+        return HttpResponse(
+            render_prometheus(collect()),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )
+
+    def autorizado(self, request):
+        if request.user.is_authenticated and request.user.is_staff:
+            return True
+
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        return bool(token) and constant_time_compare(authorization, f'Bearer {token}')
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PerfilPeticion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ruta', models.CharField(max_length=500, verbose_name='Ruta')),
+                ('vista', models.CharField(blank=True, max_length=200, verbose_name='Vista')),
+                ('metodo', models.CharField(max_length=10, verbose_name='Método')),
+                ('codigo_estado', models.PositiveSmallIntegerField(verbose_name='Código de Estado')),
+                ('motivo', models.CharField(choices=[('muestreo', 'Muestreo aleatorio'), ('lenta', 'Supera el umbral de lentitud')], max_length=20, verbose_name='Motivo')),
+                ('duracion', models.FloatField(verbose_name='Duración (s)')),
+                ('num_consultas', models.PositiveIntegerField(default=0, verbose_name='Consultas SQL')),
+                ('tiempo_sql', models.FloatField(default=0, verbose_name='Tiempo SQL (s)')),
+                ('consultas_sql', models.JSONField(blank=True, default=list, verbose_name='Consultas SQL ejecutadas')),
+                ('pila_colapsada', models.TextField(blank=True, help_text="Formato 'frame;frame;frame conteo', compatible con flamegraph.pl y speedscope", verbose_name='Pilas colapsadas')),
+                ('resumen_cprofile', models.TextField(blank=True, verbose_name='Resumen cProfile')),
+                ('datos_cprofile', models.BinaryField(blank=True, null=True, verbose_name='Datos cProfile (pstats)')),
+                ('usuario', models.CharField(blank=True, max_length=150, verbose_name='Usuario')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Perfil de Petición',
+                'verbose_name_plural': 'Perfiles de Peticiones',
+                'ordering': ['-fecha_creacion'],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContadorSMS',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('proveedor', models.CharField(max_length=20, verbose_name='Proveedor')),
+                ('minuto', models.DateTimeField(verbose_name='Minuto')),
+                ('status', models.CharField(max_length=15, verbose_name='Estado')),
+                ('cantidad', models.IntegerField(default=0, verbose_name='Cantidad')),
+                ('costo', models.DecimalField(decimal_places=2, default=0, max_digits=14, verbose_name='Costo')),
+            ],
+            options={
+                'verbose_name': 'Contador SMS',
+                'verbose_name_plural': 'Contadores SMS',
+                'constraints': [models.UniqueConstraint(fields=('proveedor', 'minuto', 'status'), name='contador_sms_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MensajeSMS',
+            fields=[
+                ('message_id', models.CharField(max_length=36, primary_key=True, serialize=False, verbose_name='ID del Mensaje')),
+                ('proveedor', models.CharField(max_length=20, verbose_name='Proveedor')),
+                ('to_number', models.CharField(max_length=20, verbose_name='Destino')),
+                ('from_number', models.CharField(max_length=20, verbose_name='Remitente')),
+                ('message', models.TextField(verbose_name='Mensaje')),
+                ('status', models.CharField(max_length=15, verbose_name='Estado')),
+                ('cost', models.DecimalField(decimal_places=2, default=0, max_digits=10, verbose_name='Costo')),
+                ('error_message', models.CharField(blank=True, max_length=200, null=True, verbose_name='Error')),
+                ('provider_response_code', models.CharField(blank=True, max_length=50, null=True, verbose_name='Código del Proveedor')),
+                ('created_at', models.DateTimeField(verbose_name='Fecha de Envío')),
+                ('updated_at', models.DateTimeField(verbose_name='Última Actualización')),
+            ],
+            options={
+                'verbose_name': 'Mensaje SMS',
+                'verbose_name_plural': 'Mensajes SMS',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['proveedor', 'created_at'], name='services_me_proveed_b837e4_idx')],
+            },
+        ),
+    ]
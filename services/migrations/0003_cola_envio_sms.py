@@ -0,0 +1,38 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0002_mensajes_sms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EnvioSMS',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('to_number', models.CharField(max_length=20, verbose_name='Destino')),
+                ('message', models.TextField(verbose_name='Mensaje')),
+                ('from_number', models.CharField(blank=True, max_length=20, verbose_name='Remitente')),
+                ('proveedor', models.CharField(default='TWILIO', max_length=20, verbose_name='Proveedor')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('enviando', 'Enviando'), ('enviado', 'Enviado (esperando confirmación)'), ('entregado', 'Entregado'), ('fallido', 'Fallido')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('intentos', models.PositiveSmallIntegerField(default=0, verbose_name='Intentos')),
+                ('proximo_intento', models.DateTimeField(blank=True, help_text='Cuándo reintentar el envío (pendiente) o consultar la confirmación (enviado)', null=True, verbose_name='Próximo Intento')),
+                ('lote', models.CharField(blank=True, max_length=32, verbose_name='Lote del Worker')),
+                ('reclamado_en', models.DateTimeField(blank=True, null=True, verbose_name='Reclamado en')),
+                ('message_id', models.CharField(blank=True, db_index=True, max_length=36, verbose_name='ID del Mensaje')),
+                ('ultimo_error', models.CharField(blank=True, max_length=200, verbose_name='Último Error')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Envío SMS',
+                'verbose_name_plural': 'Envíos SMS',
+                'ordering': ['-fecha_creacion'],
+                'indexes': [models.Index(fields=['estado', 'proximo_intento'], name='services_en_estado_0ba88a_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('services', '0003_cola_envio_sms'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClaveIdempotencia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(max_length=255, unique=True, verbose_name='Clave')),
+                ('huella', models.CharField(max_length=64, verbose_name='Huella de la Solicitud')),
+                ('respuesta', models.JSONField(blank=True, null=True, verbose_name='Transacción Original')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('expira_en', models.DateTimeField(db_index=True, verbose_name='Expira en')),
+            ],
+            options={
+                'verbose_name': 'Clave de Idempotencia',
+                'verbose_name_plural': 'Claves de Idempotencia',
+            },
+        ),
+    ]
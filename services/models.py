@@ -0,0 +1,133 @@
+from django.db import models
+
+
+class PerfilPeticion(models.Model):
+    MOTIVO_CHOICES = [
+        ('muestreo', 'Muestreo aleatorio'),
+        ('lenta', 'Supera el umbral de lentitud'),
+    ]
+
+    ruta = models.CharField(max_length=500, verbose_name="Ruta")
+    vista = models.CharField(max_length=200, verbose_name="Vista", blank=True)
+    metodo = models.CharField(max_length=10, verbose_name="Método")
+    codigo_estado = models.PositiveSmallIntegerField(verbose_name="Código de Estado")
+    motivo = models.CharField(max_length=20, choices=MOTIVO_CHOICES, verbose_name="Motivo")
+    duracion = models.FloatField(verbose_name="Duración (s)")
+    num_consultas = models.PositiveIntegerField(default=0, verbose_name="Consultas SQL")
+    tiempo_sql = models.FloatField(default=0, verbose_name="Tiempo SQL (s)")
+    consultas_sql = models.JSONField(default=list, blank=True, verbose_name="Consultas SQL ejecutadas")
+    pila_colapsada = models.TextField(
+        blank=True,
+        verbose_name="Pilas colapsadas",
+        help_text="Formato 'frame;frame;frame conteo', compatible con flamegraph.pl y speedscope"
+    )
+    resumen_cprofile = models.TextField(blank=True, verbose_name="Resumen cProfile")
+    datos_cprofile = models.BinaryField(null=True, blank=True, verbose_name="Datos cProfile (pstats)")
+    usuario = models.CharField(max_length=150, blank=True, verbose_name="Usuario")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Perfil de Petición"
+        verbose_name_plural = "Perfiles de Peticiones"
+        ordering = ['-fecha_creacion']
+
+    def __str__(self):
+        return f"{self.metodo} {self.ruta} ({self.duracion:.2f}s)"
+
+
+class MensajeSMS(models.Model):
+    """Mensaje enviado por SMSMockService (almacén 'db', ver services/sms_store.py)"""
+    message_id = models.CharField(max_length=36, primary_key=True, verbose_name="ID del Mensaje")
+    proveedor = models.CharField(max_length=20, verbose_name="Proveedor")
+    to_number = models.CharField(max_length=20, verbose_name="Destino")
+    from_number = models.CharField(max_length=20, verbose_name="Remitente")
+    message = models.TextField(verbose_name="Mensaje")
+    status = models.CharField(max_length=15, verbose_name="Estado")
+    cost = models.DecimalField(max_digits=10, decimal_places=2, default=0, verbose_name="Costo")
+    error_message = models.CharField(max_length=200, null=True, blank=True, verbose_name="Error")
+    provider_response_code = models.CharField(max_length=50, null=True, blank=True, verbose_name="Código del Proveedor")
+    created_at = models.DateTimeField(verbose_name="Fecha de Envío")
+    updated_at = models.DateTimeField(verbose_name="Última Actualización")
+
+    class Meta:
+        verbose_name = "Mensaje SMS"
+        verbose_name_plural = "Mensajes SMS"
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['proveedor', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.to_number} - {self.status}"
+
+
+class ContadorSMS(models.Model):
+    """Mensajes y costo por proveedor, minuto de envío y estado actual"""
+    proveedor = models.CharField(max_length=20, verbose_name="Proveedor")
+    minuto = models.DateTimeField(verbose_name="Minuto")
+    status = models.CharField(max_length=15, verbose_name="Estado")
+    cantidad = models.IntegerField(default=0, verbose_name="Cantidad")
+    costo = models.DecimalField(max_digits=14, decimal_places=2, default=0, verbose_name="Costo")
+
+    class Meta:
+        verbose_name = "Contador SMS"
+        verbose_name_plural = "Contadores SMS"
+        constraints = [
+            models.UniqueConstraint(fields=['proveedor', 'minuto', 'status'], name='contador_sms_unico'),
+        ]
+
+    def __str__(self):
+        return f"{self.proveedor} {self.minuto:%Y-%m-%d %H:%M} {self.status}: {self.cantidad}"
+
+
+class EnvioSMS(models.Model):
+    """Cola de salida de SMS; la procesa el comando procesar_cola_sms"""
+    ESTADO_CHOICES = [
+        ('pendiente', 'Pendiente'),
+        ('enviando', 'Enviando'),
+        ('enviado', 'Enviado (esperando confirmación)'),
+        ('entregado', 'Entregado'),
+        ('fallido', 'Fallido'),
+    ]
+
+    to_number = models.CharField(max_length=20, verbose_name="Destino")
+    message = models.TextField(verbose_name="Mensaje")
+    from_number = models.CharField(max_length=20, blank=True, verbose_name="Remitente")
+    proveedor = models.CharField(max_length=20, default='TWILIO', verbose_name="Proveedor")
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default='pendiente', verbose_name="Estado")
+    intentos = models.PositiveSmallIntegerField(default=0, verbose_name="Intentos")
+    proximo_intento = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name="Próximo Intento",
+        help_text="Cuándo reintentar el envío (pendiente) o consultar la confirmación (enviado)"
+    )
+    lote = models.CharField(max_length=32, blank=True, verbose_name="Lote del Worker")
+    reclamado_en = models.DateTimeField(null=True, blank=True, verbose_name="Reclamado en")
+    message_id = models.CharField(max_length=36, blank=True, db_index=True, verbose_name="ID del Mensaje")
+    ultimo_error = models.CharField(max_length=200, blank=True, verbose_name="Último Error")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Envío SMS"
+        verbose_name_plural = "Envíos SMS"
+        ordering = ['-fecha_creacion']
+        indexes = [models.Index(fields=['estado', 'proximo_intento'])]
+
+    def __str__(self):
+        return f"{self.to_number} - {self.get_estado_display()}"
+
+
+class ClaveIdempotencia(models.Model):
+    """Clave de idempotencia de un pago (almacén 'db', ver services/idempotency.py)"""
+    clave = models.CharField(max_length=255, unique=True, verbose_name="Clave")
+    huella = models.CharField(max_length=64, verbose_name="Huella de la Solicitud")
+    respuesta = models.JSONField(null=True, blank=True, verbose_name="Transacción Original")
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    expira_en = models.DateTimeField(db_index=True, verbose_name="Expira en")
+
+    class Meta:
+        verbose_name = "Clave de Idempotencia"
+        verbose_name_plural = "Claves de Idempotencia"
+
+    def __str__(self):
+        return self.clave
@@ -2,14 +2,21 @@
 Simulador de Pasarelas de Pago
 Simula las respuestas de PayU, Wompi, Mercado Pago, etc.
 """
-import random
+import asyncio
 import time
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from asgiref.sync import sync_to_async
+
+from .idempotency import COMPLETADO, CONFLICTO, NUEVO, IdempotencyStore, crear_idempotency_store, huella_solicitud
+from .latency_profiles import SimuladorMixin
+from .metrics import medir_llamada_externa
+from .scheduler import Programador
+
 
 class PaymentStatus(Enum):
     """Estados posibles de un pago"""
@@ -71,16 +78,64 @@ class PaymentResponse:
         data['status'] = self.status.value
         data['payment_method'] = self.payment_method.value
         return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PaymentResponse":
+        """Reconstruye la respuesta desde to_dict() (fechas como datetime o ISO)"""
+        data = dict(data)
+        data['status'] = PaymentStatus(data['status'])
+        data['payment_method'] = PaymentMethod(data['payment_method'])
+        for campo in ('created_at', 'updated_at'):
+            if isinstance(data[campo], str):
+                data[campo] = datetime.fromisoformat(data[campo])
+        return cls(**data)
+
+
+# Resuelve los pagos pendientes en un hilo de fondo del proceso
+programador_confirmaciones = Programador('confirmaciones-pagos')
 
+# confirmation_url -> funciones que reciben la notificación ('*' recibe todas)
+confirmation_handlers: Dict[str, List[Callable[[Dict[str, Any]], None]]] = {}
 
-class PaymentGatewayMockService:
+
+def registrar_confirmacion(confirmation_url: str, handler: Callable[[Dict[str, Any]], None]):
+    """
+    Registra una función que recibe las confirmaciones enviadas a confirmation_url
+    (equivalente en proceso al webhook de la pasarela)
+    """
+    confirmation_handlers.setdefault(confirmation_url, []).append(handler)
+
+
+class PaymentGatewayMockService(SimuladorMixin):
     """
     Servicio simulado para pasarelas de pago
     Simula comportamientos de PayU, Wompi, Mercado Pago, etc.
     """
     
-    def __init__(self, gateway_name: str = "PayU"):
+    SERVICIO = "payment_gateway"
+    
+    # Latencia simulada (segundos mínimo, máximo) por operación; la
+    # distribución real la define el perfil (ver services/latency_profiles.py)
+    LATENCIAS = {
+        "create_payment": (0.5, 2.0),
+        "get_payment_status": (0.2, 0.8),
+        "refund_payment": (1.0, 3.0),
+        "cancel_payment": (0.5, 1.5),
+        "get_payments_status": (0.2, 0.8),
+    }
+    
+    # Métodos en los que el pago queda pendiente hasta que el cliente lo completa
+    METODOS_DIFERIDOS = {PaymentMethod.PSE, PaymentMethod.EFECTY, PaymentMethod.BALOTO}
+    
+    # Segundos (mínimo, máximo) hasta que la pasarela confirma un pago pendiente
+    DEMORA_CONFIRMACION = (2.0, 15.0)
+    
+    # Segundos que espera un reintento mientras la solicitud original con la misma clave termina
+    ESPERA_IDEMPOTENCIA = 5.0
+    
+    def __init__(self, gateway_name: str = "PayU", idempotency_store: Optional[IdempotencyStore] = None):
         self.gateway_name = gateway_name
+        self.proveedor_metricas = gateway_name
         self.api_key = "mock_api_key"
         self.merchant_id = "mock_merchant_123"
         self.base_url = f"https://api.{gateway_name.lower()}-mock.com"
@@ -98,29 +153,85 @@ class PaymentGatewayMockService:
         
         # Almacenamiento en memoria de transacciones
         self.transactions = {}
+        self.confirmation_urls = {}
+        
+        # Claves de idempotencia de create_payment (en memoria o en base de datos según settings)
+        self.idempotency_store = idempotency_store if idempotency_store is not None else crear_idempotency_store()
+        
+        self.configurar_simulacion()
     
-    def create_payment(self, payment_request: PaymentRequest) -> Dict[str, Any]:
+    def nombre_instancia(self) -> str:
+        return f"{type(self).__name__}:{self.gateway_name}"
+    
+    @medir_llamada_externa('payment_gateway')
+    def create_payment(self, payment_request: PaymentRequest,
+                       idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         Crea una nueva transacción de pago
         
         Args:
             payment_request: Datos de la solicitud de pago
+            idempotency_key: Clave de idempotencia (por defecto la referencia del pago);
+                             un reintento con la misma clave devuelve la transacción original
             
         Returns:
             Dict con la respuesta de la transacción
         """
-        # Simular latencia de red
-        time.sleep(random.uniform(0.5, 2.0))
+        clave, huella = self._idempotencia(payment_request, idempotency_key)
+        estado, original = self.idempotency_store.esperar(clave, huella, self.ESPERA_IDEMPOTENCIA)
+        if estado != NUEVO:
+            return self._respuesta_repetida(estado, original)
         
+        try:
+            # Simular latencia de red
+            time.sleep(self._latencia("create_payment"))
+            
+            respuesta = self._armar_pago(payment_request)
+        except BaseException:
+            self.idempotency_store.liberar(clave)
+            raise
+        self.idempotency_store.completar(clave, respuesta["transaction"])
+        return respuesta
+    
+    def _idempotencia(self, payment_request: PaymentRequest, idempotency_key: Optional[str]):
+        """Clave (por pasarela) y huella de la solicitud"""
+        clave = f"{self.gateway_name}:{idempotency_key or payment_request.reference}"
+        return clave, huella_solicitud(payment_request.to_dict())
+    
+    def _respuesta_repetida(self, estado: str, original: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """Respuesta de create_payment cuando la clave de idempotencia ya se había usado"""
+        if estado == COMPLETADO:
+            payment_response = PaymentResponse.from_dict(original)
+            self.transactions.setdefault(payment_response.transaction_id, payment_response)
+            return {**self._respuesta_pago(payment_response), "idempotent_replay": True}
+        if estado == CONFLICTO:
+            return {
+                "success": False,
+                "error": "La clave de idempotencia ya se usó con otros datos de pago",
+                "code": "IDEMPOTENCY_KEY_REUSED"
+            }
+        return {
+            "success": False,
+            "error": "Hay una solicitud en curso con la misma clave de idempotencia",
+            "code": "IDEMPOTENCY_IN_PROGRESS"
+        }
+    
+    def _armar_pago(self, payment_request: PaymentRequest) -> Dict[str, Any]:
+        """Registra la transacción y genera la respuesta de create_payment"""
         transaction_id = str(uuid.uuid4())
         
         # Determinar el resultado basado en las probabilidades
         success_rate = self.success_rates.get(payment_request.payment_method, 0.85)
-        is_successful = random.random() < success_rate
+        is_successful = self.rng.random() < success_rate
         
-        if is_successful:
+        if is_successful and payment_request.payment_method in self.METODOS_DIFERIDOS:
+            status = PaymentStatus.PENDING
+            auth_code = None
+            error_message = None
+            response_code = "PENDING"
+        elif is_successful:
             status = PaymentStatus.APPROVED
-            auth_code = f"AUTH_{random.randint(100000, 999999)}"
+            auth_code = f"AUTH_{self.rng.randint(100000, 999999)}"
             error_message = None
             response_code = "00"  # Código de éxito estándar
         else:
@@ -146,19 +257,26 @@ class PaymentGatewayMockService:
         
         # Guardar transacción
         self.transactions[transaction_id] = payment_response
+        self.confirmation_urls[transaction_id] = payment_request.confirmation_url
         
         # Simular webhook asíncrono para algunos casos
         if status == PaymentStatus.PENDING:
             # En un caso real, esto se haría asíncronamente
             self._simulate_async_confirmation(transaction_id)
         
+        return self._respuesta_pago(payment_response)
+    
+    def _respuesta_pago(self, payment_response: PaymentResponse) -> Dict[str, Any]:
+        """Respuesta de create_payment para una transacción"""
+        status = payment_response.status
         return {
             "success": status in [PaymentStatus.APPROVED, PaymentStatus.PENDING],
             "transaction": payment_response.to_dict(),
-            "payment_url": f"{self.base_url}/checkout/{transaction_id}" if status == PaymentStatus.PENDING else None,
+            "payment_url": f"{self.base_url}/checkout/{payment_response.transaction_id}" if status == PaymentStatus.PENDING else None,
             "message": f"Transacción {status.value.lower()}"
         }
     
+    @medir_llamada_externa('payment_gateway')
     def get_payment_status(self, transaction_id: str) -> Dict[str, Any]:
         """
         Consulta el estado de una transacción
@@ -170,8 +288,12 @@ class PaymentGatewayMockService:
             Dict con el estado actual de la transacción
         """
         # Simular latencia
-        time.sleep(random.uniform(0.2, 0.8))
+        time.sleep(self._latencia("get_payment_status"))
         
+        return self._armar_estado_pago(transaction_id)
+    
+    def _armar_estado_pago(self, transaction_id: str) -> Dict[str, Any]:
+        """Genera la respuesta de get_payment_status"""
         if transaction_id not in self.transactions:
             return {
                 "success": False,
@@ -187,6 +309,41 @@ class PaymentGatewayMockService:
             "message": "Consulta exitosa"
         }
     
+    @medir_llamada_externa('payment_gateway')
+    def get_payments_status(self, transaction_ids: List[str]) -> Dict[str, Any]:
+        """
+        Consulta el estado de varias transacciones en una sola llamada
+        
+        Args:
+            transaction_ids: IDs de las transacciones
+            
+        Returns:
+            Dict con las transacciones encontradas y los IDs que no existen
+        """
+        # Simular latencia (una sola vez para todo el lote)
+        time.sleep(self._latencia("get_payments_status"))
+        
+        return self._armar_estados_pagos(transaction_ids)
+    
+    def _armar_estados_pagos(self, transaction_ids: List[str]) -> Dict[str, Any]:
+        """Genera la respuesta de get_payments_status"""
+        transactions = {}
+        not_found = []
+        for transaction_id in transaction_ids:
+            transaction = self.transactions.get(transaction_id)
+            if transaction is None:
+                not_found.append(transaction_id)
+            else:
+                transactions[transaction_id] = transaction.to_dict()
+        
+        return {
+            "success": True,
+            "transactions": transactions,
+            "not_found": not_found,
+            "pending": sum(1 for t in transactions.values() if t["status"] == PaymentStatus.PENDING.value)
+        }
+    
+    @medir_llamada_externa('payment_gateway')
     def refund_payment(self, transaction_id: str, amount: Optional[float] = None) -> Dict[str, Any]:
         """
         Procesa un reembolso
@@ -199,8 +356,12 @@ class PaymentGatewayMockService:
             Dict con el resultado del reembolso
         """
         # Simular latencia
-        time.sleep(random.uniform(1.0, 3.0))
+        time.sleep(self._latencia("refund_payment"))
         
+        return self._armar_reembolso(transaction_id, amount)
+    
+    def _armar_reembolso(self, transaction_id: str, amount: Optional[float]) -> Dict[str, Any]:
+        """Aplica el reembolso y genera la respuesta de refund_payment"""
         if transaction_id not in self.transactions:
             return {
                 "success": False,
@@ -227,7 +388,7 @@ class PaymentGatewayMockService:
             }
         
         # Simular probabilidad de éxito del reembolso
-        if random.random() < 0.95:  # 95% de éxito en reembolsos
+        if self.rng.random() < 0.95:  # 95% de éxito en reembolsos
             refund_id = str(uuid.uuid4())
             
             # Actualizar transacción original
@@ -251,6 +412,7 @@ class PaymentGatewayMockService:
                 "code": "REFUND_PROCESSING_ERROR"
             }
     
+    @medir_llamada_externa('payment_gateway')
     def cancel_payment(self, transaction_id: str) -> Dict[str, Any]:
         """
         Cancela una transacción pendiente
@@ -261,8 +423,12 @@ class PaymentGatewayMockService:
         Returns:
             Dict con el resultado de la cancelación
         """
-        time.sleep(random.uniform(0.5, 1.5))
+        time.sleep(self._latencia("cancel_payment"))
         
+        return self._armar_cancelacion(transaction_id)
+    
+    def _armar_cancelacion(self, transaction_id: str) -> Dict[str, Any]:
+        """Aplica la cancelación y genera la respuesta de cancel_payment"""
         if transaction_id not in self.transactions:
             return {
                 "success": False,
@@ -293,7 +459,7 @@ class PaymentGatewayMockService:
         """Retorna un estado de falla aleatorio"""
         failure_statuses = [PaymentStatus.REJECTED, PaymentStatus.ERROR]
         weights = [0.7, 0.3]  # Más rechazos que errores
-        return random.choices(failure_statuses, weights=weights)[0]
+        return self.rng.choices(failure_statuses, weights=weights)[0]
     
     def _get_error_message(self, status: PaymentStatus, payment_method: PaymentMethod) -> str:
         """Genera mensajes de error realistas"""
@@ -313,7 +479,7 @@ class PaymentGatewayMockService:
                 "Servicio temporalmente no disponible"
             ]
         
-        return random.choice(messages)
+        return self.rng.choice(messages)
     
     def _get_error_code(self, status: PaymentStatus) -> str:
         """Genera códigos de error realistas"""
@@ -322,19 +488,99 @@ class PaymentGatewayMockService:
         else:  # ERROR
             codes = ["96", "91", "99", "30"]
         
-        return random.choice(codes)
+        return self.rng.choice(codes)
     
     def _simulate_async_confirmation(self, transaction_id: str):
         """
-        Simula la confirmación asíncrona de una transacción pendiente
-        En un caso real, esto se haría mediante un job en background
+        Simula la confirmación asíncrona de una transacción pendiente: el
+        programador la resuelve en segundo plano, fuera de la petición
         """
-        # Por ahora, solo marcamos que se procesará asíncronamente
-        # En implementación real, usarías Celery o similar
-        pass
+        programador_confirmaciones.programar(
+            self.rng.uniform(*self.DEMORA_CONFIRMACION), self._confirmar_pendiente, transaction_id
+        )
+    
+    def _confirmar_pendiente(self, transaction_id: str):
+        """Resuelve un pago pendiente y notifica a su confirmation_url"""
+        transaction = self.transactions.get(transaction_id)
+        if transaction is None or transaction.status != PaymentStatus.PENDING:
+            return  # Cancelado o ya resuelto
+        
+        if self.rng.random() < 0.9:  # 90% de los pendientes se completan
+            transaction.status = PaymentStatus.APPROVED
+            transaction.authorization_code = f"AUTH_{self.rng.randint(100000, 999999)}"
+            transaction.gateway_response_code = "00"
+        else:
+            transaction.status = PaymentStatus.REJECTED
+            transaction.error_message = "El pago no se completó dentro del tiempo límite"
+            transaction.gateway_response_code = "EXPIRED"
+        transaction.updated_at = datetime.now()
+        
+        payload = {
+            "gateway": self.gateway_name,
+            "event": "transaction.updated",
+            "transaction": transaction.to_dict(),
+            "timestamp": transaction.updated_at.isoformat()
+        }
+        url = self.confirmation_urls.get(transaction_id)
+        for handler in confirmation_handlers.get(url, []) + confirmation_handlers.get('*', []):
+            handler(payload)
+
+
+class AsyncPaymentGatewayMockService(PaymentGatewayMockService):
+    """
+    Variante asíncrona para vistas async: los mismos métodos públicos como
+    corrutinas, con la latencia simulada mediante asyncio.sleep y las mismas
+    respuestas que el servicio síncrono
+    """
+    
+    @medir_llamada_externa('payment_gateway')
+    async def create_payment(self, payment_request: PaymentRequest,
+                             idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        clave, huella = self._idempotencia(payment_request, idempotency_key)
+        limite = time.monotonic() + self.ESPERA_IDEMPOTENCIA
+        while True:
+            estado, original = await sync_to_async(self.idempotency_store.reservar)(clave, huella)
+            if estado in (NUEVO, COMPLETADO, CONFLICTO) or time.monotonic() >= limite:
+                break
+            await asyncio.sleep(0.05)
+        if estado != NUEVO:
+            return self._respuesta_repetida(estado, original)
+        
+        try:
+            await asyncio.sleep(self._latencia("create_payment"))
+            respuesta = self._armar_pago(payment_request)
+        except BaseException:
+            await sync_to_async(self.idempotency_store.liberar)(clave)
+            raise
+        await sync_to_async(self.idempotency_store.completar)(clave, respuesta["transaction"])
+        return respuesta
+    
+    @medir_llamada_externa('payment_gateway')
+    async def get_payment_status(self, transaction_id: str) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("get_payment_status"))
+        return self._armar_estado_pago(transaction_id)
+    
+    @medir_llamada_externa('payment_gateway')
+    async def get_payments_status(self, transaction_ids: List[str]) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("get_payments_status"))
+        return self._armar_estados_pagos(transaction_ids)
+    
+    @medir_llamada_externa('payment_gateway')
+    async def refund_payment(self, transaction_id: str, amount: Optional[float] = None) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("refund_payment"))
+        return self._armar_reembolso(transaction_id, amount)
+    
+    @medir_llamada_externa('payment_gateway')
+    async def cancel_payment(self, transaction_id: str) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("cancel_payment"))
+        return self._armar_cancelacion(transaction_id)
 
 
 # Instancias de diferentes gateways
 payu_service = PaymentGatewayMockService("PayU")
 wompi_service = PaymentGatewayMockService("Wompi")
 mercadopago_service = PaymentGatewayMockService("MercadoPago")
+
+async_payu_service = AsyncPaymentGatewayMockService("PayU")
+async_wompi_service = AsyncPaymentGatewayMockService("Wompi")
+async_mercadopago_service = AsyncPaymentGatewayMockService("MercadoPago")
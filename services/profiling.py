@@ -0,0 +1,174 @@
+"""
+Perfilado de peticiones lentas
+Middleware opcional que muestrea las pilas de ejecución de cada petición con un
+hilo de bajo costo y guarda el perfil cuando la petición supera el umbral de
+lentitud; una fracción configurable de peticiones se perfila además con cProfile.
+"""
+import cProfile
+import io
+import marshal
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+# Máximo de consultas SQL guardadas por perfil (el conteo y el tiempo incluyen todas)
+MAX_CONSULTAS_GUARDADAS = 200
+
+
+class StackSampler:
+    """
+    Hilo que cada PROFILER_SAMPLE_INTERVAL segundos toma la pila de los hilos
+    registrados (uno por petición en curso) y acumula pilas colapsadas
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._activos = {}
+        self._thread = None
+
+    def iniciar(self, thread_id):
+        muestras = Counter()
+        with self._lock:
+            self._activos[thread_id] = muestras
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+                self._thread.start()
+        return muestras
+
+    def detener(self, thread_id):
+        with self._lock:
+            return self._activos.pop(thread_id, Counter())
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._activos:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, muestras in self._activos.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        muestras[self._colapsar(frame)] += 1
+
+    @staticmethod
+    def _colapsar(frame):
+        pila = []
+        while frame is not None:
+            code = frame.f_code
+            pila.append(f'{code.co_filename}:{code.co_name}:{frame.f_lineno}')
+            frame = frame.f_back
+        return ';'.join(reversed(pila))
+
+
+def formatear_pilas(muestras):
+    """Pilas colapsadas en el formato de flamegraph.pl ('a;b;c 12')"""
+    return '\n'.join(f'{pila} {conteo}' for pila, conteo in muestras.most_common())
+
+
+class SlowRequestProfilerMiddleware:
+    """
+    Guarda un PerfilPeticion para las peticiones muestreadas (PROFILER_SAMPLE_RATE)
+    o que tardan más de PROFILER_SLOW_THRESHOLD segundos, con las pilas
+    muestreadas, el resumen de cProfile (solo muestreadas) y el SQL ejecutado.
+    Se activa con PROFILER_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILER_SAMPLE_RATE', 0.0)
+        self.slow_threshold = getattr(settings, 'PROFILER_SLOW_THRESHOLD', 2.0)
+        self.max_perfiles = getattr(settings, 'PROFILER_MAX_PROFILES', 500)
+        self.rutas_ignoradas = tuple(getattr(settings, 'PROFILER_IGNORE_PATHS', ()))
+        self.sampler = StackSampler(getattr(settings, 'PROFILER_SAMPLE_INTERVAL', 0.005))
+
+    def __call__(self, request):
+        if request.path.startswith(self.rutas_ignoradas):
+            return self.get_response(request)
+
+        muestreada = random.random() < self.sample_rate
+        consultas = []
+        totales_sql = {'consultas': 0, 'tiempo': 0.0}
+
+        def capturar_sql(execute, sql, params, many, context):
+            inicio = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                duracion_sql = time.perf_counter() - inicio
+                totales_sql['consultas'] += 1
+                totales_sql['tiempo'] += duracion_sql
+                if len(consultas) < MAX_CONSULTAS_GUARDADAS:
+                    consultas.append({'sql': sql, 'duracion': duracion_sql})
+                else:
+                    consultas[-1]['omitidas'] = consultas[-1].get('omitidas', 0) + 1
+
+        thread_id = threading.get_ident()
+        self.sampler.iniciar(thread_id)
+        profiler = cProfile.Profile() if muestreada else None
+
+        inicio = time.perf_counter()
+        try:
+            with connection.execute_wrapper(capturar_sql):
+                if profiler is not None:
+                    profiler.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profiler is not None:
+                        profiler.disable()
+        finally:
+            duracion = time.perf_counter() - inicio
+            muestras = self.sampler.detener(thread_id)
+
+        if muestreada or duracion >= self.slow_threshold:
+            self.guardar_perfil(
+                request, response, duracion, consultas, totales_sql, muestras, profiler,
+                motivo='muestreo' if muestreada else 'lenta',
+            )
+        return response
+
+    def guardar_perfil(self, request, response, duracion, consultas, totales_sql, muestras, profiler, motivo):
+        from .models import PerfilPeticion
+
+        resumen = ''
+        datos = None
+        if profiler is not None:
+            salida = io.StringIO()
+            pstats.Stats(profiler, stream=salida).sort_stats('cumulative').print_stats(40)
+            resumen = salida.getvalue()
+            profiler.create_stats()
+            datos = marshal.dumps(profiler.stats)
+
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        PerfilPeticion.objects.create(
+            ruta=request.get_full_path()[:500],
+            vista=match.view_name if match else '',
+            metodo=request.method,
+            codigo_estado=response.status_code,
+            motivo=motivo,
+            duracion=duracion,
+            num_consultas=totales_sql['consultas'],
+            tiempo_sql=totales_sql['tiempo'],
+            consultas_sql=consultas,
+            pila_colapsada=formatear_pilas(muestras),
+            resumen_cprofile=resumen,
+            datos_cprofile=datos,
+            usuario=user.get_username() if user is not None and user.is_authenticated else '',
+        )
+
+        # Conservar solo los perfiles más recientes
+        antiguos = PerfilPeticion.objects.values_list('pk', flat=True)[self.max_perfiles:]
+        PerfilPeticion.objects.filter(pk__in=list(antiguos)).delete()
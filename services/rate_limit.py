@@ -0,0 +1,45 @@
+"""
+Limitador de tasa (token bucket) seguro entre hilos, usado para respetar los
+límites de llamadas por segundo de los proveedores externos
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Permite hasta `rate` operaciones por segundo con ráfagas de hasta `capacity`
+
+    Args:
+        rate: Tokens que se reponen por segundo (None o 0 = sin límite)
+        capacity: Tamaño máximo de la ráfaga (por defecto igual a rate)
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate or 1
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reponer(self):
+        ahora = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (ahora - self._updated) * self.rate)
+        self._updated = ahora
+
+    def tiempo_espera(self, tokens=1):
+        """Reserva los tokens y devuelve cuántos segundos hay que esperar para usarlos"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            self._reponer()
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def adquirir(self, tokens=1):
+        """Bloquea hasta que haya tokens disponibles"""
+        espera = self.tiempo_espera(tokens)
+        if espera:
+            time.sleep(espera)
@@ -0,0 +1,186 @@
+"""
+Conciliación de pagos de las pasarelas contra las ventas (Cliente.valor_compra)
+Las transacciones se indexan en diccionarios por referencia y por
+(monto en centavos, fecha), de modo que cada venta y cada pago se revisan una
+sola vez: el costo es lineal en el número de registros. Mientras se arman los
+índices se pausa el recolector de ciclos (no se crean referencias circulares
+y con millones de objetos sus pasadas completas duplican el tiempo).
+
+Convención: el pago de la venta de un cliente usa la referencia 'CLI-<id>'
+(ver referencia_cliente).
+"""
+import gc
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+
+from clientes.models import Cliente
+
+from .payment_gateway_mock import (PaymentResponse, PaymentStatus, mercadopago_service, payu_service,
+                                   wompi_service)
+
+# Tipos de discrepancia
+MONTO_DISTINTO = 'monto_distinto'              # referencia coincide, monto no
+FECHA_DISTINTA = 'fecha_distinta'              # referencia y monto coinciden, fecha fuera de tolerancia
+PAGO_DUPLICADO = 'pago_duplicado'              # más de un pago para la misma venta
+PAGO_REEMBOLSADO = 'pago_reembolsado'          # el pago de la venta fue reembolsado
+REFERENCIA_DISTINTA = 'referencia_distinta'    # coincide por monto y fecha, no por referencia
+PAGO_SIN_VENTA = 'pago_sin_venta'
+VENTA_SIN_PAGO = 'venta_sin_pago'
+
+# Estados que representan dinero recibido (el reembolsado se reporta aparte)
+ESTADOS_COBRADOS = (PaymentStatus.APPROVED, PaymentStatus.REFUNDED)
+
+
+def referencia_cliente(cliente_id: int) -> str:
+    return f'CLI-{cliente_id}'
+
+
+def centavos(valor) -> int:
+    if isinstance(valor, Decimal):
+        return int(valor * 100)
+    return round(valor * 100)
+
+
+@dataclass(slots=True)
+class Discrepancia:
+    tipo: str
+    gateway: str = ''
+    transaction_id: str = ''
+    referencia: str = ''
+    cliente_id: Optional[int] = None
+    monto_pago: Optional[float] = None
+    monto_venta: Optional[float] = None
+    fecha_pago: Optional[date] = None
+    fecha_venta: Optional[date] = None
+
+
+@dataclass
+class ResultadoConciliacion:
+    conciliados: int = 0
+    transacciones: int = 0
+    ventas: int = 0
+    discrepancias: List[Discrepancia] = field(default_factory=list)
+
+    @property
+    def resumen(self) -> Counter:
+        return Counter(discrepancia.tipo for discrepancia in self.discrepancias)
+
+    def filas(self):
+        """Discrepancias como diccionarios (para CSV o JSON)"""
+        return (asdict(discrepancia) for discrepancia in self.discrepancias)
+
+
+def cargar_transacciones(desde: date, hasta: date, servicios=None) -> Iterable[Tuple[str, PaymentResponse]]:
+    """(pasarela, transacción) de las pasarelas con fecha de creación en [desde, hasta]"""
+    for service in servicios or (payu_service, wompi_service, mercadopago_service):
+        for transaction in list(service.transactions.values()):
+            if desde <= transaction.created_at.date() <= hasta:
+                yield service.gateway_name, transaction
+
+
+def cargar_ventas(desde: date, hasta: date) -> Iterable[Tuple[int, Decimal, date]]:
+    """(id, valor_compra, fecha_compra) de los clientes con compra en [desde, hasta]"""
+    return Cliente.objects.filter(fecha_compra__range=(desde, hasta)).values_list(
+        'pk', 'valor_compra', 'fecha_compra'
+    ).order_by().iterator(chunk_size=5000)
+
+
+def conciliar(transacciones: Iterable[Tuple[str, PaymentResponse]],
+              ventas: Iterable[Tuple[int, Decimal, date]],
+              tolerancia_dias: int = 3) -> ResultadoConciliacion:
+    """
+    Cruza pagos y ventas
+
+    Args:
+        transacciones: (pasarela, PaymentResponse); solo cuentan las aprobadas o reembolsadas
+        ventas: (cliente_id, valor_compra, fecha_compra)
+        tolerancia_dias: Diferencia máxima entre la fecha del pago y la de la compra
+
+    Returns:
+        ResultadoConciliacion con los conciliados y cada discrepancia
+    """
+    gc_activo = gc.isenabled()
+    gc.disable()
+    try:
+        return _conciliar(transacciones, ventas, tolerancia_dias)
+    finally:
+        if gc_activo:
+            gc.enable()
+
+
+def _conciliar(transacciones, ventas, tolerancia_dias):
+    resultado = ResultadoConciliacion()
+    discrepancias = resultado.discrepancias
+
+    por_referencia = {}
+    for gateway, transaction in transacciones:
+        resultado.transacciones += 1
+        if transaction.status in ESTADOS_COBRADOS:
+            por_referencia.setdefault(transaction.reference, []).append((gateway, transaction))
+
+    # Primera pasada: por referencia
+    sin_pago = {}  # (centavos, fecha) -> [cliente_id, ...]
+    montos = {}
+    for cliente_id, valor_compra, fecha_compra in ventas:
+        resultado.ventas += 1
+        monto_venta = centavos(valor_compra)
+        pagos = por_referencia.pop(referencia_cliente(cliente_id), None)
+        if not pagos:
+            sin_pago.setdefault((monto_venta, fecha_compra), []).append(cliente_id)
+            montos[cliente_id] = valor_compra
+            continue
+
+        gateway, transaction = pagos[0]
+        fecha_pago = transaction.created_at.date()
+        base = dict(gateway=gateway, transaction_id=transaction.transaction_id, referencia=transaction.reference,
+                    cliente_id=cliente_id, monto_pago=transaction.amount, monto_venta=float(valor_compra),
+                    fecha_pago=fecha_pago, fecha_venta=fecha_compra)
+        if centavos(transaction.amount) != monto_venta:
+            discrepancias.append(Discrepancia(MONTO_DISTINTO, **base))
+        elif abs((fecha_pago - fecha_compra).days) > tolerancia_dias:
+            discrepancias.append(Discrepancia(FECHA_DISTINTA, **base))
+        elif transaction.status == PaymentStatus.REFUNDED:
+            discrepancias.append(Discrepancia(PAGO_REEMBOLSADO, **base))
+        else:
+            resultado.conciliados += 1
+
+        for gateway, transaction in pagos[1:]:
+            discrepancias.append(Discrepancia(
+                PAGO_DUPLICADO, gateway=gateway, transaction_id=transaction.transaction_id,
+                referencia=transaction.reference, cliente_id=cliente_id, monto_pago=transaction.amount,
+                monto_venta=float(valor_compra), fecha_pago=transaction.created_at.date(), fecha_venta=fecha_compra,
+            ))
+
+    # Segunda pasada: pagos sin venta con su referencia, por monto y fecha
+    for pagos in por_referencia.values():
+        for gateway, transaction in pagos:
+            fecha_pago = transaction.created_at.date()
+            candidatos = sin_pago.get((centavos(transaction.amount), fecha_pago))
+            if candidatos:
+                cliente_id = candidatos.pop()
+                discrepancias.append(Discrepancia(
+                    REFERENCIA_DISTINTA, gateway, transaction.transaction_id, transaction.reference, cliente_id,
+                    transaction.amount, float(montos[cliente_id]), fecha_pago, fecha_pago,
+                ))
+            else:
+                discrepancias.append(Discrepancia(
+                    PAGO_SIN_VENTA, gateway, transaction.transaction_id, transaction.reference, None,
+                    transaction.amount, None, fecha_pago,
+                ))
+
+    for (_, fecha_compra), clientes in sin_pago.items():
+        for cliente_id in clientes:
+            discrepancias.append(Discrepancia(
+                VENTA_SIN_PAGO, referencia=referencia_cliente(cliente_id), cliente_id=cliente_id,
+                monto_venta=float(montos[cliente_id]), fecha_venta=fecha_compra,
+            ))
+
+    return resultado
+
+
+def conciliar_periodo(desde: date, hasta: date, tolerancia_dias: int = 3, servicios=None) -> ResultadoConciliacion:
+    """Concilia las transacciones de las tres pasarelas contra las ventas del periodo"""
+    return conciliar(cargar_transacciones(desde, hasta, servicios), cargar_ventas(desde, hasta), tolerancia_dias)
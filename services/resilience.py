@@ -0,0 +1,217 @@
+"""
+Capa de resiliencia para las llamadas a servicios externos (DataCrédito, SMS y
+pasarelas de pago)
+
+Cada llamada pasa por:
+- un circuit breaker: tras `umbral_fallas` fallas seguidas se abre y responde
+  de inmediato durante `tiempo_abierto` segundos; luego deja pasar una sola
+  llamada de prueba (semiabierto) que decide si se cierra o se vuelve a abrir
+- un bulkhead: máximo `max_concurrentes` llamadas en curso por servicio; las
+  demás se rechazan en lugar de ocupar workers de gunicorn
+- un plazo (deadline): si el proveedor no responde a tiempo se devuelve un
+  error y el hilo de la llamada termina por su cuenta
+
+El estado de los breakers es por proceso (cada worker de gunicorn decide por su
+cuenta). Los errores se devuelven con la misma forma que usan los mocks:
+{"success": False, "error": ..., "code": ...}.
+"""
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .metrics import METRICS_HELP, registry
+
+logger = logging.getLogger(__name__)
+
+METRICS_HELP.update({
+    'crm_resilience_events_total': 'Llamadas externas por servicio y resultado de la capa de resiliencia',
+    'crm_circuit_breaker_transitions_total': 'Cambios de estado de los circuit breakers',
+})
+
+# Estados del circuit breaker
+CERRADO = 'cerrado'
+ABIERTO = 'abierto'
+SEMIABIERTO = 'semiabierto'
+
+# Valores por defecto de settings.RESILIENCIA
+CONFIGURACION_BASE = {
+    'deadline': 5.0,
+    'umbral_fallas': 5,
+    'tiempo_abierto': 30.0,
+    'max_concurrentes': 10,
+}
+
+
+class CircuitBreaker:
+    """Breaker por conteo de fallas consecutivas, seguro entre hilos"""
+
+    def __init__(self, nombre: str, umbral_fallas: int = 5, tiempo_abierto: float = 30.0):
+        self.nombre = nombre
+        self.umbral_fallas = umbral_fallas
+        self.tiempo_abierto = tiempo_abierto
+        self.estado = CERRADO
+        self.fallas = 0
+        self._abierto_desde = 0.0
+        self._prueba_en_curso = False
+        self._lock = threading.Lock()
+
+    def permitir(self) -> bool:
+        """True si la llamada puede hacerse; en semiabierto solo pasa una prueba a la vez"""
+        with self._lock:
+            if self.estado == ABIERTO:
+                if time.monotonic() - self._abierto_desde < self.tiempo_abierto:
+                    return False
+                self._cambiar(SEMIABIERTO)
+            if self.estado == SEMIABIERTO:
+                if self._prueba_en_curso:
+                    return False
+                self._prueba_en_curso = True
+            return True
+
+    def registrar_exito(self):
+        with self._lock:
+            self.fallas = 0
+            self._prueba_en_curso = False
+            if self.estado != CERRADO:
+                self._cambiar(CERRADO)
+
+    def registrar_falla(self):
+        with self._lock:
+            self.fallas += 1
+            self._prueba_en_curso = False
+            if self.estado == SEMIABIERTO or self.fallas >= self.umbral_fallas:
+                self._abierto_desde = time.monotonic()
+                if self.estado != ABIERTO:
+                    self._cambiar(ABIERTO)
+
+    def cancelar_prueba(self):
+        """Libera la prueba del semiabierto cuando la llamada no llegó a hacerse"""
+        with self._lock:
+            self._prueba_en_curso = False
+
+    def _cambiar(self, estado):
+        logger.warning('Circuit breaker %s: %s -> %s', self.nombre, self.estado, estado)
+        registry.inc('crm_circuit_breaker_transitions_total', {'service': self.nombre, 'to': estado})
+        self.estado = estado
+
+
+class ServicioResiliente:
+    """
+    Envuelve un servicio (DataCreditoMockService, SMSMockService,
+    PaymentGatewayMockService o sus variantes con caché) y aplica breaker,
+    bulkhead y deadline a cada uno de sus métodos públicos
+    """
+
+    def __init__(self, service, nombre: str, deadline: float = None, umbral_fallas: int = None,
+                 tiempo_abierto: float = None, max_concurrentes: int = None):
+        configuracion = configuracion_servicio(nombre)
+        self.service = service
+        self.nombre = nombre
+        self.deadline = deadline if deadline is not None else configuracion['deadline']
+        self.max_concurrentes = max_concurrentes if max_concurrentes is not None else configuracion['max_concurrentes']
+        self.breaker = CircuitBreaker(
+            nombre,
+            umbral_fallas if umbral_fallas is not None else configuracion['umbral_fallas'],
+            tiempo_abierto if tiempo_abierto is not None else configuracion['tiempo_abierto'],
+        )
+        self._cupos = threading.BoundedSemaphore(self.max_concurrentes)
+        # Un hilo por cupo: una llamada colgada ocupa su cupo hasta terminar, no más
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrentes, thread_name_prefix=f'resiliencia-{nombre}')
+
+    def __getattr__(self, nombre):
+        atributo = getattr(self.service, nombre)
+        if nombre.startswith('_') or not callable(atributo):
+            return atributo
+
+        @functools.wraps(atributo)
+        def llamada(*args, **kwargs):
+            return self.llamar(atributo, *args, **kwargs)
+        return llamada
+
+    def llamar(self, funcion, *args, **kwargs):
+        """Ejecuta funcion(*args, **kwargs) con breaker, bulkhead y deadline"""
+        if not self.breaker.permitir():
+            return self._error('CIRCUIT_OPEN', f'Servicio {self.nombre} no disponible temporalmente')
+
+        if not self._cupos.acquire(blocking=False):
+            # La llamada no llegó al proveedor: si era la prueba del semiabierto, se libera
+            self.breaker.cancelar_prueba()
+            return self._error('BULKHEAD_FULL', f'Demasiadas llamadas en curso a {self.nombre}')
+
+        try:
+            future = self._executor.submit(self._ejecutar, funcion, args, kwargs)
+        except RuntimeError:
+            self._cupos.release()
+            raise
+        future.add_done_callback(lambda _: self._cupos.release())
+
+        try:
+            resultado = future.result(timeout=self.deadline)
+        except FuturesTimeoutError:
+            self.breaker.registrar_falla()
+            return self._error('DEADLINE_EXCEEDED', f'{self.nombre} no respondió en {self.deadline:g}s')
+        except Exception as exc:
+            logger.warning('Error llamando a %s: %s', self.nombre, exc)
+            self.breaker.registrar_falla()
+            return self._error('SERVICE_ERROR', f'Error en {self.nombre}: {exc}')
+
+        # Una respuesta de negocio con success=False (tarjeta rechazada, número
+        # inválido) significa que el proveedor respondió: no cuenta como falla
+        self.breaker.registrar_exito()
+        registry.inc('crm_resilience_events_total', {'service': self.nombre, 'event': 'ok'})
+        return resultado
+
+    @staticmethod
+    def _ejecutar(funcion, args, kwargs):
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    def _error(self, code: str, mensaje: str) -> Dict[str, Any]:
+        registry.inc('crm_resilience_events_total', {'service': self.nombre, 'event': code.lower()})
+        return {"success": False, "error": mensaje, "code": code}
+
+    def estado(self) -> Dict[str, Any]:
+        """Resumen para diagnóstico (admin, shell o healthcheck)"""
+        return {
+            'servicio': self.nombre,
+            'breaker': self.breaker.estado,
+            'fallas_consecutivas': self.breaker.fallas,
+            'deadline': self.deadline,
+            'max_concurrentes': self.max_concurrentes,
+        }
+
+
+def configuracion_servicio(nombre: str) -> Dict[str, Any]:
+    """CONFIGURACION_BASE combinada con settings.RESILIENCIA['default'] y la del servicio"""
+    resiliencia = getattr(settings, 'RESILIENCIA', {})
+    return {**CONFIGURACION_BASE, **resiliencia.get('default', {}), **resiliencia.get(nombre, {})}
+
+
+def _crear_servicios():
+    from .datacredito_cache import datacredito_cache_service
+    from .payment_gateway_mock import mercadopago_service, payu_service, wompi_service
+    from .sms_mock import aws_sns_service, messagemedia_service, twilio_service
+
+    return {
+        'datacredito': ServicioResiliente(datacredito_cache_service, 'datacredito'),
+        'twilio': ServicioResiliente(twilio_service, 'twilio'),
+        'aws_sns': ServicioResiliente(aws_sns_service, 'aws_sns'),
+        'messagemedia': ServicioResiliente(messagemedia_service, 'messagemedia'),
+        'payu': ServicioResiliente(payu_service, 'payu'),
+        'wompi': ServicioResiliente(wompi_service, 'wompi'),
+        'mercadopago': ServicioResiliente(mercadopago_service, 'mercadopago'),
+    }
+
+
+servicios_resilientes = _crear_servicios()
+resilient_datacredito_service = servicios_resilientes['datacredito']
+resilient_twilio_service = servicios_resilientes['twilio']
+resilient_payu_service = servicios_resilientes['payu']
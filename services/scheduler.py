@@ -0,0 +1,64 @@
+"""
+Programador de tareas diferidas en un hilo de fondo del proceso
+Las tareas se guardan en un heap por hora de ejecución; un único hilo duerme
+hasta la próxima y la ejecuta, sin pasar por el ciclo de la petición.
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class Programador:
+    """Heap de (hora, secuencia, función, args) atendido por un hilo daemon"""
+
+    def __init__(self, nombre: str = 'programador'):
+        self.nombre = nombre
+        self._tareas = []
+        self._secuencia = itertools.count()
+        self._condicion = threading.Condition()
+        self._hilo = None
+
+    def __len__(self):
+        return len(self._tareas)
+
+    def programar(self, demora: float, funcion, *args):
+        """Ejecuta funcion(*args) dentro de `demora` segundos"""
+        with self._condicion:
+            heapq.heappush(self._tareas, (time.monotonic() + demora, next(self._secuencia), funcion, args))
+            self._asegurar_hilo()
+            self._condicion.notify()
+
+    def _asegurar_hilo(self):
+        # El hilo se crea al primer uso (también después del fork de cada worker de gunicorn)
+        if self._hilo is None or not self._hilo.is_alive():
+            self._hilo = threading.Thread(target=self._ejecutar, name=self.nombre, daemon=True)
+            self._hilo.start()
+
+    def _siguiente(self):
+        with self._condicion:
+            while True:
+                if self._tareas:
+                    espera = self._tareas[0][0] - time.monotonic()
+                    if espera <= 0:
+                        _, _, funcion, args = heapq.heappop(self._tareas)
+                        return funcion, args
+                    self._condicion.wait(espera)
+                else:
+                    self._condicion.wait()
+
+    def _ejecutar(self):
+        while True:
+            funcion, args = self._siguiente()
+            try:
+                funcion(*args)
+            except Exception:
+                logger.exception('Error en tarea programada %s', getattr(funcion, '__name__', funcion))
+            finally:
+                close_old_connections()
+
@@ -2,14 +2,23 @@
 Simulador de Servicios SMS
 Simula las respuestas de proveedores como Twilio, AWS SNS, etc.
 """
-import random
+import asyncio
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, List
+from typing import Callable, Dict, Any, Optional, List
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .latency_profiles import SimuladorMixin
+from .metrics import medir_llamada_externa
+from .rate_limit import TokenBucket
+from .sms_store import MessageStore, crear_store
+
 
 class SMSStatus(Enum):
     """Estados posibles de un SMS"""
@@ -60,14 +69,38 @@ class SMSResponse:
         return data
 
 
-class SMSMockService:
+class SMSMockService(SimuladorMixin):
     """
     Servicio simulado para envío de SMS
     Simula comportamientos de Twilio, AWS SNS, etc.
     """
     
-    def __init__(self, provider: SMSProvider = SMSProvider.TWILIO):
+    SERVICIO = "sms"
+    
+    # Latencia simulada (segundos mínimo, máximo) por operación; la
+    # distribución real la define el perfil (ver services/latency_profiles.py)
+    LATENCIAS = {
+        "send_sms": (0.3, 1.5),
+        "get_message_status": (0.1, 0.5),
+        "send_bulk_sms": (1.0, 3.0),
+        "get_delivery_report": (0.5, 2.0),
+    }
+    
+    # Mensajes por segundo que acepta cada proveedor (por proceso)
+    RATE_LIMITS = {
+        SMSProvider.TWILIO: 30,
+        SMSProvider.AWS_SNS: 20,
+        SMSProvider.MESSAGEMEDIA: 15,
+        SMSProvider.NEXMO: 30
+    }
+    
+    # Valores por defecto de los envíos masivos
+    BULK_MAX_WORKERS = 20
+    BULK_CHUNK_SIZE = 100
+    
+    def __init__(self, provider: SMSProvider = SMSProvider.TWILIO, store: Optional[MessageStore] = None):
         self.provider = provider
+        self.proveedor_metricas = provider.value
         self.api_key = "mock_api_key"
         self.account_sid = "mock_account_sid"
         self.auth_token = "mock_auth_token"
@@ -80,8 +113,8 @@ class SMSMockService:
             "fixed": 0.0     # Fijos no reciben SMS
         }
         
-        # Almacenamiento en memoria de mensajes
-        self.messages = {}
+        # Almacenamiento de mensajes (en memoria o en base de datos según settings)
+        self.store = store if store is not None else crear_store(provider.value)
         
         # Costos simulados por mensaje (en COP)
         self.cost_per_message = {
@@ -90,20 +123,35 @@ class SMSMockService:
             SMSProvider.MESSAGEMEDIA: 70,
             SMSProvider.NEXMO: 75
         }
+        
+        # Limitador compartido por todos los envíos de esta instancia
+        self.rate_limiter = TokenBucket(self.RATE_LIMITS.get(provider))
+        
+        self.configurar_simulacion()
     
-    def send_sms(self, sms_request: SMSRequest) -> Dict[str, Any]:
+    def nombre_instancia(self) -> str:
+        return f"{type(self).__name__}:{self.provider.value}"
+    
+    @medir_llamada_externa('sms')
+    def send_sms(self, sms_request: SMSRequest, simular_entrega: bool = True) -> Dict[str, Any]:
         """
         Envía un SMS
         
         Args:
             sms_request: Datos de la solicitud de SMS
+            simular_entrega: False para dejar el mensaje en cola y recibir el
+                             estado final con generar_webhook_entrega
             
         Returns:
             Dict con la respuesta del envío
         """
         # Simular latencia de red
-        time.sleep(random.uniform(0.3, 1.5))
+        time.sleep(self._latencia("send_sms"))
         
+        return self._armar_envio(sms_request, simular_entrega)
+    
+    def _armar_envio(self, sms_request: SMSRequest, simular_entrega: bool = True) -> Dict[str, Any]:
+        """Registra el mensaje y genera la respuesta de send_sms"""
         message_id = str(uuid.uuid4())
         
         # Validar número de teléfono
@@ -119,7 +167,7 @@ class SMSMockService:
         
         # Determinar el resultado basado en el tipo de teléfono
         delivery_rate = self.delivery_rates.get(phone_type, 0.8)
-        will_deliver = random.random() < delivery_rate
+        will_deliver = self.rng.random() < delivery_rate
         
         if phone_type == "fixed":
             status = SMSStatus.FAILED
@@ -154,10 +202,10 @@ class SMSMockService:
         )
         
         # Guardar mensaje
-        self.messages[message_id] = sms_response
+        self.store.guardar(sms_response)
         
         # Simular progresión de estados para mensajes exitosos
-        if status == SMSStatus.QUEUED:
+        if status == SMSStatus.QUEUED and simular_entrega:
             self._simulate_async_delivery(message_id)
         
         return {
@@ -168,6 +216,40 @@ class SMSMockService:
             "cost": cost
         }
     
+    def generar_webhook_entrega(self, message_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Simula la notificación (webhook) con la que el proveedor informa el
+        estado final de un mensaje enviado con simular_entrega=False
+        
+        Args:
+            message_id: ID del mensaje
+            
+        Returns:
+            Dict con el cuerpo del webhook, o None si el mensaje no existe o ya tiene estado final
+        """
+        message = self.store.obtener(message_id)
+        if message is None or message.status not in (SMSStatus.QUEUED, SMSStatus.SENT):
+            return None
+        
+        if self.rng.random() < 0.9:  # 90% llegan a DELIVERED
+            status = SMSStatus.DELIVERED
+            error_message = None
+        else:
+            status = SMSStatus.UNDELIVERED
+            error_message = self._get_failure_reason()
+        
+        updated_at = datetime.now()
+        self.store.actualizar_estado(message_id, status, updated_at)
+        
+        return {
+            "message_id": message_id,
+            "to_number": message.to_number,
+            "status": status.value,
+            "error_message": error_message,
+            "timestamp": updated_at.isoformat()
+        }
+    
+    @medir_llamada_externa('sms')
     def get_message_status(self, message_id: str) -> Dict[str, Any]:
         """
         Consulta el estado de un mensaje SMS
@@ -179,57 +261,100 @@ class SMSMockService:
             Dict con el estado actual del mensaje
         """
         # Simular latencia
-        time.sleep(random.uniform(0.1, 0.5))
+        time.sleep(self._latencia("get_message_status"))
         
-        if message_id not in self.messages:
+        return self._armar_estado(message_id)
+    
+    def _armar_estado(self, message_id: str) -> Dict[str, Any]:
+        """Genera la respuesta de get_message_status"""
+        message = self.store.obtener(message_id)
+        if message is None:
             return {
                 "success": False,
                 "error": "Mensaje no encontrado",
                 "code": "MESSAGE_NOT_FOUND"
             }
         
-        message = self.messages[message_id]
-        
         return {
             "success": True,
             "message": message.to_dict(),
             "status": message.status.value
         }
     
+    @medir_llamada_externa('sms')
     def send_bulk_sms(self, to_numbers: List[str], message: str, 
-                     from_number: Optional[str] = None) -> Dict[str, Any]:
+                     from_number: Optional[str] = None, max_workers: Optional[int] = None,
+                     chunk_size: Optional[int] = None,
+                     progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
         """
-        Envía SMS masivos
+        Envía SMS masivos en paralelo, respetando el límite de tasa del proveedor
         
         Args:
-            to_numbers: Lista de números de teléfono
+            to_numbers: Lista de números de teléfono (los repetidos se envían una vez)
             message: Mensaje a enviar
             from_number: Número remitente opcional
+            max_workers: Envíos simultáneos como máximo
+            chunk_size: Números por lote; progress_callback se llama al terminar cada lote
+            progress_callback: Función (enviados, total) para reportar el avance
             
         Returns:
             Dict con el resultado del envío masivo
         """
         # Simular latencia adicional para envíos masivos
-        time.sleep(random.uniform(1.0, 3.0))
+        time.sleep(self._latencia("send_bulk_sms"))
+        
+        numbers = self._numeros_unicos(to_numbers)
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        
+        def enviar(number):
+            self.rate_limiter.adquirir()
+            try:
+                return self.send_sms(SMSRequest(to_number=number, message=message, from_number=from_number))
+            except Exception as exc:
+                return self._error_envio(exc)
+            finally:
+                # Cada hilo del pool abre su propia conexión (SMS_MESSAGE_STORE='db');
+                # se cierra como al final de una petición
+                close_old_connections()
         
+        envios = []
+        with ThreadPoolExecutor(max_workers=max_workers or self.BULK_MAX_WORKERS,
+                                thread_name_prefix='sms') as executor:
+            for inicio in range(0, len(numbers), chunk_size):
+                envios.extend(executor.map(enviar, numbers[inicio:inicio + chunk_size]))
+                if progress_callback:
+                    progress_callback(len(envios), len(numbers))
+        
+        return self._armar_envio_masivo(numbers, envios, len(to_numbers) - len(numbers))
+    
+    def _error_envio(self, exc: Exception) -> Dict[str, Any]:
+        """Resultado de un envío masivo cuya llamada al proveedor lanzó una excepción"""
+        return {"success": False, "error": f"{type(exc).__name__}: {exc}", "code": "PROVIDER_ERROR"}
+    
+    def _numeros_unicos(self, to_numbers: List[str]) -> List[str]:
+        """Quita los números repetidos (aunque estén escritos distinto), conservando el orden"""
+        unicos = {}
+        for number in to_numbers:
+            unicos.setdefault(self._normalizar_numero(number), number)
+        return list(unicos.values())
+    
+    def _armar_envio_masivo(self, to_numbers: List[str], envios: List[Dict[str, Any]],
+                            duplicados: int = 0) -> Dict[str, Any]:
+        """Genera la respuesta de send_bulk_sms a partir de las respuestas de cada envío"""
         results = []
         total_cost = 0
         successful_sends = 0
         failed_sends = 0
         
-        for number in to_numbers:
-            sms_request = SMSRequest(
-                to_number=number,
-                message=message,
-                from_number=from_number
-            )
-            
-            result = self.send_sms(sms_request)
+        for number, result in zip(to_numbers, envios):
             results.append({
                 "number": number,
                 "success": result["success"],
                 "message_id": result.get("message_id"),
-                "error": result.get("error")
+                "error": result.get("error"),
+                "cost": result.get("cost", 0),
+                "code": None if result["success"] else
+                        result.get("code") or result.get("message", {}).get("provider_response_code")
             })
             
             if result["success"]:
@@ -242,12 +367,14 @@ class SMSMockService:
             "success": True,
             "batch_id": str(uuid.uuid4()),
             "total_messages": len(to_numbers),
+            "duplicates_skipped": duplicados,
             "successful_sends": successful_sends,
             "failed_sends": failed_sends,
             "total_cost": total_cost,
             "results": results
         }
     
+    @medir_llamada_externa('sms')
     def get_delivery_report(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
         """
         Genera un reporte de entregas
@@ -260,40 +387,25 @@ class SMSMockService:
             Dict con el reporte de entregas
         """
         # Simular latencia
-        time.sleep(random.uniform(0.5, 2.0))
-        
-        # Filtrar mensajes por fecha
-        filtered_messages = [
-            msg for msg in self.messages.values()
-            if start_date <= msg.created_at <= end_date
-        ]
-        
-        # Calcular estadísticas
-        total_messages = len(filtered_messages)
-        delivered = sum(1 for msg in filtered_messages if msg.status == SMSStatus.DELIVERED)
-        failed = sum(1 for msg in filtered_messages if msg.status == SMSStatus.FAILED)
-        pending = sum(1 for msg in filtered_messages if msg.status in [SMSStatus.QUEUED, SMSStatus.SENT])
-        total_cost = sum(msg.cost for msg in filtered_messages)
+        time.sleep(self._latencia("get_delivery_report"))
         
+        return self._armar_reporte(start_date, end_date)
+    
+    def _armar_reporte(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Genera la respuesta de get_delivery_report"""
+        # Estadísticas desde los contadores del almacén, sin recorrer todos los mensajes
         return {
             "success": True,
             "period": {
                 "start_date": start_date.isoformat(),
                 "end_date": end_date.isoformat()
             },
-            "statistics": {
-                "total_messages": total_messages,
-                "delivered": delivered,
-                "failed": failed,
-                "pending": pending,
-                "delivery_rate": (delivered / total_messages * 100) if total_messages > 0 else 0,
-                "total_cost": total_cost
-            },
-            "messages": [msg.to_dict() for msg in filtered_messages[-100:]]  # Últimos 100
+            "statistics": self.store.estadisticas(start_date, end_date),
+            "messages": [msg.to_dict() for msg in self.store.rango(start_date, end_date, ultimos=100)]  # Últimos 100
         }
     
-    def _is_valid_phone_number(self, number: str) -> bool:
-        """Valida si el número de teléfono es válido"""
+    def _normalizar_numero(self, number: str) -> str:
+        """Número sin espacios, guiones, paréntesis ni indicativo de Colombia"""
         # Remover espacios y caracteres especiales
         clean_number = number.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
         
@@ -302,6 +414,11 @@ class SMSMockService:
             clean_number = clean_number[3:]
         elif clean_number.startswith("57"):
             clean_number = clean_number[2:]
+        return clean_number
+    
+    def _is_valid_phone_number(self, number: str) -> bool:
+        """Valida si el número de teléfono es válido"""
+        clean_number = self._normalizar_numero(number)
         
         # Debe tener 10 dígitos
         if not clean_number.isdigit() or len(clean_number) != 10:
@@ -313,12 +430,7 @@ class SMSMockService:
     
     def _get_phone_type(self, number: str) -> str:
         """Determina si es móvil o fijo"""
-        clean_number = number.replace(" ", "").replace("-", "").replace("(", "").replace(")", "")
-        
-        if clean_number.startswith("+57"):
-            clean_number = clean_number[3:]
-        elif clean_number.startswith("57"):
-            clean_number = clean_number[2:]
+        clean_number = self._normalizar_numero(number)
         
         # En Colombia, móviles empiezan con 3
         if clean_number.startswith('3'):
@@ -335,7 +447,7 @@ class SMSMockService:
             "Número bloqueado",
             "Contenido rechazado por filtros de spam"
         ]
-        return random.choice(reasons)
+        return self.rng.choice(reasons)
     
     def _simulate_async_delivery(self, message_id: str):
         """
@@ -344,21 +456,84 @@ class SMSMockService:
         """
         # Por ahora, solo progresamos inmediatamente a SENT
         # En implementación real, esto vendría por webhooks
-        if message_id in self.messages:
-            message = self.messages[message_id]
-            
-            # Simular progresión: QUEUED -> SENT -> DELIVERED
-            message.status = SMSStatus.SENT
-            message.updated_at = datetime.now()
-            
-            # Simular entrega después de un tiempo aleatorio
-            if random.random() < 0.9:  # 90% llegan a DELIVERED
-                # En implementación real, esto sería un job diferido
-                message.status = SMSStatus.DELIVERED
-                message.updated_at = datetime.now() + timedelta(seconds=random.randint(10, 300))
+        # Simular progresión: QUEUED -> SENT -> DELIVERED
+        self.store.actualizar_estado(message_id, SMSStatus.SENT, datetime.now())
+        
+        # Simular entrega después de un tiempo aleatorio
+        if self.rng.random() < 0.9:  # 90% llegan a DELIVERED
+            # En implementación real, esto sería un job diferido
+            self.store.actualizar_estado(
+                message_id, SMSStatus.DELIVERED, datetime.now() + timedelta(seconds=self.rng.randint(10, 300))
+            )
+
+
+class AsyncSMSMockService(SMSMockService):
+    """
+    Variante asíncrona para vistas async: los mismos métodos públicos como
+    corrutinas, con la latencia simulada mediante asyncio.sleep y las mismas
+    respuestas que el servicio síncrono. El almacenamiento de mensajes puede
+    ser la base de datos (SMS_MESSAGE_STORE='db'), así que todo lo que lo usa
+    corre con sync_to_async
+    """
+    
+    @medir_llamada_externa('sms')
+    async def send_sms(self, sms_request: SMSRequest, simular_entrega: bool = True) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("send_sms"))
+        return await sync_to_async(self._armar_envio)(sms_request, simular_entrega)
+    
+    async def generar_webhook_entrega(self, message_id: str) -> Optional[Dict[str, Any]]:
+        return await sync_to_async(super().generar_webhook_entrega)(message_id)
+    
+    @medir_llamada_externa('sms')
+    async def get_message_status(self, message_id: str) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("get_message_status"))
+        return await sync_to_async(self._armar_estado)(message_id)
+    
+    @medir_llamada_externa('sms')
+    async def send_bulk_sms(self, to_numbers: List[str], message: str,
+                            from_number: Optional[str] = None, max_workers: Optional[int] = None,
+                            chunk_size: Optional[int] = None,
+                            progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("send_bulk_sms"))
+        
+        numbers = self._numeros_unicos(to_numbers)
+        chunk_size = chunk_size or self.BULK_CHUNK_SIZE
+        semaforo = asyncio.Semaphore(max_workers or self.BULK_MAX_WORKERS)
+        
+        async def enviar(number):
+            async with semaforo:
+                await asyncio.sleep(self.rate_limiter.tiempo_espera())
+                try:
+                    return await self.send_sms(SMSRequest(to_number=number, message=message, from_number=from_number))
+                except Exception as exc:
+                    return self._error_envio(exc)
+        
+        envios = []
+        for inicio in range(0, len(numbers), chunk_size):
+            envios.extend(await asyncio.gather(*(enviar(number) for number in numbers[inicio:inicio + chunk_size])))
+            if progress_callback:
+                progress_callback(len(envios), len(numbers))
+        
+        return self._armar_envio_masivo(numbers, envios, len(to_numbers) - len(numbers))
+    
+    @medir_llamada_externa('sms')
+    async def get_delivery_report(self, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        await asyncio.sleep(self._latencia("get_delivery_report"))
+        return await sync_to_async(self._armar_reporte)(start_date, end_date)
 
 
 # Instancias de diferentes proveedores
 twilio_service = SMSMockService(SMSProvider.TWILIO)
 aws_sns_service = SMSMockService(SMSProvider.AWS_SNS)
 messagemedia_service = SMSMockService(SMSProvider.MESSAGEMEDIA)
+
+async_twilio_service = AsyncSMSMockService(SMSProvider.TWILIO)
+async_aws_sns_service = AsyncSMSMockService(SMSProvider.AWS_SNS)
+async_messagemedia_service = AsyncSMSMockService(SMSProvider.MESSAGEMEDIA)
+
+# Servicio síncrono por nombre de proveedor (SMSProvider.value)
+sms_services = {
+    SMSProvider.TWILIO.value: twilio_service,
+    SMSProvider.AWS_SNS.value: aws_sns_service,
+    SMSProvider.MESSAGEMEDIA.value: messagemedia_service,
+}
@@ -0,0 +1,201 @@
+"""
+Cola de salida de SMS en base de datos
+Las vistas encolan con encolar_sms / encolar_sms_masivo y responden de
+inmediato; el comando procesar_cola_sms reclama lotes, los envía en paralelo,
+espera la confirmación del proveedor (webhook simulado) y reintenta con
+backoff exponencial los mensajes fallidos o no entregados.
+"""
+import random
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Dict, Any, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+
+from .models import EnvioSMS
+from .sms_mock import SMSProvider, SMSRequest, sms_services
+
+# Errores del proveedor que no se corrigen reintentando
+ERRORES_PERMANENTES = {'INVALID_PHONE_NUMBER', 'LANDLINE_NOT_SUPPORTED'}
+
+# Segundos que tarda el proveedor en notificar la entrega (simulado)
+DEMORA_WEBHOOK = (2, 30)
+
+# Un lote reclamado por un worker que murió vuelve a la cola después de este tiempo
+RECLAMO_VENCIDO = timedelta(minutes=5)
+
+CAMPOS_ACTUALIZABLES = ['estado', 'intentos', 'proximo_intento', 'lote', 'reclamado_en',
+                        'message_id', 'ultimo_error', 'fecha_actualizacion']
+
+
+def calcular_backoff(intentos: int) -> timedelta:
+    """Espera antes del siguiente intento: exponencial con jitter y tope"""
+    base = getattr(settings, 'SMS_QUEUE_BACKOFF', 30)
+    maximo = getattr(settings, 'SMS_QUEUE_BACKOFF_MAX', 3600)
+    segundos = min(maximo, base * 2 ** max(intentos - 1, 0))
+    return timedelta(seconds=segundos * random.uniform(0.5, 1.0))
+
+
+def encolar_sms(to_number: str, message: str, proveedor: str = SMSProvider.TWILIO.value,
+                from_number: str = '') -> EnvioSMS:
+    """Agrega un SMS a la cola de salida"""
+    return EnvioSMS.objects.create(
+        to_number=to_number,
+        message=message,
+        proveedor=proveedor,
+        from_number=from_number or '',
+        proximo_intento=timezone.now(),
+    )
+
+
+def encolar_sms_masivo(to_numbers: List[str], message: str, proveedor: str = SMSProvider.TWILIO.value,
+                       from_number: str = '') -> int:
+    """Encola el mismo mensaje para varios números (sin repetidos). Devuelve cuántos se encolaron."""
+    ahora = timezone.now()
+    numeros = sms_services[proveedor]._numeros_unicos(to_numbers)
+    EnvioSMS.objects.bulk_create([
+        EnvioSMS(to_number=numero, message=message, proveedor=proveedor,
+                 from_number=from_number or '', proximo_intento=ahora)
+        for numero in numeros
+    ], batch_size=500)
+    return len(numeros)
+
+
+def _reintentar_o_fallar(envio: EnvioSMS, error: str, ahora, permanente: bool = False):
+    envio.ultimo_error = (error or '')[:200]
+    if permanente or envio.intentos >= getattr(settings, 'SMS_QUEUE_MAX_INTENTOS', 5):
+        envio.estado = 'fallido'
+        envio.proximo_intento = None
+    else:
+        envio.estado = 'pendiente'
+        envio.proximo_intento = ahora + calcular_backoff(envio.intentos)
+
+
+def procesar_webhook_sms(payload: Dict[str, Any]) -> Optional[EnvioSMS]:
+    """
+    Aplica la notificación de estado del proveedor al envío correspondiente
+
+    Args:
+        payload: Cuerpo del webhook (ver SMSMockService.generar_webhook_entrega)
+    """
+    envio = EnvioSMS.objects.filter(message_id=payload["message_id"], estado='enviado').first()
+    if envio is None:
+        return None
+
+    ahora = timezone.now()
+    if payload["status"] == 'DELIVERED':
+        envio.estado = 'entregado'
+        envio.proximo_intento = None
+        envio.ultimo_error = ''
+    else:
+        _reintentar_o_fallar(envio, payload.get("error_message") or payload["status"], ahora)
+    envio.fecha_actualizacion = ahora
+    envio.save(update_fields=['estado', 'proximo_intento', 'ultimo_error', 'fecha_actualizacion'])
+    return envio
+
+
+class ProcesadorColaSMS:
+    """
+    Procesa la cola por lotes. Varios workers pueden correr a la vez: cada uno
+    reclama sus filas marcándolas con un identificador de lote propio.
+    """
+
+    def __init__(self, lote: int = 100, max_workers: int = 10):
+        self.lote = lote
+        self.max_workers = max_workers
+
+    def liberar_reclamos_vencidos(self) -> int:
+        return EnvioSMS.objects.filter(
+            estado='enviando', reclamado_en__lt=timezone.now() - RECLAMO_VENCIDO
+        ).update(estado='pendiente', lote='', reclamado_en=None)
+
+    def reclamar(self) -> List[EnvioSMS]:
+        """Marca como 'enviando' hasta `lote` envíos vencidos y los devuelve"""
+        ahora = timezone.now()
+        ids = list(
+            EnvioSMS.objects.filter(estado='pendiente', proximo_intento__lte=ahora)
+            .order_by('proximo_intento').values_list('pk', flat=True)[:self.lote]
+        )
+        if not ids:
+            return []
+        token = uuid.uuid4().hex
+        # Solo se quedan las filas que siguen pendientes: si otro worker las tomó, no se tocan
+        EnvioSMS.objects.filter(pk__in=ids, estado='pendiente').update(
+            estado='enviando', lote=token, reclamado_en=ahora
+        )
+        return list(EnvioSMS.objects.filter(lote=token, estado='enviando'))
+
+    def enviar(self, envios: List[EnvioSMS]) -> Dict[str, int]:
+        def enviar_uno(envio):
+            service = sms_services[envio.proveedor]
+            try:
+                service.rate_limiter.adquirir()
+                return service.send_sms(
+                    SMSRequest(to_number=envio.to_number, message=envio.message,
+                               from_number=envio.from_number or None),
+                    simular_entrega=False,
+                )
+            finally:
+                # send_sms escribe en el almacén 'db' desde el hilo del pool
+                close_old_connections()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='cola-sms') as executor:
+            futures = [executor.submit(enviar_uno, envio) for envio in envios]
+
+        ahora = timezone.now()
+        resumen = {'enviados': 0, 'reintentos': 0, 'fallidos': 0}
+        for envio, future in zip(envios, futures):
+            envio.intentos += 1
+            envio.lote = ''
+            envio.reclamado_en = None
+            envio.fecha_actualizacion = ahora
+            try:
+                resultado = future.result()
+            except Exception as exc:
+                resultado = {"success": False, "error": f'{type(exc).__name__}: {exc}'}
+
+            if resultado["success"]:
+                envio.estado = 'enviado'
+                envio.message_id = resultado["message_id"]
+                envio.ultimo_error = ''
+                envio.proximo_intento = ahora + timedelta(seconds=random.uniform(*DEMORA_WEBHOOK))
+            else:
+                codigo = resultado.get("code") or resultado.get("message", {}).get("provider_response_code")
+                error = resultado.get("error") or resultado.get("message", {}).get("error_message")
+                _reintentar_o_fallar(envio, error, ahora, permanente=codigo in ERRORES_PERMANENTES)
+            resumen['enviados' if envio.estado == 'enviado' else
+                    'reintentos' if envio.estado == 'pendiente' else 'fallidos'] += 1
+
+        EnvioSMS.objects.bulk_update(envios, CAMPOS_ACTUALIZABLES, batch_size=500)
+        return resumen
+
+    def confirmar(self) -> Dict[str, int]:
+        """Recibe los webhooks de entrega de los envíos cuya confirmación ya venció"""
+        resumen = {'entregados': 0, 'no_entregados': 0, 'sin_confirmacion': 0}
+        envios = EnvioSMS.objects.filter(
+            estado='enviado', proximo_intento__lte=timezone.now()
+        ).order_by('proximo_intento')[:self.lote]
+        for envio in envios:
+            payload = sms_services[envio.proveedor].generar_webhook_entrega(envio.message_id)
+            if payload is None:
+                # El proveedor no conoce el mensaje (p. ej. almacén en memoria de otro
+                # proceso): se reintenta con backoff hasta SMS_QUEUE_MAX_INTENTOS
+                ahora = timezone.now()
+                _reintentar_o_fallar(envio, 'Sin confirmación del proveedor', ahora)
+                envio.fecha_actualizacion = ahora
+                envio.save(update_fields=['estado', 'proximo_intento', 'ultimo_error', 'fecha_actualizacion'])
+                resumen['sin_confirmacion'] += 1
+                continue
+            procesar_webhook_sms(payload)
+            resumen['entregados' if payload["status"] == 'DELIVERED' else 'no_entregados'] += 1
+        return resumen
+
+    def procesar(self) -> Dict[str, int]:
+        """Una vuelta completa del worker"""
+        resumen = {'liberados': self.liberar_reclamos_vencidos()}
+        resumen.update(self.enviar(self.reclamar()))
+        resumen.update(self.confirmar())
+        return resumen
@@ -0,0 +1,223 @@
+"""
+Enrutamiento de SMS entre proveedores (Twilio, AWS SNS, MessageMedia)
+
+Cada proveedor lleva estadísticas vivas (promedio móvil exponencial) de tasa de
+éxito y latencia. Un mensaje se envía por el proveedor de menor costo
+esperado:
+
+    costo / tasa_exito + PESO_LATENCIA * latencia
+
+y si falla por causas del proveedor se reintenta con el siguiente. Los errores
+del destinatario (número inválido o fijo) no se reintentan porque fallarían en
+cualquier proveedor.
+
+Los envíos masivos se reparten entre los proveedores disponibles en proporción
+a su límite de tasa, para que todos terminen a la vez, y los números que
+fallan por el proveedor se reenvían mensaje a mensaje con conmutación.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from .resilience import servicios_resilientes
+from .sms_mock import SMSProvider, SMSRequest
+from .sms_queue import ERRORES_PERMANENTES
+
+# Pesos del puntaje: pesos colombianos por segundo de latencia
+PESO_LATENCIA = 20.0
+# Peso de la última observación en los promedios móviles
+ALFA = 0.1
+# Reenvíos simultáneos de los números que fallaron en un envío masivo
+MAX_REENVIOS_SIMULTANEOS = 10
+# Por debajo de esta tasa de éxito el proveedor no recibe parte de los envíos masivos
+TASA_MINIMA_MASIVO = 0.5
+
+
+class EstadisticasProveedor:
+    """Tasa de éxito y latencia recientes de un proveedor"""
+
+    def __init__(self, tasa_exito: float = 0.95, latencia: float = 1.0):
+        self.tasa_exito = tasa_exito
+        self.latencia = latencia
+        self.envios = 0
+        self._lock = threading.Lock()
+
+    def registrar(self, exito: bool, latencia: Optional[float] = None):
+        with self._lock:
+            self.envios += 1
+            self.tasa_exito += ALFA * ((1.0 if exito else 0.0) - self.tasa_exito)
+            if latencia is not None:
+                self.latencia += ALFA * (latencia - self.latencia)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'tasa_exito': round(self.tasa_exito, 4), 'latencia': round(self.latencia, 3), 'envios': self.envios}
+
+
+class EnrutadorSMS:
+    """Elige proveedor por mensaje y reparte los envíos masivos"""
+
+    def __init__(self, servicios: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            servicios: Servicios por SMSProvider.value; por defecto los de
+                       services/resilience.py (con breaker, bulkhead y deadline)
+        """
+        if servicios is None:
+            servicios = {
+                SMSProvider.TWILIO.value: servicios_resilientes['twilio'],
+                SMSProvider.AWS_SNS.value: servicios_resilientes['aws_sns'],
+                SMSProvider.MESSAGEMEDIA.value: servicios_resilientes['messagemedia'],
+            }
+        self.servicios = servicios
+        self.estadisticas = {}
+        for proveedor, service in servicios.items():
+            minimo, maximo = service.LATENCIAS['send_sms']
+            self.estadisticas[proveedor] = EstadisticasProveedor(latencia=(minimo + maximo) / 2)
+
+    def _costo(self, proveedor: str) -> float:
+        service = self.servicios[proveedor]
+        return service.cost_per_message.get(service.provider, 70)
+
+    def puntaje(self, proveedor: str) -> float:
+        """Costo esperado de un envío exitoso por el proveedor (menor es mejor)"""
+        estadisticas = self.estadisticas[proveedor]
+        return self._costo(proveedor) / max(estadisticas.tasa_exito, 0.01) + PESO_LATENCIA * estadisticas.latencia
+
+    def ranking(self) -> List[str]:
+        return sorted(self.servicios, key=self.puntaje)
+
+    def send_sms(self, sms_request: SMSRequest, **kwargs) -> Dict[str, Any]:
+        """
+        Envía por el mejor proveedor y conmuta al siguiente si falla
+
+        Returns:
+            La respuesta de send_sms del proveedor usado, con "provider" y
+            "attempts" (proveedores intentados)
+        """
+        resultado = {}
+        intentos = []
+        for proveedor in self.ranking():
+            intentos.append(proveedor)
+            resultado = self._enviar(proveedor, sms_request, **kwargs)
+            if resultado["success"] or _codigo(resultado) in ERRORES_PERMANENTES:
+                break
+        return dict(resultado, provider=intentos[-1], attempts=intentos)
+
+    def _enviar(self, proveedor: str, sms_request: SMSRequest, **kwargs) -> Dict[str, Any]:
+        inicio = time.monotonic()
+        try:
+            resultado = self.servicios[proveedor].send_sms(sms_request, **kwargs)
+        except Exception as exc:
+            resultado = {"success": False, "error": f"{type(exc).__name__}: {exc}", "code": "PROVIDER_ERROR"}
+        if _codigo(resultado) not in ERRORES_PERMANENTES:
+            # Sin latencia cuando el breaker o el bulkhead respondieron sin llamar al proveedor
+            respondio = resultado.get("code") not in ('CIRCUIT_OPEN', 'BULKHEAD_FULL')
+            self.estadisticas[proveedor].registrar(
+                resultado["success"], time.monotonic() - inicio if respondio else None
+            )
+        return resultado
+
+    def reparto(self, cantidad: int) -> Dict[str, int]:
+        """
+        Números por proveedor para un envío masivo, proporcional a
+        RATE_LIMITS × tasa de éxito entre los proveedores sanos
+        """
+        capacidades = {}
+        for proveedor, service in self.servicios.items():
+            breaker = getattr(service, 'breaker', None)
+            if breaker is not None and breaker.estado == 'abierto':
+                continue
+            if self.estadisticas[proveedor].tasa_exito < TASA_MINIMA_MASIVO:
+                continue
+            capacidades[proveedor] = service.RATE_LIMITS.get(service.provider, 10) * self.estadisticas[proveedor].tasa_exito
+        if not capacidades:
+            # Todos degradados: se usa el mejor puntuado
+            capacidades = {self.ranking()[0]: 1.0}
+
+        total = sum(capacidades.values())
+        reparto = {proveedor: int(cantidad * capacidad / total) for proveedor, capacidad in capacidades.items()}
+        # El residuo del redondeo va a los proveedores más baratos
+        for proveedor in sorted(capacidades, key=self.puntaje)[:cantidad - sum(reparto.values())]:
+            reparto[proveedor] += 1
+        return reparto
+
+    def send_bulk_sms(self, to_numbers: List[str], message: str, from_number: Optional[str] = None,
+                      **kwargs) -> Dict[str, Any]:
+        """
+        Envío masivo repartido entre proveedores en paralelo, con la misma
+        respuesta que SMSMockService.send_bulk_sms más "providers" (números
+        por proveedor) y "failovers" (números reenviados por otro proveedor)
+        """
+        base = next(iter(self.servicios.values()))
+        numbers = base._numeros_unicos(to_numbers)
+        reparto = self.reparto(len(numbers))
+
+        partes = {}
+        inicio = 0
+        for proveedor, cantidad in reparto.items():
+            if cantidad:
+                partes[proveedor] = numbers[inicio:inicio + cantidad]
+                inicio += cantidad
+
+        def enviar_parte(proveedor):
+            # El envío masivo dura más que el deadline de una llamada: va directo al servicio
+            service = self.servicios[proveedor]
+            service = getattr(service, 'service', service)
+            try:
+                return service.send_bulk_sms(partes[proveedor], message, from_number, **kwargs)
+            except Exception as exc:
+                error = base._error_envio(exc)
+                return {"results": [dict(error, number=number) for number in partes[proveedor]]}
+
+        with ThreadPoolExecutor(max_workers=len(partes) or 1, thread_name_prefix='sms-router') as executor:
+            respuestas = dict(zip(partes, executor.map(enviar_parte, partes)))
+
+        resultados = {}
+        envios = {}
+        for proveedor, respuesta in respuestas.items():
+            for result in respuesta["results"]:
+                exito = result["success"]
+                if not exito and result.get("code") in ERRORES_PERMANENTES:
+                    envios[result["number"]] = result
+                    continue
+                self.estadisticas[proveedor].registrar(exito)
+                resultados[result["number"]] = (proveedor, result)
+
+        # Conmutación: los fallidos por el proveedor se reenvían mensaje a mensaje
+        fallidos = []
+        for number, (proveedor, result) in resultados.items():
+            if result["success"]:
+                envios[number] = dict(result, provider=proveedor)
+            else:
+                fallidos.append(number)
+
+        def reenviar(number):
+            return self.send_sms(SMSRequest(to_number=number, message=message, from_number=from_number))
+
+        if fallidos:
+            with ThreadPoolExecutor(max_workers=MAX_REENVIOS_SIMULTANEOS, thread_name_prefix='sms-router') as executor:
+                envios.update(zip(fallidos, executor.map(reenviar, fallidos)))
+
+        respuesta = base._armar_envio_masivo(
+            numbers, [envios[number] for number in numbers], len(to_numbers) - len(numbers)
+        )
+        for result, number in zip(respuesta["results"], numbers):
+            result["provider"] = envios[number].get("provider")
+        respuesta["providers"] = {proveedor: len(partes[proveedor]) for proveedor in partes}
+        respuesta["failovers"] = len(fallidos)
+        return respuesta
+
+    def estado(self) -> Dict[str, Any]:
+        """Estadísticas y puntaje actual por proveedor"""
+        return {
+            proveedor: dict(self.estadisticas[proveedor].to_dict(), puntaje=round(self.puntaje(proveedor), 2))
+            for proveedor in self.ranking()
+        }
+
+
+def _codigo(resultado: Dict[str, Any]) -> Optional[str]:
+    return resultado.get("code") or (resultado.get("message") or {}).get("provider_response_code")
+
+
+sms_router = EnrutadorSMS()
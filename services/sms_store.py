@@ -0,0 +1,306 @@
+"""
+Almacenamiento de los mensajes enviados por SMSMockService
+Dos implementaciones con la misma interfaz:
+- MemoryMessageStore: en memoria del proceso, con capacidad máxima (descarta los
+  más antiguos) e índice ordenado por fecha para consultas por rango en O(log n)
+- DatabaseMessageStore: en la base de datos, compartido entre workers de gunicorn
+
+Ambas mantienen contadores por minuto y estado que se actualizan en cada envío y
+cambio de estado; el reporte de entregas suma esos contadores y solo recorre
+mensajes en los minutos incompletos de los extremos del rango.
+"""
+import threading
+from contextlib import nullcontext
+from bisect import bisect_left, insort
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+MINUTO = timedelta(minutes=1)
+ESTADOS_PENDIENTES = ('QUEUED', 'SENT')
+
+
+def truncar_minuto(fecha: datetime) -> datetime:
+    return fecha.replace(second=0, microsecond=0)
+
+
+def dividir_rango(start: datetime, end: datetime) -> Tuple[Optional[Tuple[datetime, datetime]], List[Tuple[datetime, datetime]]]:
+    """
+    Divide [start, end] en minutos completos (se leen de los contadores) y
+    extremos que hay que contar mensaje a mensaje. Todos los rangos devueltos
+    son semiabiertos [desde, hasta).
+    """
+    hasta = end + timedelta(microseconds=1)
+    primero = truncar_minuto(start)
+    if primero < start:
+        primero += MINUTO
+    fin = truncar_minuto(hasta)
+    if primero >= fin:
+        return None, [(start, hasta)]
+    return (primero, fin), [(start, primero), (fin, hasta)]
+
+
+class MessageStore:
+    """Interfaz común de los almacenes de mensajes"""
+
+    def guardar(self, message):
+        raise NotImplementedError
+
+    def obtener(self, message_id: str):
+        raise NotImplementedError
+
+    def actualizar_estado(self, message_id: str, status, updated_at: datetime):
+        raise NotImplementedError
+
+    def rango(self, start: datetime, end: datetime, ultimos: Optional[int] = None) -> list:
+        """Mensajes creados en [start, end] ordenados por fecha (solo los `ultimos` si se indica)"""
+        raise NotImplementedError
+
+    def _contadores(self, desde: datetime, hasta: datetime) -> Counter:
+        """Conteo por estado y 'cost' de los minutos completos en [desde, hasta)"""
+        raise NotImplementedError
+
+    def _contar_mensajes(self, desde: datetime, hasta: datetime) -> Counter:
+        """Conteo por estado y 'cost' recorriendo los mensajes en [desde, hasta)"""
+        raise NotImplementedError
+
+    def estadisticas(self, start: datetime, end: datetime) -> Dict[str, float]:
+        """Totales del reporte de entregas para [start, end]"""
+        completos, extremos = dividir_rango(start, end)
+        totales = Counter()
+        if completos:
+            totales.update(self._contadores(*completos))
+        for desde, hasta in extremos:
+            if desde < hasta:
+                totales.update(self._contar_mensajes(desde, hasta))
+
+        costo = totales.pop('cost', 0)
+        total_messages = sum(totales.values())
+        delivered = totales['DELIVERED']
+        return {
+            "total_messages": total_messages,
+            "delivered": delivered,
+            "failed": totales['FAILED'],
+            "pending": sum(totales[estado] for estado in ESTADOS_PENDIENTES),
+            "delivery_rate": (delivered / total_messages * 100) if total_messages > 0 else 0,
+            "total_cost": costo,
+        }
+
+
+class MemoryMessageStore(MessageStore):
+    """
+    Almacén en memoria del proceso. Al superar `capacidad` descarta los mensajes
+    más antiguos; los contadores del reporte conservan lo ya enviado.
+    """
+
+    def __init__(self, capacidad: int = 10000):
+        self.capacidad = capacidad
+        self._mensajes = OrderedDict()
+        self._indice = []  # (created_at, message_id) ordenado
+        self._minutos = []  # minutos con contadores, ordenados
+        self._contadores_minuto = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._mensajes)
+
+    def _contar(self, minuto: datetime, status: str, cantidad: int, costo: float):
+        contador = self._contadores_minuto.get(minuto)
+        if contador is None:
+            contador = self._contadores_minuto[minuto] = Counter()
+            insort(self._minutos, minuto)
+        contador[status] += cantidad
+        contador['cost'] += costo
+
+    def guardar(self, message):
+        with self._lock:
+            self._mensajes[message.message_id] = message
+            insort(self._indice, (message.created_at, message.message_id))
+            self._contar(truncar_minuto(message.created_at), message.status.value, 1, message.cost)
+
+            while len(self._mensajes) > self.capacidad:
+                _, antiguo = self._mensajes.popitem(last=False)
+                posicion = bisect_left(self._indice, (antiguo.created_at, antiguo.message_id))
+                del self._indice[posicion]
+
+    def obtener(self, message_id: str):
+        return self._mensajes.get(message_id)
+
+    def actualizar_estado(self, message_id: str, status, updated_at: datetime):
+        with self._lock:
+            message = self._mensajes.get(message_id)
+            if message is None:
+                return
+            minuto = truncar_minuto(message.created_at)
+            self._contar(minuto, message.status.value, -1, 0)
+            self._contar(minuto, status.value, 1, 0)
+            message.status = status
+            message.updated_at = updated_at
+
+    def _entre(self, desde: datetime, hasta: datetime) -> Tuple[int, int]:
+        return bisect_left(self._indice, (desde,)), bisect_left(self._indice, (hasta,))
+
+    def rango(self, start: datetime, end: datetime, ultimos: Optional[int] = None) -> list:
+        with self._lock:
+            inicio, fin = self._entre(start, end + timedelta(microseconds=1))
+            if ultimos is not None:
+                inicio = max(inicio, fin - ultimos)
+            return [self._mensajes[message_id] for _, message_id in self._indice[inicio:fin]]
+
+    def _contadores(self, desde: datetime, hasta: datetime) -> Counter:
+        totales = Counter()
+        with self._lock:
+            for minuto in self._minutos[bisect_left(self._minutos, desde):bisect_left(self._minutos, hasta)]:
+                totales.update(self._contadores_minuto[minuto])
+        return totales
+
+    def _contar_mensajes(self, desde: datetime, hasta: datetime) -> Counter:
+        totales = Counter()
+        with self._lock:
+            inicio, fin = self._entre(desde, hasta)
+            for _, message_id in self._indice[inicio:fin]:
+                message = self._mensajes[message_id]
+                totales[message.status.value] += 1
+                totales['cost'] += message.cost
+        return totales
+
+
+class DatabaseMessageStore(MessageStore):
+    """
+    Almacén en la base de datos (modelos MensajeSMS y ContadorSMS), compartido
+    por todos los workers. Las fechas del simulador son locales sin zona
+    horaria; se guardan con la zona de Django y se devuelven igual que llegaron.
+    """
+
+    # SQLite admite un solo escritor a la vez: los hilos de un envío masivo
+    # escriben de a uno en lugar de fallar con "database is locked"
+    _escritura = threading.Lock()
+
+    def __init__(self, proveedor: str):
+        self.proveedor = proveedor
+
+    def _escribiendo(self):
+        return self._escritura if connection.vendor == 'sqlite' else nullcontext()
+
+    def _aware(self, fecha: datetime) -> datetime:
+        return timezone.make_aware(fecha) if settings.USE_TZ and timezone.is_naive(fecha) else fecha
+
+    def _naive(self, fecha: datetime) -> datetime:
+        return timezone.make_naive(fecha) if settings.USE_TZ else fecha
+
+    def _a_respuesta(self, mensaje):
+        from .sms_mock import SMSResponse, SMSStatus
+        return SMSResponse(
+            message_id=mensaje.message_id,
+            to_number=mensaje.to_number,
+            from_number=mensaje.from_number,
+            message=mensaje.message,
+            status=SMSStatus(mensaje.status),
+            created_at=self._naive(mensaje.created_at),
+            updated_at=self._naive(mensaje.updated_at),
+            cost=float(mensaje.cost),
+            error_message=mensaje.error_message,
+            provider_response_code=mensaje.provider_response_code,
+        )
+
+    def _contar(self, minuto: datetime, status: str, cantidad: int, costo: float):
+        from .models import ContadorSMS
+        # UPDATE atómico; la fila se crea la primera vez y, si otro proceso la
+        # creó al tiempo, se vuelve a sumar sobre la suya
+        contador = ContadorSMS.objects.filter(proveedor=self.proveedor, minuto=minuto, status=status)
+        suma = {'cantidad': F('cantidad') + cantidad, 'costo': F('costo') + costo}
+        if contador.update(**suma):
+            return
+        try:
+            with transaction.atomic():
+                ContadorSMS.objects.create(proveedor=self.proveedor, minuto=minuto, status=status,
+                                           cantidad=cantidad, costo=costo)
+        except IntegrityError:
+            contador.update(**suma)
+
+    def guardar(self, message):
+        from .models import MensajeSMS
+        created_at = self._aware(message.created_at)
+        with self._escribiendo(), transaction.atomic():
+            MensajeSMS.objects.create(
+                message_id=message.message_id,
+                proveedor=self.proveedor,
+                to_number=message.to_number,
+                from_number=message.from_number,
+                message=message.message,
+                status=message.status.value,
+                created_at=created_at,
+                updated_at=self._aware(message.updated_at),
+                cost=message.cost,
+                error_message=message.error_message,
+                provider_response_code=message.provider_response_code,
+            )
+            self._contar(truncar_minuto(created_at), message.status.value, 1, message.cost)
+
+    def obtener(self, message_id: str):
+        from .models import MensajeSMS
+        mensaje = MensajeSMS.objects.filter(proveedor=self.proveedor, message_id=message_id).first()
+        return self._a_respuesta(mensaje) if mensaje else None
+
+    def actualizar_estado(self, message_id: str, status, updated_at: datetime):
+        from .models import MensajeSMS
+        with self._escribiendo(), transaction.atomic():
+            mensaje = MensajeSMS.objects.select_for_update().filter(
+                proveedor=self.proveedor, message_id=message_id
+            ).first()
+            if mensaje is None or mensaje.status == status.value:
+                return
+            minuto = truncar_minuto(mensaje.created_at)
+            self._contar(minuto, mensaje.status, -1, 0)
+            self._contar(minuto, status.value, 1, 0)
+            mensaje.status = status.value
+            mensaje.updated_at = self._aware(updated_at)
+            mensaje.save(update_fields=['status', 'updated_at'])
+
+    def rango(self, start: datetime, end: datetime, ultimos: Optional[int] = None) -> list:
+        from .models import MensajeSMS
+        mensajes = MensajeSMS.objects.filter(
+            proveedor=self.proveedor,
+            created_at__gte=self._aware(start),
+            created_at__lte=self._aware(end),
+        )
+        if ultimos is not None:
+            mensajes = reversed(mensajes.order_by('-created_at')[:ultimos])
+        else:
+            mensajes = mensajes.order_by('created_at')
+        return [self._a_respuesta(mensaje) for mensaje in mensajes]
+
+    def _sumar(self, filas) -> Counter:
+        totales = Counter()
+        for fila in filas:
+            totales[fila['status']] += fila['total']
+            totales['cost'] += float(fila['costo_total'] or 0)
+        return totales
+
+    def _contadores(self, desde: datetime, hasta: datetime) -> Counter:
+        from .models import ContadorSMS
+        return self._sumar(
+            ContadorSMS.objects.filter(
+                proveedor=self.proveedor, minuto__gte=self._aware(desde), minuto__lt=self._aware(hasta)
+            ).values('status').annotate(total=Sum('cantidad'), costo_total=Sum('costo'))
+        )
+
+    def _contar_mensajes(self, desde: datetime, hasta: datetime) -> Counter:
+        from .models import MensajeSMS
+        return self._sumar(
+            MensajeSMS.objects.filter(
+                proveedor=self.proveedor, created_at__gte=self._aware(desde), created_at__lt=self._aware(hasta)
+            ).values('status').annotate(total=Count('pk'), costo_total=Sum('cost'))
+        )
+
+
+def crear_store(proveedor: str) -> MessageStore:
+    """Almacén configurado en settings.SMS_MESSAGE_STORE ('memoria' o 'db')"""
+    if getattr(settings, 'SMS_MESSAGE_STORE', 'memoria') == 'db':
+        return DatabaseMessageStore(proveedor)
+    return MemoryMessageStore(getattr(settings, 'SMS_STORE_CAPACITY', 10000))
@@ -0,0 +1,180 @@
+"""
+Pipeline de archivos estáticos
+Registro de los assets de terceros que se vendorizan localmente, almacenamiento
+con hash de contenido y variantes precomprimidas (gzip/brotli), y un middleware
+que sirve esas variantes cuando no hay un proxy delante de la aplicación
+"""
+import gzip
+import mimetypes
+import os
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional: sin él solo se generan variantes gzip
+    brotli = None
+
+
+# Assets de terceros que antes se cargaban desde CDNs externos.
+# 'path' es la ruta relativa dentro de static/ donde el comando
+# vendorizar_estaticos deja la copia local; 'icon_prefix' indica que la hoja
+# de estilos es una fuente de iconos que se puede recortar a los iconos usados.
+VENDOR_ASSETS = {
+    'bootstrap_css': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css',
+        'path': 'vendor/bootstrap/bootstrap.min.css',
+    },
+    'bootstrap_js': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js',
+        'path': 'vendor/bootstrap/bootstrap.bundle.min.js',
+    },
+    'bootstrap_icons': {
+        'url': 'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.8.1/font/bootstrap-icons.css',
+        'path': 'vendor/bootstrap-icons/bootstrap-icons.css',
+        'icon_prefix': 'bi-',
+    },
+    'font_awesome': {
+        'url': 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css',
+        'path': 'vendor/font-awesome/all.min.css',
+        'icon_prefix': 'fa-',
+    },
+    'chartjs': {
+        'url': 'https://cdn.jsdelivr.net/npm/chart.js@4.4.0/dist/chart.umd.js',
+        'path': 'vendor/chartjs/chart.umd.js',
+    },
+    'inter': {
+        'url': 'https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap',
+        'path': 'vendor/inter/inter.css',
+    },
+}
+
+# Extensiones que vale la pena precomprimir (las imágenes y woff2 ya van comprimidas)
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.ttf', '.eot', '.ico')
+
+# Nombres con hash de contenido generados por ManifestStaticFilesStorage
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+CACHE_CONTROL_INMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_CONTROL_DEFAULT = 'public, max-age=3600'
+
+
+def comprimir_archivo(path, min_size=256):
+    """
+    Escribe las variantes .gz y .br de un archivo
+
+    Args:
+        path: Ruta absoluta del archivo original
+        min_size: Tamaño mínimo en bytes para intentar la compresión
+
+    Returns:
+        Lista con las extensiones generadas
+    """
+    with open(path, 'rb') as f:
+        contenido = f.read()
+
+    if len(contenido) < min_size:
+        return []
+
+    variantes = [('.gz', gzip.compress(contenido, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variantes.append(('.br', brotli.compress(contenido, quality=11)))
+
+    generadas = []
+    for extension, comprimido in variantes:
+        # Solo conservar la variante si realmente ahorra bytes
+        if len(comprimido) < len(contenido) * 0.95:
+            with open(f'{path}{extension}', 'wb') as f:
+                f.write(comprimido)
+            generadas.append(extension)
+    return generadas
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    ManifestStaticFilesStorage que además precomprime los archivos con hash
+    durante collectstatic, para que el servidor no comprima en cada petición
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+        if dry_run:
+            return
+
+        for hashed_name in set(self.hashed_files.values()):
+            if hashed_name.endswith(COMPRESSIBLE_EXTENSIONS):
+                comprimir_archivo(self.path(hashed_name))
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Sirve STATIC_ROOT directamente desde la aplicación, eligiendo la variante
+    .br o .gz según Accept-Encoding y con cabeceras de caché de larga duración
+    para los nombres con hash. Solo se activa con SERVE_PRECOMPRESSED_STATIC,
+    pensado para despliegues sin nginx/proxy sirviendo /static/.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SERVE_PRECOMPRESSED_STATIC', False) or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed
+
+        self.get_response = get_response
+        self.static_prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.static_root = Path(settings.STATIC_ROOT).resolve()
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD') and request.path.startswith(self.static_prefix):
+            response = self.serve(request, request.path[len(self.static_prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        """Devuelve la respuesta para el archivo solicitado o None si no existe"""
+        full_path = (self.static_root / name).resolve()
+        if self.static_root not in full_path.parents or not full_path.is_file():
+            return None
+
+        stat = full_path.stat()
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+            response = HttpResponseNotModified()
+            self._set_cache_headers(response, name, stat.st_mtime)
+            return response
+
+        content_type, _ = mimetypes.guess_type(str(full_path))
+        encoding, served_path = self._select_variant(request, full_path)
+
+        response = FileResponse(
+            open(served_path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+        self._set_cache_headers(response, name, stat.st_mtime)
+        return response
+
+    def _select_variant(self, request, full_path):
+        """Elige la mejor variante precomprimida aceptada por el cliente"""
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        for encoding, extension in (('br', '.br'), ('gzip', '.gz')):
+            if encoding in accept_encoding:
+                candidate = f'{full_path}{extension}'
+                if os.path.isfile(candidate):
+                    return encoding, candidate
+        return None, full_path
+
+    def _set_cache_headers(self, response, name, mtime):
+        response['Last-Modified'] = http_date(mtime)
+        response['Vary'] = 'Accept-Encoding'
+        if HASHED_NAME_RE.search(name):
+            response['Cache-Control'] = CACHE_CONTROL_INMUTABLE
+        else:
+            response['Cache-Control'] = CACHE_CONTROL_DEFAULT
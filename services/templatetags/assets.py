@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+
+from services.static_assets import VENDOR_ASSETS
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _vendor_disponible(path):
+    """Indica si el asset ya fue vendorizado dentro de static/"""
+    return finders.find(path) is not None
+
+
+@register.simple_tag
+def vendor_asset(nombre):
+    """
+    URL de un asset de terceros: la copia local (con hash en producción)
+    si ya se ejecutó vendorizar_estaticos, o el CDN original si no
+    """
+    asset = VENDOR_ASSETS[nombre]
+    if _vendor_disponible(asset['path']):
+        return static(asset['path'])
+    return asset['url']
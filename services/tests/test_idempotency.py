@@ -0,0 +1,155 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from services.idempotency import (
+    COMPLETADO, CONFLICTO, EN_CURSO, NUEVO, DatabaseIdempotencyStore, MemoryIdempotencyStore, huella_solicitud,
+)
+from services.latency_profiles import PerfilCero
+from services.models import ClaveIdempotencia
+from services.payment_gateway_mock import PaymentGatewayMockService, PaymentMethod, PaymentRequest
+
+
+class AlmacenIdempotenciaMixin:
+    """Comportamiento común a los dos almacenes; las subclases definen crear_almacen()"""
+
+    def setUp(self):
+        self.almacen = self.crear_almacen()
+
+    def test_reserva_en_curso_y_completada(self):
+        self.assertEqual(self.almacen.reservar('k', 'h'), (NUEVO, None))
+        self.assertEqual(self.almacen.reservar('k', 'h'), (EN_CURSO, None))
+        self.almacen.completar('k', {'transaction_id': 't1'})
+        self.assertEqual(self.almacen.reservar('k', 'h'), (COMPLETADO, {'transaction_id': 't1'}))
+
+    def test_otra_huella_es_conflicto(self):
+        self.almacen.reservar('k', 'h')
+        self.assertEqual(self.almacen.reservar('k', 'otra'), (CONFLICTO, None))
+        self.almacen.completar('k', {'transaction_id': 't1'})
+        self.assertEqual(self.almacen.reservar('k', 'otra'), (CONFLICTO, None))
+
+    def test_liberar_permite_reintentar(self):
+        self.almacen.reservar('k', 'h')
+        self.almacen.liberar('k')
+        self.assertEqual(self.almacen.reservar('k', 'otra'), (NUEVO, None))
+
+    def test_liberar_no_borra_una_respuesta(self):
+        self.almacen.reservar('k', 'h')
+        self.almacen.completar('k', {'transaction_id': 't1'})
+        self.almacen.liberar('k')
+        self.assertEqual(self.almacen.reservar('k', 'h')[0], COMPLETADO)
+
+    def test_esperar_devuelve_en_curso_al_agotar_el_tiempo(self):
+        self.almacen.reservar('k', 'h')
+        self.assertEqual(self.almacen.esperar('k', 'h', timeout=0), (EN_CURSO, None))
+
+
+class MemoryIdempotencyStoreTest(AlmacenIdempotenciaMixin, TestCase):
+
+    def crear_almacen(self):
+        return MemoryIdempotencyStore(ttl=60, capacidad=3)
+
+    def test_capacidad_descarta_las_mas_antiguas(self):
+        for clave in ('a', 'b', 'c', 'd'):
+            self.almacen.reservar(clave, 'h')
+        self.assertEqual(list(self.almacen._claves), ['b', 'c', 'd'])
+        self.assertEqual(self.almacen.reservar('a', 'h'), (NUEVO, None))
+
+    def test_clave_vencida_se_puede_reservar(self):
+        self.almacen.reservar('k', 'h')
+        self.almacen.completar('k', {'transaction_id': 't1'})
+        with mock.patch('services.idempotency.time.monotonic', return_value=time.monotonic() + 61):
+            self.assertEqual(self.almacen.reservar('k', 'otra'), (NUEVO, None))
+
+
+class DatabaseIdempotencyStoreTest(AlmacenIdempotenciaMixin, TestCase):
+
+    def crear_almacen(self):
+        return DatabaseIdempotencyStore(ttl=60)
+
+    def test_clave_vencida_se_puede_reservar(self):
+        self.almacen.reservar('k', 'h')
+        self.almacen.completar('k', {'transaction_id': 't1'})
+        ClaveIdempotencia.objects.filter(clave='k').update(expira_en=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.almacen.reservar('k', 'otra'), (NUEVO, None))
+        self.assertEqual(ClaveIdempotencia.objects.filter(clave='k').count(), 1)
+
+    def test_respuesta_se_guarda_como_json(self):
+        self.almacen.reservar('k', 'h')
+        self.almacen.completar('k', {'transaction_id': 't1', 'fecha': timezone.now()})
+        estado, respuesta = self.almacen.reservar('k', 'h')
+        self.assertEqual(estado, COMPLETADO)
+        self.assertIsInstance(respuesta['fecha'], str)
+
+
+def solicitud(referencia='REF-1', monto=150000):
+    return PaymentRequest(
+        amount=monto, currency='COP', description='Pago de prueba',
+        customer_email='cliente@example.com', customer_name='Cliente Prueba',
+        customer_phone='3001234567', customer_document='12345678',
+        payment_method=PaymentMethod.PSE, reference=referencia,
+        return_url='https://example.com/retorno', confirmation_url='https://example.com/confirmacion',
+    )
+
+
+class CreatePaymentIdempotenteTest(TestCase):
+
+    def setUp(self):
+        self.pasarela = PaymentGatewayMockService(idempotency_store=MemoryIdempotencyStore(ttl=60))
+        self.pasarela.configurar_simulacion(PerfilCero(), semilla=1)
+
+    def test_reintento_devuelve_la_transaccion_original(self):
+        primera = self.pasarela.create_payment(solicitud())
+        repetida = self.pasarela.create_payment(solicitud())
+        self.assertNotIn('idempotent_replay', primera)
+        self.assertTrue(repetida['idempotent_replay'])
+        self.assertEqual(repetida['transaction']['transaction_id'], primera['transaction']['transaction_id'])
+        self.assertEqual(len(self.pasarela.transactions), 1)
+
+    def test_clave_explicita_distingue_pagos_con_la_misma_referencia(self):
+        primera = self.pasarela.create_payment(solicitud(), idempotency_key='a')
+        segunda = self.pasarela.create_payment(solicitud(), idempotency_key='b')
+        self.assertNotEqual(primera['transaction']['transaction_id'], segunda['transaction']['transaction_id'])
+
+    def test_misma_clave_con_otros_datos(self):
+        self.pasarela.create_payment(solicitud())
+        respuesta = self.pasarela.create_payment(solicitud(monto=999))
+        self.assertFalse(respuesta['success'])
+        self.assertEqual(respuesta['code'], 'IDEMPOTENCY_KEY_REUSED')
+
+    def test_error_libera_la_clave(self):
+        with mock.patch.object(self.pasarela, '_armar_pago', side_effect=RuntimeError('caída')):
+            with self.assertRaises(RuntimeError):
+                self.pasarela.create_payment(solicitud())
+        respuesta = self.pasarela.create_payment(solicitud())
+        self.assertNotIn('idempotent_replay', respuesta)
+        self.assertIn('transaction_id', respuesta['transaction'])
+
+    def test_solicitudes_concurrentes_crean_una_sola_transaccion(self):
+        armar_pago = self.pasarela._armar_pago
+
+        def armar_lento(payment_request):
+            time.sleep(0.1)  # los duplicados llegan mientras la primera está en curso
+            return armar_pago(payment_request)
+
+        respuestas = []
+        with mock.patch.object(self.pasarela, '_armar_pago', side_effect=armar_lento) as armar:
+            hilos = [
+                threading.Thread(target=lambda: respuestas.append(self.pasarela.create_payment(solicitud())))
+                for _ in range(5)
+            ]
+            for hilo in hilos:
+                hilo.start()
+            for hilo in hilos:
+                hilo.join()
+
+        self.assertEqual(armar.call_count, 1)
+        self.assertEqual(len({r['transaction']['transaction_id'] for r in respuestas}), 1)
+        self.assertEqual(sum(1 for r in respuestas if r.get('idempotent_replay')), 4)
+
+    def test_huella_ignora_el_orden_de_las_claves(self):
+        self.assertEqual(huella_solicitud({'a': 1, 'b': 2}), huella_solicitud({'b': 2, 'a': 1}))
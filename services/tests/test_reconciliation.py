@@ -0,0 +1,106 @@
+from datetime import date, datetime
+from decimal import Decimal
+from itertools import count
+
+from django.test import SimpleTestCase, TestCase
+
+from clientes.models import Cliente
+from services.payment_gateway_mock import PaymentMethod, PaymentResponse, PaymentStatus
+from services.reconciliation import (
+    FECHA_DISTINTA, MONTO_DISTINTO, PAGO_DUPLICADO, PAGO_REEMBOLSADO, PAGO_SIN_VENTA, REFERENCIA_DISTINTA,
+    VENTA_SIN_PAGO, cargar_transacciones, cargar_ventas, centavos, conciliar, referencia_cliente,
+)
+from socios.models import SocioComercial
+
+_ids = count(1)
+
+
+def pago(referencia, monto, fecha=date(2026, 3, 10), estado=PaymentStatus.APPROVED, gateway='PayU'):
+    creada = datetime.combine(fecha, datetime.min.time())
+    return gateway, PaymentResponse(
+        transaction_id=f'tx-{next(_ids)}', reference=referencia, status=estado, amount=monto, currency='COP',
+        payment_method=PaymentMethod.PSE, created_at=creada, updated_at=creada,
+    )
+
+
+class ConciliarTest(SimpleTestCase):
+
+    def test_pago_y_venta_coinciden(self):
+        resultado = conciliar([pago('CLI-1', 150000.0)], [(1, Decimal('150000.00'), date(2026, 3, 10))])
+        self.assertEqual(resultado.conciliados, 1)
+        self.assertEqual(resultado.discrepancias, [])
+        self.assertEqual((resultado.transacciones, resultado.ventas), (1, 1))
+
+    def test_fecha_dentro_de_la_tolerancia(self):
+        resultado = conciliar([pago('CLI-1', 100.0, fecha=date(2026, 3, 13))],
+                           [(1, Decimal('100'), date(2026, 3, 10))])
+        self.assertEqual(resultado.conciliados, 1)
+
+    def test_discrepancias_por_referencia(self):
+        resultado = conciliar(
+            [
+                pago('CLI-1', 99.0),
+                pago('CLI-2', 100.0, fecha=date(2026, 3, 20)),
+                pago('CLI-3', 100.0, estado=PaymentStatus.REFUNDED),
+                pago('CLI-4', 100.0),
+                pago('CLI-4', 100.0, gateway='Wompi'),
+            ],
+            [(cliente_id, Decimal('100'), date(2026, 3, 10)) for cliente_id in (1, 2, 3, 4)],
+        )
+        self.assertEqual(resultado.conciliados, 1)
+        self.assertEqual(
+            {(d.tipo, d.cliente_id) for d in resultado.discrepancias},
+            {(MONTO_DISTINTO, 1), (FECHA_DISTINTA, 2), (PAGO_REEMBOLSADO, 3), (PAGO_DUPLICADO, 4)},
+        )
+        duplicado = next(d for d in resultado.discrepancias if d.tipo == PAGO_DUPLICADO)
+        self.assertEqual(duplicado.gateway, 'Wompi')
+
+    def test_pagos_no_cobrados_no_cuentan(self):
+        resultado = conciliar(
+            [pago('CLI-1', 100.0, estado=PaymentStatus.REJECTED), pago('CLI-9', 5.0, estado=PaymentStatus.PENDING)],
+            [(1, Decimal('100'), date(2026, 3, 10))],
+        )
+        self.assertEqual(resultado.transacciones, 2)
+        self.assertEqual([d.tipo for d in resultado.discrepancias], [VENTA_SIN_PAGO])
+
+    def test_segunda_pasada_por_monto_y_fecha(self):
+        resultado = conciliar(
+            [pago('OTRA-REF', 250.5), pago('HUERFANO', 7.0)],
+            [(1, Decimal('250.50'), date(2026, 3, 10)), (2, Decimal('80'), date(2026, 3, 11))],
+        )
+        por_tipo = {d.tipo: d for d in resultado.discrepancias}
+        self.assertEqual(set(por_tipo), {REFERENCIA_DISTINTA, PAGO_SIN_VENTA, VENTA_SIN_PAGO})
+        self.assertEqual(por_tipo[REFERENCIA_DISTINTA].cliente_id, 1)
+        self.assertIsNone(por_tipo[PAGO_SIN_VENTA].cliente_id)
+        self.assertEqual(por_tipo[VENTA_SIN_PAGO].referencia, referencia_cliente(2))
+        self.assertEqual(resultado.resumen[VENTA_SIN_PAGO], 1)
+
+    def test_filas_para_exportar(self):
+        resultado = conciliar([], [(1, Decimal('10'), date(2026, 3, 10))])
+        fila = next(resultado.filas())
+        self.assertEqual(fila['tipo'], VENTA_SIN_PAGO)
+        self.assertEqual(fila['monto_venta'], 10.0)
+
+    def test_centavos(self):
+        self.assertEqual(centavos(Decimal('150000.10')), 15000010)
+        self.assertEqual(centavos(0.29), 29)
+
+
+class CargarDatosTest(TestCase):
+
+    def test_cargar_por_rango_de_fechas(self):
+        socio = SocioComercial.objects.create(nombre='Socio', fecha_ingreso=date(2025, 1, 1), ciudad_sede='Cali')
+        for i, fecha in enumerate([date(2026, 3, 1), date(2026, 3, 31), date(2026, 4, 1)]):
+            Cliente.objects.create(nombre=f'Cliente {i}', cedula=str(i), fecha_compra=fecha,
+                                   valor_compra=Decimal('100'), socio_comercial=socio)
+        ventas = list(cargar_ventas(date(2026, 3, 1), date(2026, 3, 31)))
+        self.assertEqual(sorted(fecha for _, _, fecha in ventas), [date(2026, 3, 1), date(2026, 3, 31)])
+
+        class Pasarela:
+            gateway_name = 'PayU'
+            transactions = {}
+
+        for _, transaccion in (pago('A', 1.0, fecha=date(2026, 3, 5)), pago('B', 1.0, fecha=date(2026, 4, 2))):
+            Pasarela.transactions[transaccion.transaction_id] = transaccion
+        cargadas = list(cargar_transacciones(date(2026, 3, 1), date(2026, 3, 31), servicios=[Pasarela]))
+        self.assertEqual([t.reference for _, t in cargadas], ['A'])
@@ -0,0 +1,129 @@
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from services.resilience import ABIERTO, CERRADO, SEMIABIERTO, CircuitBreaker, ServicioResiliente
+
+
+class ServicioFalso:
+    """Servicio externo con respuestas programadas"""
+
+    def __init__(self):
+        self.fallar = False
+        self.demora = 0
+        self.llamadas = 0
+        self.liberar = threading.Event()
+        self.liberar.set()
+
+    def consultar(self, valor):
+        self.llamadas += 1
+        self.liberar.wait()
+        time.sleep(self.demora)
+        if self.fallar:
+            raise ConnectionError('proveedor caído')
+        return {'success': True, 'valor': valor}
+
+    def rechazar(self):
+        return {'success': False, 'code': 'DECLINED'}
+
+
+class CircuitBreakerTest(SimpleTestCase):
+
+    def setUp(self):
+        self.ahora = 1000.0
+        parche = mock.patch('services.resilience.time.monotonic', side_effect=lambda: self.ahora)
+        parche.start()
+        self.addCleanup(parche.stop)
+        self.breaker = CircuitBreaker('prueba', umbral_fallas=3, tiempo_abierto=10)
+
+    def test_abre_tras_fallas_seguidas(self):
+        self.breaker.registrar_falla()
+        self.breaker.registrar_falla()
+        self.breaker.registrar_exito()
+        self.breaker.registrar_falla()
+        self.breaker.registrar_falla()
+        self.assertEqual(self.breaker.estado, CERRADO)
+        self.breaker.registrar_falla()
+        self.assertEqual(self.breaker.estado, ABIERTO)
+        self.assertFalse(self.breaker.permitir())
+
+    def test_semiabierto_deja_pasar_una_sola_prueba(self):
+        for _ in range(3):
+            self.breaker.registrar_falla()
+        self.ahora += 10
+        self.assertTrue(self.breaker.permitir())
+        self.assertEqual(self.breaker.estado, SEMIABIERTO)
+        self.assertFalse(self.breaker.permitir())
+        self.breaker.registrar_exito()
+        self.assertEqual(self.breaker.estado, CERRADO)
+        self.assertTrue(self.breaker.permitir())
+
+    def test_prueba_fallida_vuelve_a_abrir(self):
+        for _ in range(3):
+            self.breaker.registrar_falla()
+        self.ahora += 10
+        self.breaker.permitir()
+        self.breaker.registrar_falla()
+        self.assertEqual(self.breaker.estado, ABIERTO)
+        self.ahora += 9
+        self.assertFalse(self.breaker.permitir())
+
+    def test_cancelar_prueba(self):
+        for _ in range(3):
+            self.breaker.registrar_falla()
+        self.ahora += 10
+        self.breaker.permitir()
+        self.breaker.cancelar_prueba()
+        self.assertTrue(self.breaker.permitir())
+
+
+@override_settings(RESILIENCIA={})
+class ServicioResilienteTest(SimpleTestCase):
+
+    def setUp(self):
+        self.servicio = ServicioFalso()
+        self.resiliente = ServicioResiliente(self.servicio, 'prueba', deadline=1, umbral_fallas=2,
+                                             tiempo_abierto=60, max_concurrentes=1)
+        self.addCleanup(self.resiliente._executor.shutdown, wait=True)
+        self.addCleanup(self.servicio.liberar.set)
+
+    def test_llamada_exitosa(self):
+        self.assertEqual(self.resiliente.consultar(5), {'success': True, 'valor': 5})
+        self.assertEqual(self.resiliente.estado()['breaker'], CERRADO)
+
+    def test_rechazo_de_negocio_no_cuenta_como_falla(self):
+        for _ in range(3):
+            self.assertEqual(self.resiliente.rechazar()['code'], 'DECLINED')
+        self.assertEqual(self.resiliente.breaker.fallas, 0)
+
+    def test_excepciones_abren_el_circuito(self):
+        self.servicio.fallar = True
+        self.assertEqual(self.resiliente.consultar(1)['code'], 'SERVICE_ERROR')
+        self.assertEqual(self.resiliente.consultar(1)['code'], 'SERVICE_ERROR')
+        self.assertEqual(self.resiliente.consultar(1)['code'], 'CIRCUIT_OPEN')
+        self.assertEqual(self.servicio.llamadas, 2)
+
+    def test_deadline(self):
+        self.resiliente.deadline = 0.05
+        self.servicio.demora = 0.3
+        respuesta = self.resiliente.consultar(1)
+        self.assertEqual(respuesta['code'], 'DEADLINE_EXCEEDED')
+        self.assertEqual(self.resiliente.breaker.fallas, 1)
+
+    def test_bulkhead_rechaza_sin_llamar_al_proveedor(self):
+        self.servicio.liberar.clear()
+        hilo = threading.Thread(target=self.resiliente.consultar, args=(1,))
+        hilo.start()
+        while self.servicio.llamadas == 0:
+            time.sleep(0.01)
+        self.assertEqual(self.resiliente.consultar(2)['code'], 'BULKHEAD_FULL')
+        self.servicio.liberar.set()
+        hilo.join()
+        self.assertEqual(self.servicio.llamadas, 1)
+        self.assertEqual(self.resiliente.breaker.fallas, 0)
+
+    def test_atributos_privados_sin_envolver(self):
+        self.servicio._interno = lambda: 'directo'
+        self.assertEqual(self.resiliente._interno(), 'directo')
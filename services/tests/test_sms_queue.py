@@ -0,0 +1,161 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from services.models import EnvioSMS
+from services.sms_mock import SMSProvider
+from services.sms_queue import (
+    ProcesadorColaSMS, RECLAMO_VENCIDO, calcular_backoff, encolar_sms, encolar_sms_masivo, procesar_webhook_sms,
+)
+
+PROVEEDOR = SMSProvider.TWILIO.value
+
+
+class ProveedorFalso:
+    """Servicio SMS con respuestas programadas, sin latencia ni almacén"""
+
+    def __init__(self, respuestas=None, webhooks=None):
+        self.respuestas = list(respuestas or [])
+        self.webhooks = webhooks or {}
+        self.rate_limiter = mock.Mock()
+        self.enviados = []
+
+    def _numeros_unicos(self, numeros):
+        return list(dict.fromkeys(numeros))
+
+    def send_sms(self, sms_request, simular_entrega=True):
+        self.enviados.append(sms_request.to_number)
+        respuesta = self.respuestas.pop(0)
+        if isinstance(respuesta, Exception):
+            raise respuesta
+        return respuesta
+
+    def generar_webhook_entrega(self, message_id):
+        return self.webhooks.get(message_id)
+
+
+def exito(message_id):
+    return {'success': True, 'message_id': message_id, 'status': 'QUEUED'}
+
+
+def error(codigo, mensaje='Error del proveedor'):
+    return {'success': False, 'code': codigo, 'error': mensaje}
+
+
+class ColaSMSTest(TestCase):
+
+    def setUp(self):
+        self.procesador = ProcesadorColaSMS(lote=10, max_workers=2)
+
+    def usar_proveedor(self, proveedor):
+        parche = mock.patch.dict('services.sms_queue.sms_services', {PROVEEDOR: proveedor})
+        parche.start()
+        self.addCleanup(parche.stop)
+        return proveedor
+
+    def test_encolar_masivo_sin_repetidos(self):
+        self.usar_proveedor(ProveedorFalso())
+        self.assertEqual(encolar_sms_masivo(['3001', '3002', '3001'], 'Hola', PROVEEDOR), 2)
+        self.assertEqual(EnvioSMS.objects.filter(estado='pendiente').count(), 2)
+
+    def test_reclamar_no_repite_filas(self):
+        for numero in ('3001', '3002', '3003'):
+            encolar_sms(numero, 'Hola', PROVEEDOR)
+        reclamados = self.procesador.reclamar()
+        self.assertEqual(len(reclamados), 3)
+        self.assertTrue(all(envio.estado == 'enviando' and envio.lote for envio in reclamados))
+        self.assertEqual(self.procesador.reclamar(), [])
+
+    def test_reclamar_respeta_proximo_intento(self):
+        envio = encolar_sms('3001', 'Hola', PROVEEDOR)
+        EnvioSMS.objects.filter(pk=envio.pk).update(proximo_intento=timezone.now() + timedelta(minutes=5))
+        self.assertEqual(self.procesador.reclamar(), [])
+
+    def test_liberar_reclamos_vencidos(self):
+        envio = encolar_sms('3001', 'Hola', PROVEEDOR)
+        self.procesador.reclamar()
+        EnvioSMS.objects.filter(pk=envio.pk).update(reclamado_en=timezone.now() - RECLAMO_VENCIDO - timedelta(seconds=1))
+        self.assertEqual(self.procesador.liberar_reclamos_vencidos(), 1)
+        envio.refresh_from_db()
+        self.assertEqual((envio.estado, envio.lote, envio.reclamado_en), ('pendiente', '', None))
+
+    def test_envio_exitoso_queda_esperando_confirmacion(self):
+        self.usar_proveedor(ProveedorFalso([exito('m1')]))
+        envio = encolar_sms('3001', 'Hola', PROVEEDOR)
+        resumen = self.procesador.enviar(self.procesador.reclamar())
+        self.assertEqual(resumen, {'enviados': 1, 'reintentos': 0, 'fallidos': 0})
+        envio.refresh_from_db()
+        self.assertEqual((envio.estado, envio.message_id, envio.intentos), ('enviado', 'm1', 1))
+        self.assertIsNotNone(envio.proximo_intento)
+
+    def test_error_permanente_no_se_reintenta(self):
+        self.usar_proveedor(ProveedorFalso([error('LANDLINE_NOT_SUPPORTED')]))
+        envio = encolar_sms('6011', 'Hola', PROVEEDOR)
+        self.procesador.enviar(self.procesador.reclamar())
+        envio.refresh_from_db()
+        self.assertEqual(envio.estado, 'fallido')
+        self.assertIsNone(envio.proximo_intento)
+
+    @override_settings(SMS_QUEUE_MAX_INTENTOS=2, SMS_QUEUE_BACKOFF=30)
+    def test_error_transitorio_con_backoff_hasta_el_maximo(self):
+        proveedor = self.usar_proveedor(ProveedorFalso([error('DELIVERY_FAILED'), TimeoutError('sin respuesta')]))
+        envio = encolar_sms('3001', 'Hola', PROVEEDOR)
+
+        antes = timezone.now()
+        self.assertEqual(self.procesador.enviar(self.procesador.reclamar())['reintentos'], 1)
+        envio.refresh_from_db()
+        self.assertEqual((envio.estado, envio.intentos), ('pendiente', 1))
+        self.assertGreaterEqual(envio.proximo_intento, antes + timedelta(seconds=15))
+
+        EnvioSMS.objects.filter(pk=envio.pk).update(proximo_intento=timezone.now())
+        self.assertEqual(self.procesador.enviar(self.procesador.reclamar())['fallidos'], 1)
+        envio.refresh_from_db()
+        self.assertEqual((envio.estado, envio.intentos), ('fallido', 2))
+        self.assertIn('TimeoutError', envio.ultimo_error)
+        self.assertEqual(proveedor.enviados, ['3001', '3001'])
+
+    def test_webhook_entregado(self):
+        envio = EnvioSMS.objects.create(to_number='3001', message='Hola', proveedor=PROVEEDOR, estado='enviado',
+                                        message_id='m1', intentos=1, proximo_intento=timezone.now())
+        procesar_webhook_sms({'message_id': 'm1', 'status': 'DELIVERED'})
+        envio.refresh_from_db()
+        self.assertEqual(envio.estado, 'entregado')
+        self.assertIsNone(envio.proximo_intento)
+        # Un webhook repetido no cambia un envío ya entregado
+        self.assertIsNone(procesar_webhook_sms({'message_id': 'm1', 'status': 'UNDELIVERED'}))
+
+    def test_confirmar(self):
+        self.usar_proveedor(ProveedorFalso(webhooks={
+            'm1': {'message_id': 'm1', 'status': 'DELIVERED'},
+            'm2': {'message_id': 'm2', 'status': 'UNDELIVERED', 'error_message': 'Número bloqueado'},
+        }))
+        ahora = timezone.now()
+        for message_id in ('m1', 'm2', 'desconocido'):
+            EnvioSMS.objects.create(to_number='3001', message='Hola', proveedor=PROVEEDOR, estado='enviado',
+                                    message_id=message_id, intentos=1, proximo_intento=ahora)
+
+        resumen = self.procesador.confirmar()
+        self.assertEqual(resumen, {'entregados': 1, 'no_entregados': 1, 'sin_confirmacion': 1})
+        estados = dict(EnvioSMS.objects.values_list('message_id', 'estado'))
+        self.assertEqual(estados, {'m1': 'entregado', 'm2': 'pendiente', 'desconocido': 'pendiente'})
+        # Sin confirmación el envío vuelve a la cola en lugar de quedar en 'enviado' para siempre
+        self.assertIsNotNone(EnvioSMS.objects.get(message_id='desconocido').proximo_intento)
+
+    @override_settings(SMS_QUEUE_MAX_INTENTOS=1)
+    def test_sin_confirmacion_en_el_ultimo_intento_falla(self):
+        self.usar_proveedor(ProveedorFalso())
+        envio = EnvioSMS.objects.create(to_number='3001', message='Hola', proveedor=PROVEEDOR, estado='enviado',
+                                        message_id='perdido', intentos=1, proximo_intento=timezone.now())
+        self.procesador.confirmar()
+        envio.refresh_from_db()
+        self.assertEqual(envio.estado, 'fallido')
+        self.assertEqual(envio.ultimo_error, 'Sin confirmación del proveedor')
+
+    @override_settings(SMS_QUEUE_BACKOFF=30, SMS_QUEUE_BACKOFF_MAX=300)
+    def test_calcular_backoff(self):
+        for intentos, maximo in ((1, 30), (2, 60), (3, 120), (10, 300)):
+            espera = calcular_backoff(intentos).total_seconds()
+            self.assertGreaterEqual(espera, maximo / 2)
+            self.assertLessEqual(espera, maximo)
@@ -0,0 +1,196 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from clientes.models import Cliente, VentaDiaria
+from services import ventas_diarias
+from socios.models import SocioComercial
+
+
+class VentasDiariasTest(TestCase):
+    """VentaDiaria debe coincidir siempre con el GROUP BY de Cliente"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.socio = SocioComercial.objects.create(nombre='Socio A', fecha_ingreso=date(2025, 1, 1),
+                                                  ciudad_sede='Bogotá')
+        cls.otro = SocioComercial.objects.create(nombre='Socio B', fecha_ingreso=date(2025, 1, 1),
+                                                 ciudad_sede='Cali')
+
+    def crear(self, cedula, fecha=date(2026, 1, 5), valor='100.50', socio=None, ciudad='Pasto'):
+        return Cliente.objects.create(nombre=f'Cliente {cedula}', cedula=cedula, fecha_compra=fecha,
+                                      valor_compra=Decimal(valor), socio_comercial=socio or self.socio,
+                                      ciudad=ciudad)
+
+    def assertAgregadoConsistente(self):
+        esperado = {
+            (fila['fecha_compra'], fila['socio_comercial'], fila['ciudad']): (fila['cantidad'], fila['total'])
+            for fila in Cliente.objects.values('fecha_compra', 'socio_comercial', 'ciudad')
+            .annotate(cantidad=Count('id'), total=Sum('valor_compra')).order_by()
+        }
+        real = {
+            (venta.fecha, venta.socio_comercial_id, venta.ciudad): (venta.cantidad, venta.total)
+            for venta in VentaDiaria.objects.all()
+        }
+        self.assertEqual(real, esperado)
+
+    def test_crear_suma_a_la_misma_fila(self):
+        self.crear('1')
+        self.crear('2', valor='200')
+        self.assertAgregadoConsistente()
+        venta = VentaDiaria.objects.get()
+        self.assertEqual((venta.cantidad, venta.total), (2, Decimal('300.50')))
+
+    def test_editar_y_mover_entre_filas(self):
+        cliente = self.crear('1')
+        self.crear('2')
+        cliente.valor_compra = Decimal('50')
+        cliente.save()
+        self.assertAgregadoConsistente()
+
+        cliente.fecha_compra = date(2025, 12, 31)
+        cliente.ciudad = 'Cali'
+        cliente.socio_comercial = self.otro
+        cliente.save()
+        self.assertAgregadoConsistente()
+        self.assertEqual(VentaDiaria.objects.count(), 2)
+
+    def test_borrar_elimina_la_fila_en_cero(self):
+        cliente = self.crear('1')
+        self.crear('2', ciudad='Cali')
+        cliente.delete()
+        self.assertAgregadoConsistente()
+        self.assertFalse(VentaDiaria.objects.filter(ciudad='Pasto').exists())
+
+    def test_borrar_socio_no_deja_filas(self):
+        self.crear('1', socio=self.otro)
+        self.crear('2')
+        self.otro.delete()
+        self.assertAgregadoConsistente()
+
+    def test_registrar_lote(self):
+        clientes = Cliente.objects.bulk_create([
+            Cliente(nombre=f'Cliente {i}', cedula=str(i), fecha_compra=date(2026, 2, 1 + i % 3),
+                    valor_compra=Decimal('10'), socio_comercial=self.socio, ciudad='Pasto')
+            for i in range(9)
+        ])
+        ventas_diarias.registrar_lote(clientes)
+        self.assertAgregadoConsistente()
+
+        anteriores = list(Cliente.objects.filter(pk__in=[c.pk for c in clientes[:3]]))
+        for cliente in clientes[:3]:
+            cliente.valor_compra = Decimal('25')
+            cliente.ciudad = 'Cali'
+        Cliente.objects.bulk_update(clientes[:3], ['valor_compra', 'ciudad'])
+        ventas_diarias.registrar_lote(clientes[:3], anteriores)
+        self.assertAgregadoConsistente()
+
+    def test_reconstruir_un_rango(self):
+        self.crear('1', fecha=date(2026, 1, 5))
+        self.crear('2', fecha=date(2026, 3, 5))
+        VentaDiaria.objects.update(total=Decimal('1'))
+        self.assertEqual(ventas_diarias.reconstruir(desde=date(2026, 3, 1)), 1)
+        self.assertEqual(VentaDiaria.objects.get(fecha=date(2026, 3, 5)).total, Decimal('100.50'))
+        self.assertEqual(VentaDiaria.objects.get(fecha=date(2026, 1, 5)).total, Decimal('1'))
+        ventas_diarias.reconstruir()
+        self.assertAgregadoConsistente()
+
+    @override_settings(API_TOKENS=['token'])
+    def test_api_en_lote(self):
+        cabeceras = {'content_type': 'application/json', 'HTTP_AUTHORIZATION': 'Bearer token'}
+        url = reverse('api:lista', args=['clientes'])
+        respuesta = self.client.post(url, json.dumps([
+            {'nombre': f'Cliente {i}', 'cedula': f'8{i}', 'fecha_compra': f'2026-03-0{i + 1}',
+             'valor_compra': '10', 'socio_comercial': self.socio.pk, 'ciudad': 'Pasto'}
+            for i in range(3)
+        ]), **cabeceras)
+        self.assertEqual(respuesta.status_code, 201, respuesta.content)
+        self.assertAgregadoConsistente()
+
+        ids = [fila['id'] for fila in respuesta.json()['results']]
+        respuesta = self.client.patch(url, json.dumps([
+            {'id': ids[0], 'valor_compra': '30'},
+            {'id': ids[1], 'fecha_compra': '2026-03-01'},
+            {'id': ids[1], 'ciudad': 'Cali'},
+        ]), **cabeceras)
+        self.assertEqual(respuesta.status_code, 200, respuesta.content)
+        self.assertAgregadoConsistente()
+
+        self.client.delete(reverse('api:detalle', args=['clientes', ids[2]]), **cabeceras)
+        self.assertAgregadoConsistente()
+
+
+class SerieVentasTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = User.objects.create_user('usuario', password='clave')
+        cls.socio = SocioComercial.objects.create(nombre='Socio A', fecha_ingreso=date(2025, 1, 1),
+                                                  ciudad_sede='Bogotá')
+        for i, (fecha, ciudad) in enumerate([
+            (date(2026, 1, 5), 'Pasto'), (date(2026, 1, 7), 'Cali'), (date(2026, 1, 20), 'Pasto'),
+            (date(2026, 3, 2), 'Pasto'),
+        ]):
+            Cliente.objects.create(nombre=f'Cliente {i}', cedula=str(i), fecha_compra=fecha,
+                                   valor_compra=Decimal('100'), socio_comercial=cls.socio, ciudad=ciudad)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.usuario)
+        self.url = reverse('dashboard:serie_ventas')
+
+    def test_dias_sin_ventas_en_cero(self):
+        puntos = ventas_diarias.serie('dia', date(2026, 1, 4), date(2026, 1, 8))
+        self.assertEqual([p['cantidad'] for p in puntos], [0, 1, 0, 1, 0])
+        self.assertEqual(puntos[0]['total'], Decimal(0))
+
+    def test_semanas_desde_el_lunes(self):
+        puntos = ventas_diarias.serie('semana', date(2026, 1, 7), date(2026, 1, 25))
+        self.assertEqual([p['periodo'] for p in puntos], [date(2026, 1, 5), date(2026, 1, 12), date(2026, 1, 19)])
+        self.assertEqual([p['cantidad'] for p in puntos], [2, 0, 1])
+
+    def test_meses(self):
+        puntos = ventas_diarias.serie('mes', date(2026, 1, 15), date(2026, 3, 31))
+        self.assertEqual([p['periodo'] for p in puntos], [date(2026, 1, 1), date(2026, 2, 1), date(2026, 3, 1)])
+        self.assertEqual([p['total'] for p in puntos], [Decimal('300'), Decimal(0), Decimal('100')])
+
+    def test_filtro_por_ciudad(self):
+        puntos = ventas_diarias.serie('mes', date(2026, 1, 1), date(2026, 1, 31), ciudad='cali')
+        self.assertEqual(puntos[0]['cantidad'], 1)
+
+    def test_endpoint(self):
+        respuesta = self.client.get(self.url, {'granularidad': 'mes', 'desde': '2026-01-01', 'hasta': '2026-03-31'})
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual(datos['desde'], '2026-01-01')
+        self.assertEqual([p['cantidad'] for p in datos['periodos']], [3, 0, 1])
+
+    def test_rango_limitado_a_max_puntos(self):
+        respuesta = self.client.get(self.url, {'desde': '2000-01-01', 'hasta': '2026-03-31'})
+        self.assertEqual(len(respuesta.json()['periodos']), ventas_diarias.MAX_PUNTOS)
+
+    def test_parametros_invalidos(self):
+        for params in ({'granularidad': 'año'}, {'desde': 'x'}, {'socio': 'x'},
+                       {'desde': '2026-02-01', 'hasta': '2026-01-01'}):
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
+
+    def test_fechas_en_los_extremos_del_calendario(self):
+        casos = [
+            ({'hasta': '0001-02-01'}, 200),
+            ({'granularidad': 'mes', 'hasta': '9999-12-15'}, 200),
+            ({'granularidad': 'semana', 'desde': '9999-12-01', 'hasta': '9999-12-31'}, 200),
+            ({'granularidad': 'mes', 'hasta': '0001-03-01'}, 200),
+            ({'granularidad': 'mes', 'desde': '10000-01-01'}, 400),
+        ]
+        for params, codigo in casos:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, codigo)
+        puntos = self.client.get(self.url, {'granularidad': 'mes', 'hasta': '9999-12-15'}).json()['periodos']
+        self.assertEqual(puntos[-1]['periodo'], '9999-12-01')
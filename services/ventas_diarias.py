@@ -0,0 +1,212 @@
+"""
+Agregado diario de ventas (VentaDiaria) para las gráficas de tendencia
+
+Cada Cliente suma su compra a la fila (fecha_compra, socio_comercial, ciudad).
+Al crear, editar o borrar un Cliente se aplica solo la diferencia con un UPDATE
+... SET cantidad = cantidad + n, total = total + valor; la fila se crea la
+primera vez que recibe una venta y se borra cuando queda en cero.
+
+bulk_create/bulk_update no emiten señales: quien los use debe llamar a
+registrar_lote() (como hace la API) o reconstruir el rango con
+reconstruir() / el comando reconstruir_ventas_diarias.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+
+from clientes.models import Cliente, VentaDiaria
+
+# Clave del agregado: (fecha, socio_comercial_id, ciudad)
+Clave = Tuple[date, int, str]
+
+GRANULARIDADES = ('dia', 'semana', 'mes')
+
+# Periodos que se devuelven cuando no se indica 'desde'
+PERIODOS_POR_DEFECTO = {'dia': 30, 'semana': 12, 'mes': 12}
+
+# Límite de puntos de una serie, para no recorrer años día por día
+MAX_PUNTOS = 400
+
+
+def venta(cliente) -> Optional[Tuple[Clave, Decimal]]:
+    """(clave, valor) con el que el cliente cuenta en el agregado, o None si no cuenta"""
+    if not cliente.fecha_compra or not cliente.socio_comercial_id or cliente.valor_compra is None:
+        return None
+    return (cliente.fecha_compra, cliente.socio_comercial_id, cliente.ciudad or ''), Decimal(str(cliente.valor_compra))
+
+
+def diferencias(anteriores: Iterable, nuevos: Iterable) -> Dict[Clave, List]:
+    """{clave: [cantidad, total]} que hay que sumar para pasar de unas ventas a otras"""
+    deltas = defaultdict(lambda: [0, Decimal(0)])
+    for signo, ventas in ((-1, anteriores), (1, nuevos)):
+        for item in ventas:
+            if item is None:
+                continue
+            clave, valor = item
+            deltas[clave][0] += signo
+            deltas[clave][1] += signo * valor
+    return {clave: delta for clave, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def aplicar(deltas: Dict[Clave, List]):
+    """Suma las diferencias a VentaDiaria, una fila (un UPDATE) por clave"""
+    for (fecha, socio_id, ciudad), (cantidad, total) in deltas.items():
+        existente = VentaDiaria.objects.filter(fecha=fecha, socio_comercial_id=socio_id, ciudad=ciudad)
+        filas = existente
+        if cantidad < 0:
+            # cantidad es positiva en la base de datos: nunca restar más de lo que hay
+            filas = existente.filter(cantidad__gte=-cantidad)
+        actualizadas = filas.update(cantidad=F('cantidad') + cantidad, total=F('total') + total)
+        if not actualizadas:
+            if cantidad > 0:
+                _crear(fecha, socio_id, ciudad, cantidad, total)
+            # Sin fila no hay nada que restar (p. ej. el socio se está borrando)
+            continue
+        if cantidad < 0:
+            existente.filter(cantidad=0).delete()
+
+
+def _crear(fecha, socio_id, ciudad, cantidad, total):
+    try:
+        with transaction.atomic():
+            VentaDiaria.objects.create(fecha=fecha, socio_comercial_id=socio_id, ciudad=ciudad,
+                                       cantidad=cantidad, total=total)
+    except IntegrityError:
+        # Otro proceso creó la fila al tiempo
+        VentaDiaria.objects.filter(fecha=fecha, socio_comercial_id=socio_id, ciudad=ciudad).update(
+            cantidad=F('cantidad') + cantidad, total=F('total') + total
+        )
+
+
+def registrar_lote(nuevos: Iterable, anteriores: Iterable = ()):
+    """Aplica las ventas de los objetos de un bulk_create/bulk_update (y las que reemplazan)"""
+    aplicar(diferencias([venta(c) for c in anteriores], [venta(c) for c in nuevos]))
+
+
+def venta_guardada_receiver(sender, instance, **kwargs):
+    """pre_save: la venta con la que el cliente cuenta hoy en la base de datos"""
+    instance._venta_guardada = None
+    if instance.pk is not None:
+        anterior = Cliente.objects.filter(pk=instance.pk).only(
+            'fecha_compra', 'socio_comercial', 'ciudad', 'valor_compra'
+        ).first()
+        instance._venta_guardada = venta(anterior) if anterior else None
+
+
+def cliente_guardado_receiver(sender, instance, **kwargs):
+    """post_save: reemplaza la venta anterior por la actual"""
+    anterior = getattr(instance, '_venta_guardada', None)
+    instance._venta_guardada = None
+    aplicar(diferencias([anterior], [venta(instance)]))
+
+
+def cliente_borrado_receiver(sender, instance, **kwargs):
+    aplicar(diferencias([venta(instance)], []))
+
+
+def reconstruir(desde: Optional[date] = None, hasta: Optional[date] = None) -> int:
+    """
+    Vuelve a calcular VentaDiaria desde Cliente en el rango de fechas (todo si
+    no se indica). Devuelve las filas escritas
+    """
+    clientes = Cliente.objects.all()
+    existentes = VentaDiaria.objects.all()
+    if desde:
+        clientes = clientes.filter(fecha_compra__gte=desde)
+        existentes = existentes.filter(fecha__gte=desde)
+    if hasta:
+        clientes = clientes.filter(fecha_compra__lte=hasta)
+        existentes = existentes.filter(fecha__lte=hasta)
+
+    filas = (
+        clientes.values('fecha_compra', 'socio_comercial', 'ciudad')
+        .annotate(cantidad=Count('id'), total=Sum('valor_compra'))
+        .order_by()
+    )
+    with transaction.atomic():
+        existentes.delete()
+        creadas = VentaDiaria.objects.bulk_create(
+            [VentaDiaria(fecha=fila['fecha_compra'], socio_comercial_id=fila['socio_comercial'],
+                         ciudad=fila['ciudad'], cantidad=fila['cantidad'], total=fila['total'])
+             for fila in filas.iterator()],
+            batch_size=1000,
+        )
+    return len(creadas)
+
+
+def inicio_periodo(fecha: date, granularidad: str) -> date:
+    if granularidad == 'semana':
+        return fecha - timedelta(days=fecha.weekday())
+    if granularidad == 'mes':
+        return fecha.replace(day=1)
+    return fecha
+
+
+def siguiente_periodo(fecha: date, granularidad: str) -> date:
+    if granularidad == 'semana':
+        return fecha + timedelta(weeks=1)
+    if granularidad == 'mes':
+        return (fecha.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return fecha + timedelta(days=1)
+
+
+def rango_por_defecto(granularidad: str, hasta: date) -> date:
+    """Inicio de los últimos PERIODOS_POR_DEFECTO periodos hasta `hasta` (incluido)"""
+    inicio = inicio_periodo(hasta, granularidad)
+    for _ in range(PERIODOS_POR_DEFECTO[granularidad] - 1):
+        if inicio == date.min:
+            break
+        inicio = inicio_periodo(inicio - timedelta(days=1), granularidad)
+    return inicio
+
+
+def serie(granularidad: str, desde: date, hasta: date, socio=None, ciudad: Optional[str] = None) -> List[Dict]:
+    """
+    Ventas por día, semana (desde el lunes) o mes entre dos fechas, con los
+    periodos sin ventas en cero
+
+    Args:
+        granularidad: 'dia', 'semana' o 'mes'
+        desde, hasta: Rango de fechas (se extiende al inicio del periodo de `desde`)
+        socio: Limitar a un socio comercial
+        ciudad: Limitar a una ciudad (sin distinguir mayúsculas)
+
+    Returns:
+        [{'periodo': date, 'cantidad': int, 'total': Decimal}] en orden
+    """
+    if granularidad not in GRANULARIDADES:
+        raise ValueError(f'Granularidad inválida: {granularidad}')
+    desde = inicio_periodo(desde, granularidad)
+
+    ventas = VentaDiaria.objects.filter(fecha__gte=desde, fecha__lte=hasta)
+    if socio:
+        ventas = ventas.filter(socio_comercial=socio)
+    if ciudad:
+        ventas = ventas.filter(ciudad__iexact=ciudad)
+    periodo = {'dia': F('fecha'), 'semana': TruncWeek('fecha'), 'mes': TruncMonth('fecha')}[granularidad]
+    totales = {
+        fila['periodo']: fila
+        for fila in ventas.values(periodo=periodo)
+        .annotate(cantidad=Sum('cantidad'), total=Sum('total'))
+        .order_by()
+    }
+
+    puntos = []
+    actual = desde
+    while actual <= hasta:
+        fila = totales.get(actual)
+        puntos.append({
+            'periodo': actual,
+            'cantidad': fila['cantidad'] if fila else 0,
+            'total': fila['total'] if fila else Decimal(0),
+        })
+        try:
+            actual = siguiente_periodo(actual, granularidad)
+        except OverflowError:
+            break  # último periodo representable (año 9999)
+    return puntos
@@ -3,7 +3,9 @@ from .models import SocioComercial
 
 @admin.register(SocioComercial)
 class SocioComercialAdmin(admin.ModelAdmin):
-    list_display = ['nombre', 'ciudad_sede', 'fecha_ingreso', 'activo', 'fecha_creacion']
-    list_filter = ['activo', 'ciudad_sede', 'fecha_ingreso']
+    list_display = ['nombre', 'ciudad_sede', 'asesor', 'fecha_ingreso', 'activo', 'fecha_creacion']
+    list_filter = ['activo', 'ciudad_sede', 'fecha_ingreso', 'asesor']
+    list_select_related = ['asesor']
+    autocomplete_fields = ['asesor']
     search_fields = ['nombre', 'ciudad_sede']
     readonly_fields = ['fecha_creacion', 'fecha_actualizacion']
@@ -1,13 +1,49 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.urls import reverse
 from .models import SocioComercial
+from asesores.models import Asesor
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Row, Column, Submit, Field
 from crispy_forms.bootstrap import FormActions
 
+class SocioAutocompletarWidget(forms.Widget):
+    """
+    Campo de búsqueda de socios comerciales contra socios:autocompletar. Solo
+    consulta el socio seleccionado (para mostrar su nombre), no la lista completa;
+    la validación sigue a cargo del queryset del ModelChoiceField.
+    """
+    template_name = 'socios/widgets/autocompletar.html'
+
+    class Media:
+        js = ['js/autocompletar_socio.js']
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget'].update({
+            'etiqueta': self.etiqueta(value),
+            'url': reverse('socios:autocompletar'),
+        })
+        return context
+
+    def etiqueta(self, value):
+        """Nombre del socio elegido, o '' si el valor enviado no es un socio válido"""
+        if value in (None, ''):
+            return ''
+        # El ModelChoiceField le pasa sus opciones al widget: mismo queryset que la validación
+        choices = getattr(self, 'choices', None)
+        socios = getattr(choices, 'queryset', SocioComercial.objects.all())
+        try:
+            return socios.filter(pk=value).values_list('nombre', flat=True).first() or ''
+        except (ValueError, TypeError, ValidationError):
+            return ''
+
+
 class SocioComercialForm(forms.ModelForm):
     class Meta:
         model = SocioComercial
-        fields = ['nombre', 'fecha_ingreso', 'ciudad_sede', 'asesor_asignado', 'documento_contrato',
+        fields = ['nombre', 'fecha_ingreso', 'ciudad_sede', 'asesor', 'documento_contrato',
                  'activo', 'telefono', 'email']
         widgets = {
             'fecha_ingreso': forms.DateInput(attrs={'type': 'date'}),
@@ -27,6 +63,9 @@ class SocioComercialForm(forms.ModelForm):
                 'fecha_ingreso': self.instance.fecha_ingreso,
             })
         
+        # Solo asesores activos (y el actual, aunque ya no lo esté)
+        self.fields['asesor'].queryset = Asesor.objects.filter(Q(activo=True) | Q(pk=self.instance.asesor_id))
+        
         self.helper = FormHelper()
         self.helper.layout = Layout(
             Row(
@@ -40,7 +79,7 @@ class SocioComercialForm(forms.ModelForm):
                 css_class='form-row'
             ),
             Row(
-                Column('asesor_asignado', css_class='form-group col-md-4 mb-0'),
+                Column('asesor', css_class='form-group col-md-4 mb-0'),
                 Column('telefono', css_class='form-group col-md-4 mb-0'),
                 Column('email', css_class='form-group col-md-4 mb-0'),
                 css_class='form-row'
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:06
+
+import unicodedata
+
+from django.db import migrations, models
+
+
+def normalizar_nombre(texto):
+    """
+    Copia fija de socios.models.normalizar_nombre al crear la migración:
+    minúsculas, sin tildes y con un solo espacio entre palabras
+    """
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_tildes.lower().split())
+
+
+def llenar_nombre_normalizado(apps, schema_editor):
+    SocioComercial = apps.get_model('socios', 'SocioComercial')
+    socios = list(SocioComercial.objects.only('pk', 'nombre'))
+    for socio in socios:
+        socio.nombre_normalizado = normalizar_nombre(socio.nombre)
+    SocioComercial.objects.bulk_update(socios, ['nombre_normalizado'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('socios', '0002_add_asesor_asignado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sociocomercial',
+            name='nombre_normalizado',
+            field=models.CharField(default='', editable=False, max_length=200),
+        ),
+        migrations.RunPython(llenar_nombre_normalizado, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='sociocomercial',
+            index=models.Index(fields=['activo', 'nombre_normalizado'], name='socio_activo_nombre_norm'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asesores', '0001_initial'),
+        ('socios', '0003_nombre_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sociocomercial',
+            name='asesor',
+            field=models.ForeignKey(blank=True, help_text='Asesor que atendió este socio comercial', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='socios', to='asesores.asesor', verbose_name='Asesor Asignado'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:13
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('asesores', '0002_migrar_asesores'),
+        ('socios', '0004_sociocomercial_asesor'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='sociocomercial',
+            name='asesor_asignado',
+        ),
+    ]
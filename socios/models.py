@@ -1,9 +1,20 @@
+import unicodedata
+
 from django.db import models
 from django.core.validators import FileExtensionValidator
 from django.urls import reverse
 
+
+def normalizar_nombre(texto):
+    """Minúsculas, sin tildes y con un solo espacio entre palabras ('  Ferretería  José' -> 'ferreteria jose')"""
+    sin_tildes = unicodedata.normalize('NFKD', texto or '').encode('ascii', 'ignore').decode('ascii')
+    return ' '.join(sin_tildes.lower().split())
+
+
 class SocioComercial(models.Model):
     nombre = models.CharField(max_length=200, verbose_name="Nombre del Socio")
+    # Copia normalizada de `nombre` para la búsqueda por prefijo (autocompletar)
+    nombre_normalizado = models.CharField(max_length=200, editable=False, default='')
     fecha_ingreso = models.DateField(verbose_name="Fecha de Ingreso al Convenio")
     ciudad_sede = models.CharField(max_length=100, verbose_name="Ciudad de la Sede")
     documento_contrato = models.FileField(
@@ -14,11 +25,14 @@ class SocioComercial(models.Model):
         null=True
     )
     activo = models.BooleanField(default=True, verbose_name="Activo")
-    asesor_asignado = models.CharField(
-        max_length=200, 
-        verbose_name="Asesor Asignado", 
+    asesor = models.ForeignKey(
+        'asesores.Asesor',
+        on_delete=models.SET_NULL,
+        null=True,
         blank=True,
-        help_text="Nombre del asesor que atendió este socio comercial"
+        related_name='socios',
+        verbose_name="Asesor Asignado",
+        help_text="Asesor que atendió este socio comercial"
     )
     telefono = models.CharField(max_length=20, verbose_name="Teléfono", blank=True)
     email = models.EmailField(verbose_name="Email", blank=True)
@@ -29,6 +43,9 @@ class SocioComercial(models.Model):
         verbose_name = "Socio Comercial"
         verbose_name_plural = "Socios Comerciales"
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(fields=['activo', 'nombre_normalizado'], name='socio_activo_nombre_norm'),
+        ]
     
     def __str__(self):
         return self.nombre
@@ -58,4 +75,8 @@ class SocioComercial(models.Model):
             except SocioComercial.DoesNotExist:
                 pass
         
+        self.nombre_normalizado = normalizar_nombre(self.nombre)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nombre' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nombre_normalizado'}
         super().save(*args, **kwargs)
@@ -10,4 +10,5 @@ urlpatterns = [
     path('<int:pk>/editar/', views.SocioComercialUpdateView.as_view(), name='editar'),
     path('<int:pk>/eliminar/', views.SocioComercialDeleteView.as_view(), name='eliminar'),
     path('<int:pk>/contrato/', views.ver_contrato, name='ver_contrato'),
+    path('autocompletar/', views.autocompletar_socios, name='autocompletar'),
 ]
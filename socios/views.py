@@ -4,24 +4,30 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, JsonResponse
+from django.core.cache import cache
 from django.conf import settings
-from .models import SocioComercial
+from .models import SocioComercial, normalizar_nombre
 from .forms import SocioComercialForm
 from django.db.models import Q, Sum, Count
 from django.utils import timezone
 from clientes.models import Cliente
+from asesores.models import Asesor
+from services.conditional import ConditionalGetMixin, obtener_version
+import hashlib
 import os
 import mimetypes
 
-class SocioComercialListView(LoginRequiredMixin, ListView):
+class SocioComercialListView(LoginRequiredMixin, ConditionalGetMixin, ListView):
     model = SocioComercial
     template_name = 'socios/lista.html'
     context_object_name = 'socios'
     paginate_by = 20
+    etag_models = [SocioComercial, Cliente, Asesor]
+    etag_diario = True
     
     def get_queryset(self):
-        queryset = SocioComercial.objects.annotate(
+        queryset = SocioComercial.objects.select_related('asesor').annotate(
             total_ventas=Sum('clientes__valor_compra'),
             cantidad_ventas=Count('clientes')
         ).order_by('-fecha_creacion')
@@ -88,10 +94,11 @@ class SocioComercialCreateView(LoginRequiredMixin, CreateView):
         messages.success(self.request, 'Socio comercial creado exitosamente.')
         return super().form_valid(form)
 
-class SocioComercialDetailView(LoginRequiredMixin, DetailView):
+class SocioComercialDetailView(LoginRequiredMixin, ConditionalGetMixin, DetailView):
     model = SocioComercial
     template_name = 'socios/detalle.html'
     context_object_name = 'socio'
+    etag_models = [SocioComercial, Cliente, Asesor]
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -157,3 +164,45 @@ def ver_contrato(request, pk):
         response['Expires'] = '0'
         
         return response
+
+
+# Resultados por página del autocompletar de socios
+AUTOCOMPLETAR_POR_PAGINA = 20
+AUTOCOMPLETAR_CACHE_KEY = 'socios:autocompletar:{version}:{termino}:{pagina}'
+
+
+@login_required
+def autocompletar_socios(request):
+    """
+    Socios activos cuyo nombre empieza por ?q= (sin distinguir mayúsculas ni
+    tildes), paginados con ?page=. Responde en el formato de select2:
+    {"results": [{"id", "text"}], "pagination": {"more": bool}}.
+    Las respuestas se cachean por término y página; la versión del modelo
+    (services.conditional) las invalida cuando cambia algún socio.
+    """
+    termino = normalizar_nombre(request.GET.get('q', ''))[:100]
+    try:
+        pagina = max(1, int(request.GET.get('page', 1)))
+    except ValueError:
+        pagina = 1
+
+    key = AUTOCOMPLETAR_CACHE_KEY.format(
+        version=obtener_version(SocioComercial), termino=hashlib.md5(termino.encode()).hexdigest(), pagina=pagina
+    )
+    data = cache.get(key)
+    if data is None:
+        inicio = (pagina - 1) * AUTOCOMPLETAR_POR_PAGINA
+        # Filtro y orden sobre el índice (activo, nombre_normalizado): la columna ya
+        # está en minúsculas y istartswith es un LIKE 'x%' simple en MySQL. Se pide
+        # una fila de más para saber si hay otra página sin contar
+        filas = list(
+            SocioComercial.objects.filter(activo=True, nombre_normalizado__istartswith=termino)
+            .order_by('nombre_normalizado', 'pk')
+            .values_list('pk', 'nombre')[inicio:inicio + AUTOCOMPLETAR_POR_PAGINA + 1]
+        )
+        data = {
+            'results': [{'id': pk, 'text': nombre} for pk, nombre in filas[:AUTOCOMPLETAR_POR_PAGINA]],
+            'pagination': {'more': len(filas) > AUTOCOMPLETAR_POR_PAGINA},
+        }
+        cache.set(key, data, 300)
+    return JsonResponse(data)
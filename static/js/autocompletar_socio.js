@@ -0,0 +1,83 @@
+// Campo de búsqueda de socios comerciales (SocioAutocompletarWidget):
+// consulta socios:autocompletar mientras se escribe y guarda el id elegido
+// en el campo oculto que envía el formulario
+'use strict';
+document.addEventListener('DOMContentLoaded', function() {
+    document.querySelectorAll('.autocompletar-socio').forEach(function(contenedor) {
+        const oculto = contenedor.querySelector('input[type=hidden]');
+        const texto = contenedor.querySelector('input[type=text]');
+        const lista = contenedor.querySelector('.list-group');
+        let espera = null;
+        let consulta = 0;
+        let pagina = 1;
+
+        function cerrar() {
+            lista.classList.add('d-none');
+            lista.innerHTML = '';
+        }
+
+        function elegir(id, nombre) {
+            oculto.value = id;
+            texto.value = nombre;
+            cerrar();
+        }
+
+        function buscar(nuevaPagina) {
+            const actual = ++consulta;
+            pagina = nuevaPagina;
+            const url = contenedor.dataset.url + '?q=' + encodeURIComponent(texto.value.trim()) + '&page=' + pagina;
+            fetch(url, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+                .then(function(respuesta) { return respuesta.json(); })
+                .then(function(data) {
+                    if (actual !== consulta) {
+                        return;  // llegó tarde: ya hay una búsqueda más reciente
+                    }
+                    if (pagina === 1) {
+                        lista.innerHTML = '';
+                    }
+                    const anterior = lista.querySelector('.cargar-mas');
+                    if (anterior) {
+                        anterior.remove();
+                    }
+                    data.results.forEach(function(socio) {
+                        const item = document.createElement('button');
+                        item.type = 'button';
+                        item.className = 'list-group-item list-group-item-action';
+                        item.textContent = socio.text;
+                        item.addEventListener('mousedown', function(evento) {
+                            evento.preventDefault();
+                            elegir(socio.id, socio.text);
+                        });
+                        lista.appendChild(item);
+                    });
+                    if (data.pagination.more) {
+                        const mas = document.createElement('button');
+                        mas.type = 'button';
+                        mas.className = 'list-group-item list-group-item-action text-primary cargar-mas';
+                        mas.textContent = 'Ver más resultados...';
+                        mas.addEventListener('mousedown', function(evento) {
+                            evento.preventDefault();
+                            buscar(pagina + 1);
+                        });
+                        lista.appendChild(mas);
+                    }
+                    if (!lista.children.length) {
+                        lista.innerHTML = '<div class="list-group-item text-muted">Sin resultados</div>';
+                    }
+                    lista.classList.remove('d-none');
+                });
+        }
+
+        texto.addEventListener('input', function() {
+            oculto.value = '';  // el texto ya no corresponde al socio elegido
+            clearTimeout(espera);
+            espera = setTimeout(function() { buscar(1); }, 250);
+        });
+        texto.addEventListener('focus', function() {
+            if (!oculto.value) {
+                buscar(1);
+            }
+        });
+        texto.addEventListener('blur', cerrar);
+    });
+});
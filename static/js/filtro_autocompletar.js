@@ -0,0 +1,14 @@
+// Filtros del admin con autocompletado (services/admin_performance.py):
+// al elegir un valor se recarga el listado con el parámetro del filtro
+'use strict';
+{
+    django.jQuery(function($) {
+        $('select.filtro-autocompletar').on('change', function() {
+            const url = this.dataset.urlTodos;
+            const separador = url.indexOf('?') === -1 ? '?' : '&';
+            window.location = this.value
+                ? url + separador + encodeURIComponent(this.dataset.parametro) + '=' + encodeURIComponent(this.value)
+                : url;
+        });
+    });
+}